@@ -1,15 +1,13 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlmodel import SQLModel
 from alembic import context
 from dotenv import load_dotenv
-import os
 
-from app.database import DATABASE_URL
+from core.database import DATABASE_URL
 
-from models.user import Base as UserBase
-from models.wine import Base as WineBase
-from models.stock import Base as StockBase
+import models  # noqa: F401 -- registers every table on SQLModel.metadata
 
 # Load our environment variables
 load_dotenv()
@@ -17,10 +15,56 @@ load_dotenv()
 # This is the Alembic Config object
 config = context.config
 
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
 # Set the database URL
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
 # Add your model's MetaData object here
-target_metadata = Base.metadata
+target_metadata = SQLModel.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Monthly movement partitions (PostgreSQL) are managed by domain.partitions, not by the models
+    return not (type_ == "table" and reflected and compare_to is None and name.startswith("movements_"))
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        render_as_batch=DATABASE_URL.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite can only ALTER constraints by rebuilding the table
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
 
-# ... rest of the existing env.py code ...
\ No newline at end of file
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
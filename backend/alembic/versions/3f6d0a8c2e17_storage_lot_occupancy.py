@@ -0,0 +1,30 @@
+"""Storage lot occupancy
+
+Revision ID: 3f6d0a8c2e17
+Revises: b7a2e5d91c04
+Create Date: 2026-10-17 09:48:37.120954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6d0a8c2e17'
+down_revision: Union[str, None] = 'b7a2e5d91c04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('storagelots', sa.Column('occupied', sa.Integer(), server_default='0', nullable=False))
+    # Backfill the counters from the current balances
+    op.execute(
+        "UPDATE storagelots SET occupied = COALESCE("
+        "(SELECT SUM(stocks.quantity) FROM stocks WHERE stocks.lot_id = storagelots.id), 0)"
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('storagelots', 'occupied')
@@ -0,0 +1,32 @@
+"""Stock posting constraints
+
+Revision ID: 4e1d7c2a9b36
+Revises: 9c73e59a7b0f
+Create Date: 2026-10-17 09:12:04.318551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1d7c2a9b36'
+down_revision: Union[str, None] = '9c73e59a7b0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('stocks') as batch_op:
+        batch_op.create_check_constraint('ck_stocks_quantity_non_negative', 'quantity >= 0')
+    op.create_index(
+        'uq_stocks_sku_location_unlotted', 'stocks', ['sku_id', 'location_id'], unique=True,
+        postgresql_where=sa.text('lot_id IS NULL'), sqlite_where=sa.text('lot_id IS NULL'),
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_stocks_sku_location_unlotted', table_name='stocks')
+    with op.batch_alter_table('stocks') as batch_op:
+        batch_op.drop_constraint('ck_stocks_quantity_non_negative', type_='check')
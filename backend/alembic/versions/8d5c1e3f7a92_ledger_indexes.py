@@ -0,0 +1,38 @@
+"""Ledger indexes
+
+Revision ID: 8d5c1e3f7a92
+Revises: 3f6d0a8c2e17
+Create Date: 2026-10-17 10:21:05.663190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d5c1e3f7a92'
+down_revision: Union[str, None] = '3f6d0a8c2e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (created_at, id) serves everything the single-column created_at index did
+    op.drop_index(op.f('ix_movements_created_at'), table_name='movements')
+    op.create_index('ix_movements_created_at_id', 'movements', ['created_at', 'id'], unique=False)
+    op.create_index('ix_movements_sku_id_created_at', 'movements', ['sku_id', 'created_at'], unique=False)
+    op.create_index('ix_movements_from_location_id_created_at', 'movements', ['from_location_id', 'created_at'], unique=False)
+    op.create_index('ix_movements_to_location_id_created_at', 'movements', ['to_location_id', 'created_at'], unique=False)
+    op.create_index('ix_movements_performed_by_created_at', 'movements', ['performed_by', 'created_at'], unique=False)
+    op.create_index('ix_stocks_location_id', 'stocks', ['location_id'], unique=False)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stocks_location_id', table_name='stocks')
+    op.drop_index('ix_movements_performed_by_created_at', table_name='movements')
+    op.drop_index('ix_movements_to_location_id_created_at', table_name='movements')
+    op.drop_index('ix_movements_from_location_id_created_at', table_name='movements')
+    op.drop_index('ix_movements_sku_id_created_at', table_name='movements')
+    op.drop_index('ix_movements_created_at_id', table_name='movements')
+    op.create_index(op.f('ix_movements_created_at'), 'movements', ['created_at'], unique=False)
@@ -0,0 +1,57 @@
+"""Change log
+
+Revision ID: a9d4e6f1c385
+Revises: e5b8f2a4c913
+Create Date: 2026-10-17 14:05:12.480316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e6f1c385'
+down_revision: Union[str, None] = 'e5b8f2a4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# entity, table, location column (None for catalog rows), ordering column
+BACKFILL = [
+    ('wine', 'wineskus', None, 'created_at'),
+    ('location', 'locations', None, 'created_at'),
+    ('storage_lot', 'storagelots', 'location_id', 'created_at'),
+    ('stock', 'stocks', 'location_id', 'updated_at'),
+    ('movement', 'movements', 'from_location_id', 'created_at'),
+    ('movement', 'movements', 'to_location_id', 'created_at'),
+]
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('changelog',
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Uuid(), nullable=False),
+    sa.Column('location_id', sa.Uuid(), nullable=True),
+    sa.Column('op', sa.Enum('UPSERT', 'DELETE', name='changeop'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_changelog_entity_entity_id', 'changelog', ['entity', 'entity_id'], unique=False)
+
+    # Existing rows enter the log once each, so a client syncing from the start receives everything.
+    # Timestamps are naive UTC, like the application's.
+    now = "timezone('utc', now())" if op.get_bind().dialect.name == 'postgresql' else 'CURRENT_TIMESTAMP'
+    for entity, table, location_column, order_column in BACKFILL:
+        location = location_column or 'NULL'
+        condition = f'WHERE {location_column} IS NOT NULL' if location_column else ''
+        op.execute(
+            f"INSERT INTO changelog (entity, entity_id, location_id, op, created_at) "
+            f"SELECT '{entity}', id, {location}, 'UPSERT', {now} FROM {table} {condition} ORDER BY {order_column}"
+        )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_changelog_entity_entity_id', table_name='changelog')
+    op.drop_table('changelog')
+    sa.Enum(name='changeop').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,44 @@
+"""Stock rollups
+
+Revision ID: b7a2e5d91c04
+Revises: fc8c00e41b78
+Create Date: 2026-10-17 09:02:11.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a2e5d91c04'
+down_revision: Union[str, None] = 'fc8c00e41b78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stockrollups',
+    sa.Column('sku_id', sa.Uuid(), nullable=False),
+    sa.Column('location_id', sa.Uuid(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('cost_value', sa.Float(), nullable=False),
+    sa.Column('retail_value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['sku_id'], ['wineskus.id'], ),
+    sa.PrimaryKeyConstraint('sku_id', 'location_id')
+    )
+    op.create_index('ix_stockrollups_location_id', 'stockrollups', ['location_id'], unique=False)
+    # Backfill from the existing balances
+    op.execute(
+        "INSERT INTO stockrollups (sku_id, location_id, quantity, cost_value, retail_value, updated_at) "
+        "SELECT s.sku_id, s.location_id, SUM(s.quantity), SUM(s.quantity) * w.cost_price, SUM(s.quantity) * w.price_bottle, CURRENT_TIMESTAMP "
+        "FROM stocks s JOIN wineskus w ON w.id = s.sku_id "
+        "GROUP BY s.sku_id, s.location_id, w.cost_price, w.price_bottle"
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stockrollups_location_id', table_name='stockrollups')
+    op.drop_table('stockrollups')
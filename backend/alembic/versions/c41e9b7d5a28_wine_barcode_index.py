@@ -0,0 +1,25 @@
+"""Wine barcode index
+
+Revision ID: c41e9b7d5a28
+Revises: 8d5c1e3f7a92
+Create Date: 2026-10-17 11:12:40.318247
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e9b7d5a28'
+down_revision: Union[str, None] = '8d5c1e3f7a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_wineskus_barcode'), 'wineskus', ['barcode'], unique=False)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_wineskus_barcode'), table_name='wineskus')
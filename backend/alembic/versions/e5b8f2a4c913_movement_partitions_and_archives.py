@@ -0,0 +1,103 @@
+"""Movement partitions and archives
+
+Revision ID: e5b8f2a4c913
+Revises: c41e9b7d5a28
+Create Date: 2026-10-17 11:48:26.905113
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8f2a4c913'
+down_revision: Union[str, None] = 'c41e9b7d5a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+
+INDEXES = [
+    ('ix_movements_batch_ref', ['batch_ref']),
+    ('ix_movements_created_at_id', ['created_at', 'id']),
+    ('ix_movements_sku_id_created_at', ['sku_id', 'created_at']),
+    ('ix_movements_from_location_id_created_at', ['from_location_id', 'created_at']),
+    ('ix_movements_to_location_id_created_at', ['to_location_id', 'created_at']),
+    ('ix_movements_performed_by_created_at', ['performed_by', 'created_at']),
+]
+
+FOREIGN_KEYS = [
+    ('sku_id', 'wineskus'),
+    ('from_location_id', 'locations'),
+    ('to_location_id', 'locations'),
+    ('from_lot_id', 'storagelots'),
+    ('to_lot_id', 'storagelots'),
+    ('performed_by', 'users'),
+    ('approved_by', 'users'),
+]
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def _set_aside_movements() -> str:
+    # Frees the table, primary key and index names for the replacement table
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='movements')
+    op.rename_table('movements', 'movements_old')
+    op.execute('ALTER INDEX movements_pkey RENAME TO movements_old_pkey')
+    return 'movements_old'
+
+def _create_indexes_and_keys():
+    for name, columns in INDEXES:
+        op.create_index(name, 'movements', columns, unique=False)
+    for column, table in FOREIGN_KEYS:
+        op.create_foreign_key(f'movements_{column}_fkey', 'movements', table, [column], ['id'])
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('movementarchives',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('period_start', sa.DateTime(), nullable=False),
+    sa.Column('period_end', sa.DateTime(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_movementarchives_period_start'), 'movementarchives', ['period_start'], unique=False)
+
+    # Native partitioning is PostgreSQL only; elsewhere movements stays one table and archival deletes by range
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    old = _set_aside_movements()
+    # The partition key has to be part of the primary key
+    op.execute(f'CREATE TABLE movements (LIKE {old} INCLUDING DEFAULTS, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)')
+    first = op.get_bind().execute(sa.text(f'SELECT min(created_at) FROM {old}')).scalar() or datetime.utcnow()
+    period = datetime(first.year, first.month, 1)
+    last = _add_months(datetime(datetime.utcnow().year, datetime.utcnow().month, 1), PARTITIONS_AHEAD)
+    while period <= last:
+        op.execute(
+            f"CREATE TABLE movements_y{period.year}m{period.month:02d} PARTITION OF movements "
+            f"FOR VALUES FROM ('{period.isoformat()}') TO ('{_add_months(period, 1).isoformat()}')"
+        )
+        period = _add_months(period, 1)
+    op.execute('CREATE TABLE movements_default PARTITION OF movements DEFAULT')
+    op.execute(f'INSERT INTO movements SELECT * FROM {old}')
+    op.drop_table(old)
+    _create_indexes_and_keys()
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        old = _set_aside_movements()
+        op.execute(f'CREATE TABLE movements (LIKE {old} INCLUDING DEFAULTS, PRIMARY KEY (id))')
+        op.execute(f'INSERT INTO movements SELECT * FROM {old}')
+        # Dropping the partitioned parent drops every partition with it
+        op.drop_table(old)
+        _create_indexes_and_keys()
+    op.drop_index(op.f('ix_movementarchives_period_start'), table_name='movementarchives')
+    op.drop_table('movementarchives')
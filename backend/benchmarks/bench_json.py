@@ -0,0 +1,70 @@
+# benchmarks/bench_json.py
+#
+# Serialization cost of a large movements page: FastAPI's response_model path
+# (validate, dump to JSON-able python, stdlib json) against the FAST_JSON orjson path.
+# No database needed.
+#
+#   python -m benchmarks.bench_json --rows 5000 --repeat 20
+
+import argparse
+import json
+import time
+from uuid import uuid4
+from datetime import datetime, timedelta
+from pydantic import TypeAdapter
+import orjson
+from models.movement import Movement, MovementType
+from domain.pagination import Page, _model_fields
+
+def synthetic_page(rows: int) -> Page:
+    now = datetime.utcnow()
+    sku_ids = [uuid4() for _ in range(50)]
+    location_ids = [uuid4() for _ in range(10)]
+    items = [
+        Movement(
+            batch_ref=f"B{i // 20}", sku_id=sku_ids[i % 50], quantity=i % 24 + 1,
+            from_location_id=location_ids[i % 10], to_location_id=location_ids[(i + 3) % 10],
+            movement_type=MovementType.TRANSFER, reason="Rebalance" if i % 3 else None,
+            performed_by=uuid4(), created_at=now - timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ]
+    return Page(items=items, next_cursor="WyIyMDI2LTEwLTE3VDAwOjAwOjAwIiwgIngiXQ")
+
+def response_model_path(adapter: TypeAdapter, page: Page) -> bytes:
+    # What FastAPI does for response_model=Page[Movement]: validate, serialize, then json.dumps
+    value = adapter.validate_python(page, from_attributes=True)
+    content = adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+def fast_path(page: Page) -> bytes:
+    return orjson.dumps(page, default=_model_fields)
+
+def timed(fn, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+def main():
+    parser = argparse.ArgumentParser(description="Large-response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    page = synthetic_page(args.rows)
+    adapter = TypeAdapter(Page[Movement])
+    if json.loads(response_model_path(adapter, page)) != json.loads(fast_path(page)):
+        raise SystemExit("The two paths produced different JSON")
+
+    baseline, size = timed(lambda: response_model_path(adapter, page), args.repeat)
+    fast, _ = timed(lambda: fast_path(page), args.repeat)
+    print(f"{args.rows} movements ({size / 1024:.0f} KiB), best of {args.repeat}")
+    print(f"  response_model + json: {baseline * 1000:8.1f} ms  ({args.rows / baseline:,.0f} rows/s)")
+    print(f"  FAST_JSON (orjson):    {fast * 1000:8.1f} ms  ({args.rows / fast:,.0f} rows/s)  {baseline / fast:.1f}x")
+
+if __name__ == "__main__":
+    main()
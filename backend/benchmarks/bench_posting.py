@@ -0,0 +1,106 @@
+# benchmarks/bench_posting.py
+#
+# Concurrent stock posting throughput against a single SKU/location balance.
+#
+# Run from backend/ against a scratch database (tables are created if missing):
+#   DATABASE_URL=sqlite:///bench.db python -m benchmarks.bench_posting --threads 8 --movements 250
+
+import argparse
+import threading
+import time
+from uuid import uuid4
+from sqlmodel import SQLModel, select
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError
+import models  # noqa: F401 -- registers every table on SQLModel.metadata
+from core.database import engine, SessionLocal
+from models.location import Location, LocationType
+from models.movement import MovementType
+from models.stock import Stock
+from models.user import User, UserRole
+from models.wine_sku import WineSKU
+from domain.movement import MovementCreate, create_movement
+
+def seed(opening_balance: int):
+    SQLModel.metadata.create_all(engine)
+    with SessionLocal() as db:
+        wine = WineSKU(
+            product_code=f"BENCH-{uuid4().hex[:8]}", wine_name="Bench Wine", vintage_year=2020,
+            producer="Bench", country="France", region="Bordeaux", grape_varieties=["Merlot"],
+            alcohol_content=13.5, price_bottle=20.0, price_glass=5.0, cost_price=12.0,
+        )
+        location = Location(name=f"Bench Cellar {uuid4().hex[:6]}", type=LocationType.CELLAR)
+        user = User(
+            first_name="Bench", last_name="User", email=f"bench-{uuid4().hex[:8]}@example.com",
+            role=UserRole.STAFF, hashed_password="x",
+        )
+        db.add_all([wine, location, user])
+        db.commit()
+        ids = (wine.id, location.id, user.id)
+    create_movement(SessionLocal(), MovementCreate(
+        batch_ref="BENCH-OPEN", sku_id=ids[0], quantity=opening_balance, to_location_id=ids[1],
+        movement_type=MovementType.INBOUND, performed_by=ids[2],
+    ))
+    return ids
+
+def worker(ids, movements: int, results: list, lock: threading.Lock):
+    sku_id, location_id, user_id = ids
+    posted = rejected = errors = net = 0
+    latencies = []
+    for i in range(movements):
+        # Alternate receipts and depletions so the balance stays near its opening level
+        if i % 2:
+            movement = MovementCreate(batch_ref="BENCH", sku_id=sku_id, quantity=1, from_location_id=location_id,
+                                      movement_type=MovementType.DEPLETION, performed_by=user_id)
+            delta = -1
+        else:
+            movement = MovementCreate(batch_ref="BENCH", sku_id=sku_id, quantity=1, to_location_id=location_id,
+                                      movement_type=MovementType.INBOUND, performed_by=user_id)
+            delta = 1
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            try:
+                create_movement(db, movement)
+                posted += 1
+                net += delta
+            except HTTPException:
+                rejected += 1
+            except DBAPIError:
+                # Lock timeouts / serialization failures (e.g. SQLite's single writer)
+                errors += 1
+        latencies.append(time.perf_counter() - start)
+    with lock:
+        results.append((posted, rejected, errors, net, latencies))
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent stock posting benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--movements", type=int, default=250, help="movements per thread")
+    parser.add_argument("--opening-balance", type=int, default=1000)
+    args = parser.parse_args()
+
+    ids = seed(args.opening_balance)
+    results, lock = [], threading.Lock()
+    threads = [threading.Thread(target=worker, args=(ids, args.movements, results, lock)) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    posted = sum(r[0] for r in results)
+    rejected = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    latencies = sorted(l for r in results for l in r[4])
+    with SessionLocal() as db:
+        balance = db.exec(select(Stock.quantity).where(Stock.sku_id == ids[0], Stock.location_id == ids[1])).one()
+    expected = args.opening_balance + sum(r[3] for r in results)
+
+    print(f"{engine.dialect.name}: {args.threads} threads x {args.movements} postings on one SKU/location")
+    print(f"  posted {posted}, rejected {rejected}, errors {errors} in {elapsed:.2f}s -> {posted / elapsed:.0f} movements/s")
+    print(f"  latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
+    print(f"  final balance {balance} (expected {expected}) {'OK' if balance == expected else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_search.py
+#
+# Wine search latency over a synthetic catalog held in the in-process index (no database needed).
+#
+#   python -m benchmarks.bench_search --skus 100000 --queries 2000
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+from datetime import datetime
+from domain.search import WineSearchIndex, WineSearchFilter
+
+PRODUCERS = ["Guigal", "Chapoutier", "Jaboulet", "Antinori", "Torres", "Penfolds", "Mondavi", "Drouhin", "Jadot", "Faiveley",
+             "Trimbach", "Hugel", "Egon Muller", "Vega Sicilia", "Cloudy Bay", "Felton Road", "Catena", "Concha y Toro"]
+REGIONS = ["Bordeaux", "Burgundy", "Rhone", "Champagne", "Tuscany", "Piedmont", "Rioja", "Napa Valley", "Barossa",
+           "Mosel", "Alsace", "Marlborough", "Mendoza", "Central Otago", "Douro"]
+COUNTRIES = ["France", "Italy", "Spain", "USA", "Australia", "Germany", "New Zealand", "Argentina", "Portugal"]
+GRAPES = ["Merlot", "Cabernet Sauvignon", "Pinot Noir", "Syrah", "Grenache", "Chardonnay", "Riesling", "Sauvignon Blanc",
+          "Tempranillo", "Nebbiolo", "Sangiovese", "Malbec", "Viognier", "Chenin Blanc", "Touriga Nacional"]
+WORDS = ["Reserve", "Estate", "Vieilles", "Vignes", "Clos", "Grand", "Cru", "Cuvee", "Old", "Vine", "Hill", "Single",
+         "Vineyard", "Blanc", "Rouge", "Brut", "Riserva", "Gran", "Selection", "Terroir", "Les", "Chateau", "Domaine"]
+
+def synthetic_wine(rng: random.Random):
+    return SimpleNamespace(
+        id=uuid4(),
+        wine_name=" ".join(rng.sample(WORDS, 3)) + f" {rng.randint(1, 999)}",
+        producer=rng.choice(PRODUCERS),
+        region=rng.choice(REGIONS),
+        grape_varieties=rng.sample(GRAPES, rng.randint(1, 3)),
+        vintage_year=rng.randint(1990, 2023),
+        country=rng.choice(COUNTRIES),
+        price_bottle=round(rng.uniform(8, 400), 2),
+        updated_at=datetime.utcnow(),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process wine search benchmark")
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = WineSearchIndex()
+    start = time.perf_counter()
+    index.load_rows(synthetic_wine(rng) for _ in range(args.skus))
+    print(f"indexed {args.skus} SKUs in {time.perf_counter() - start:.2f}s")
+
+    vocabulary = [w.lower() for w in WORDS + PRODUCERS + REGIONS + GRAPES]
+    latencies = []
+    for _ in range(args.queries):
+        terms = [rng.choice(vocabulary).split()[0] for _ in range(rng.randint(1, 2))]
+        # Partial last term, as typed into the search box
+        terms[-1] = terms[-1][:max(2, rng.randint(2, len(terms[-1])))]
+        filters = WineSearchFilter(country=rng.choice(COUNTRIES)) if rng.random() < 0.3 else WineSearchFilter()
+        start = time.perf_counter()
+        index.search(" ".join(terms), filters, 20)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{args.queries} queries: p50 {pct(0.50):.2f} ms, p95 {pct(0.95):.2f} ms, p99 {pct(0.99):.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_transfer.py
+#
+# Contention on multi-line transfers between two cellars. Half the threads move stock
+# A -> B and half B -> A, each transfer touching several of the same SKUs, which is the
+# pattern that deadlocks when balances are locked in line order. With --disjoint every
+# thread gets its own SKUs instead, so any waiting seen there is needless serialization.
+#
+# Run from backend/ against a scratch database (tables are created if missing):
+#   DATABASE_URL=postgresql://... python -m benchmarks.bench_transfer --threads 8 --transfers 200 --lines 5
+
+import argparse
+import random
+import threading
+import time
+from uuid import uuid4
+from sqlmodel import SQLModel, select
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.exc import DBAPIError
+import models  # noqa: F401 -- registers every table on SQLModel.metadata
+from core.database import engine, SessionLocal
+from models.location import Location, LocationType
+from models.stock import Stock
+from models.user import User, UserRole
+from models.wine_sku import WineSKU
+from domain.movement import StockTransfer, TransferLine, create_transfer
+from domain.stock import apply_stock_deltas
+
+def seed(skus: int, opening_balance: int):
+    SQLModel.metadata.create_all(engine)
+    tag = uuid4().hex[:6]
+    with SessionLocal() as db:
+        wines = [
+            WineSKU(
+                product_code=f"BENCH-{tag}-{i}", wine_name="Bench Wine", vintage_year=2020,
+                producer="Bench", country="France", region="Bordeaux", grape_varieties=["Merlot"],
+                alcohol_content=13.5, price_bottle=20.0, price_glass=5.0, cost_price=12.0,
+            )
+            for i in range(skus)
+        ]
+        cellars = [Location(name=f"Bench Cellar {side} {tag}", type=LocationType.CELLAR) for side in ("A", "B")]
+        user = User(
+            first_name="Bench", last_name="User", email=f"bench-{tag}@example.com",
+            role=UserRole.STAFF, hashed_password="x",
+        )
+        db.add_all([*wines, *cellars, user])
+        db.commit()
+        sku_ids = [wine.id for wine in wines]
+        location_ids = [cellar.id for cellar in cellars]
+        apply_stock_deltas(db, {(sku_id, None, location_id): opening_balance for sku_id in sku_ids for location_id in location_ids})
+        db.commit()
+        return sku_ids, location_ids, user.id
+
+def worker(index: int, ids, args, results: list, lock: threading.Lock):
+    sku_ids, (cellar_a, cellar_b), user_id = ids
+    source, destination = (cellar_a, cellar_b) if index % 2 else (cellar_b, cellar_a)
+    if args.disjoint:
+        per_thread = len(sku_ids) // args.threads
+        sku_ids = sku_ids[index * per_thread:(index + 1) * per_thread]
+    rng = random.Random(index)
+    posted = rejected = errors = 0
+    latencies = []
+    for _ in range(args.transfers):
+        lines = [TransferLine(sku_id=sku_id, quantity=1) for sku_id in rng.sample(sku_ids, min(args.lines, len(sku_ids)))]
+        transfer = StockTransfer(from_location_id=source, to_location_id=destination, lines=lines, performed_by=user_id)
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            try:
+                create_transfer(db, transfer)
+                posted += 1
+            except HTTPException:
+                rejected += 1
+            except DBAPIError:
+                # Deadlocks, lock timeouts, SQLite's single writer
+                errors += 1
+        latencies.append(time.perf_counter() - start)
+    with lock:
+        results.append((posted, rejected, errors, latencies))
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent multi-line transfer benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--transfers", type=int, default=200, help="transfers per thread")
+    parser.add_argument("--lines", type=int, default=5, help="SKU lines per transfer")
+    parser.add_argument("--skus", type=int, default=10)
+    parser.add_argument("--opening-balance", type=int, default=1000)
+    parser.add_argument("--disjoint", action="store_true", help="give each thread its own SKUs")
+    args = parser.parse_args()
+    if args.disjoint:
+        args.skus = max(args.skus, args.threads * args.lines)
+
+    ids = seed(args.skus, args.opening_balance)
+    results, lock = [], threading.Lock()
+    threads = [threading.Thread(target=worker, args=(i, ids, args, results, lock)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    posted = sum(r[0] for r in results)
+    rejected = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    latencies = sorted(l for r in results for l in r[3])
+    sku_ids, location_ids, _ = ids
+    with SessionLocal() as db:
+        total = db.exec(select(func.sum(Stock.quantity)).where(Stock.sku_id.in_(sku_ids), Stock.location_id.in_(location_ids))).one()
+    expected = args.opening_balance * len(sku_ids) * 2
+
+    mode = "disjoint SKUs" if args.disjoint else f"{args.skus} shared SKUs, opposite directions"
+    print(f"{engine.dialect.name}: {args.threads} threads x {args.transfers} transfers of {args.lines} lines ({mode})")
+    print(f"  posted {posted}, rejected {rejected}, errors {errors} in {elapsed:.2f}s -> {posted / elapsed:.0f} transfers/s, {posted * args.lines / elapsed:.0f} lines/s")
+    print(f"  latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
+    print(f"  bottles across both cellars {total} (expected {expected}) {'OK' if total == expected else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
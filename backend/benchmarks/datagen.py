@@ -0,0 +1,171 @@
+# benchmarks/datagen.py
+#
+# Synthetic catalog and ledger for load tests: SKUs, locations, lots, users and a movement
+# history whose stock balances, rollups and lot counters agree with the movements.
+#
+# Run from backend/ against a scratch database (tables are created if missing):
+#   DATABASE_URL=sqlite:///bench.db python -m benchmarks.datagen --movements 1000000
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import insert, update
+from sqlmodel import SQLModel
+import models  # noqa: F401 -- registers every table on SQLModel.metadata
+from core.database import engine, SessionLocal
+from models.location import Location, LocationType
+from models.movement import Movement, MovementType
+from models.stock import Stock
+from models.storage_lot import StorageLot
+from models.user import User, UserRole
+from models.wine_sku import WineSKU
+from domain.rollup import rebuild_rollups
+from benchmarks.bench_search import synthetic_wine
+
+INSERT_CHUNK_SIZE = 10_000
+LOT_CAPACITY = 1_000_000
+
+def _insert_chunked(db, model, rows):
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.execute(insert(model), rows[start:start + INSERT_CHUNK_SIZE])
+
+def _reference_data(db, rng: random.Random, args, now: datetime):
+    run = uuid4().hex[:6]
+    wines = []
+    for i in range(args.skus):
+        wine = synthetic_wine(rng)
+        price = wine.price_bottle
+        wines.append(dict(
+            id=wine.id, product_code=f"GEN-{run}-{i}", barcode=f"{rng.randrange(10**12, 10**13)}", wine_name=wine.wine_name,
+            vintage_year=wine.vintage_year, producer=wine.producer, country=wine.country, region=wine.region,
+            grape_varieties=wine.grape_varieties, alcohol_content=round(rng.uniform(11, 15), 1),
+            price_bottle=price, price_glass=round(price / 4, 2), cost_price=round(price * 0.55, 2), created_at=now, updated_at=now,
+        ))
+    locations = [
+        dict(id=uuid4(), name=f"Gen {run} {i}", type=rng.choice(list(LocationType)), created_at=now, updated_at=now)
+        for i in range(args.locations)
+    ]
+    lots = [
+        dict(id=uuid4(), location_id=location["id"], lot_name=f"Rack {j}", capacity=LOT_CAPACITY, occupied=0, created_at=now, updated_at=now)
+        for location in locations for j in range(args.lots_per_location)
+    ]
+    users = [
+        dict(id=uuid4(), first_name="Gen", last_name=str(i), email=f"gen-{run}-{i}@example.com", role=rng.choice(list(UserRole)),
+             hashed_password="x", is_active=True, created_at=now, updated_at=now)
+        for i in range(args.users)
+    ]
+    _insert_chunked(db, WineSKU, wines)
+    _insert_chunked(db, Location, locations)
+    _insert_chunked(db, StorageLot, lots)
+    _insert_chunked(db, User, users)
+    return [w["id"] for w in wines], [l["id"] for l in locations], lots, [u["id"] for u in users]
+
+def _movements(rng: random.Random, args, sku_ids, location_ids, lots, user_ids, now: datetime):
+    # Yields movement rows oldest first while tracking balances so no leg ever goes negative
+    lots_by_location = {}
+    for lot in lots:
+        lots_by_location.setdefault(lot["location_id"], []).append(lot["id"])
+    balances: dict[tuple, int] = {}
+    held: list[tuple] = []
+    start = now - timedelta(days=args.days)
+    step = timedelta(days=args.days) / max(args.movements, 1)
+
+    def destination():
+        location_id = rng.choice(location_ids)
+        lot_id = rng.choice(lots_by_location[location_id]) if lots_by_location.get(location_id) and rng.random() < 0.5 else None
+        return lot_id, location_id
+
+    for i in range(args.movements):
+        row = dict(
+            id=uuid4(), batch_ref=f"GEN{i // 50}", from_location_id=None, to_location_id=None, from_lot_id=None, to_lot_id=None,
+            reason=None, performed_by=rng.choice(user_ids), approved_by=None, is_high_value=False, created_at=start + step * i,
+        )
+        roll = rng.random()
+        source = rng.choice(held) if held and roll >= 0.45 else None
+        if source is None or balances[source] <= 0:
+            sku_id = rng.choice(sku_ids)
+            lot_id, location_id = destination()
+            quantity = rng.randint(6, 48)
+            row.update(sku_id=sku_id, quantity=quantity, to_lot_id=lot_id, to_location_id=location_id, movement_type=MovementType.INBOUND)
+            key = (sku_id, lot_id, location_id)
+            if key not in balances:
+                held.append(key)
+            balances[key] = balances.get(key, 0) + quantity
+        else:
+            sku_id, lot_id, location_id = source
+            quantity = rng.randint(1, min(balances[source], 12))
+            balances[source] -= quantity
+            row.update(sku_id=sku_id, quantity=quantity, from_lot_id=lot_id, from_location_id=location_id)
+            if roll < 0.7:
+                to_lot_id, to_location_id = destination()
+                row.update(to_lot_id=to_lot_id, to_location_id=to_location_id, movement_type=MovementType.TRANSFER)
+                key = (sku_id, to_lot_id, to_location_id)
+                if key not in balances:
+                    held.append(key)
+                balances[key] = balances.get(key, 0) + quantity
+            else:
+                row.update(movement_type=MovementType.DEPLETION if roll < 0.95 else MovementType.OUTBOUND)
+        yield row
+    return balances
+
+def generate(args) -> dict:
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    SQLModel.metadata.create_all(engine)
+    counts = {}
+    with SessionLocal() as db:
+        sku_ids, location_ids, lots, user_ids = _reference_data(db, rng, args, now)
+        db.commit()
+
+        movements = _movements(rng, args, sku_ids, location_ids, lots, user_ids, now)
+        chunk = []
+        while True:
+            try:
+                chunk.append(next(movements))
+            except StopIteration as done:
+                balances = done.value
+                break
+            if len(chunk) >= INSERT_CHUNK_SIZE:
+                db.execute(insert(Movement), chunk)
+                db.commit()
+                chunk = []
+        if chunk:
+            db.execute(insert(Movement), chunk)
+
+        stocks = [
+            dict(id=uuid4(), sku_id=sku_id, lot_id=lot_id, location_id=location_id, quantity=quantity, updated_at=now)
+            for (sku_id, lot_id, location_id), quantity in balances.items()
+        ]
+        _insert_chunked(db, Stock, stocks)
+        occupied = {}
+        for (_, lot_id, _), quantity in balances.items():
+            if lot_id is not None:
+                occupied[lot_id] = occupied.get(lot_id, 0) + quantity
+        for lot_id, quantity in occupied.items():
+            db.execute(update(StorageLot).where(StorageLot.id == lot_id).values(occupied=quantity))
+        db.commit()
+        counts["rollups"] = rebuild_rollups(db)
+    counts.update(skus=len(sku_ids), locations=len(location_ids), lots=len(lots), users=len(user_ids), movements=args.movements, stocks=len(stocks))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic wine inventory dataset")
+    parser.add_argument("--skus", type=int, default=2000)
+    parser.add_argument("--locations", type=int, default=20)
+    parser.add_argument("--lots-per-location", type=int, default=10)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365, help="history spread over this many days")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args)
+    elapsed = time.perf_counter() - start
+    print(f"{engine.dialect.name}: generated in {elapsed:.1f}s -> {args.movements / elapsed:.0f} movements/s")
+    print("  " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+if __name__ == "__main__":
+    main()
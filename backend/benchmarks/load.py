@@ -0,0 +1,207 @@
+# benchmarks/load.py
+#
+# Mixed read/write load against the API, in-process (httpx ASGI transport) or against a running
+# uvicorn, reporting throughput and p50/p95/p99 per endpoint. Seed the database with
+# benchmarks.datagen first.
+#
+# Run from backend/:
+#   DATABASE_URL=sqlite:///bench.db python -m benchmarks.load --requests 5000 --concurrency 16
+#   DATABASE_URL=sqlite:///bench.db python -m benchmarks.load --url http://127.0.0.1:8000 --save results/run.json
+#   python -m benchmarks.load --compare results/before.json results/after.json
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+import httpx
+from sqlmodel import select
+import models  # noqa: F401 -- registers every table on SQLModel.metadata
+from core.database import engine, SessionLocal
+from models.location import Location
+from models.stock import Stock
+from models.user import User
+from models.wine_sku import WineSKU
+
+SAMPLE_SIZE = 500
+
+# (label, weight); labels are route templates so results line up across runs
+WORKLOAD = [
+    ("GET /wines/{id}", 20),
+    ("GET /wines/search", 10),
+    ("GET /wines/", 5),
+    ("GET /movements/?sku_id", 10),
+    ("GET /movements/?location_id", 5),
+    ("GET /movements/", 5),
+    ("GET /stocks/?location_id", 10),
+    ("GET /stocks/summary", 5),
+    ("POST /movements/", 20),
+    ("POST /movements/batch", 5),
+    ("GET /health/db", 5),
+]
+
+def _sample_ids(db, column, limit: int = SAMPLE_SIZE) -> list[str]:
+    return [str(value) for value in db.exec(select(column).limit(limit)).all()]
+
+def load_fixtures() -> dict:
+    with SessionLocal() as db:
+        fixtures = {
+            "wines": _sample_ids(db, WineSKU.id),
+            "words": [name.split()[0] for name in db.exec(select(WineSKU.wine_name).limit(SAMPLE_SIZE)).all()],
+            "locations": _sample_ids(db, Location.id),
+            "users": _sample_ids(db, User.id),
+            # Depletions draw from real unlotted balances so most of them post
+            "balances": [(str(sku), str(location)) for sku, location in db.exec(
+                select(Stock.sku_id, Stock.location_id).where(Stock.lot_id.is_(None), Stock.quantity > 0).limit(SAMPLE_SIZE)
+            ).all()],
+        }
+    if not fixtures["wines"] or not fixtures["locations"] or not fixtures["users"]:
+        raise SystemExit("Database is empty; run python -m benchmarks.datagen first")
+    return fixtures
+
+def _movement(rng: random.Random, fixtures: dict) -> dict:
+    movement = dict(batch_ref="LOAD", quantity=1, performed_by=rng.choice(fixtures["users"]))
+    if fixtures["balances"] and rng.random() < 0.5:
+        sku_id, location_id = rng.choice(fixtures["balances"])
+        return dict(movement, sku_id=sku_id, from_location_id=location_id, movement_type="Depletion")
+    return dict(movement, sku_id=rng.choice(fixtures["wines"]), to_location_id=rng.choice(fixtures["locations"]), movement_type="Inbound")
+
+def build_request(label: str, rng: random.Random, fixtures: dict) -> tuple[str, str, dict]:
+    if label == "GET /wines/{id}":
+        return "GET", f"/wines/{rng.choice(fixtures['wines'])}", {}
+    if label == "GET /wines/search":
+        return "GET", "/wines/search", {"params": {"q": rng.choice(fixtures["words"])}}
+    if label == "GET /wines/":
+        return "GET", "/wines/", {}
+    if label == "GET /movements/?sku_id":
+        return "GET", "/movements/", {"params": {"sku_id": rng.choice(fixtures["wines"])}}
+    if label == "GET /movements/?location_id":
+        return "GET", "/movements/", {"params": {"location_id": rng.choice(fixtures["locations"])}}
+    if label == "GET /movements/":
+        return "GET", "/movements/", {}
+    if label == "GET /stocks/?location_id":
+        return "GET", "/stocks/", {"params": {"location_id": rng.choice(fixtures["locations"])}}
+    if label == "GET /stocks/summary":
+        return "GET", "/stocks/summary", {"params": {"group_by": rng.choice(["location", "sku"])}}
+    if label == "POST /movements/":
+        return "POST", "/movements/", {"json": _movement(rng, fixtures)}
+    if label == "POST /movements/batch":
+        return "POST", "/movements/batch", {"json": [_movement(rng, fixtures) for _ in range(20)]}
+    return "GET", "/health/db", {}
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+async def run(client: httpx.AsyncClient, fixtures: dict, total: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    labels, weights = zip(*WORKLOAD)
+    plan = rng.choices(labels, weights=weights, k=total)
+    queue: asyncio.Queue = asyncio.Queue()
+    for label in plan:
+        queue.put_nowait(label)
+    samples: dict[str, list[float]] = {label: [] for label in labels}
+    statuses: dict[str, dict[str, int]] = {label: {} for label in labels}
+
+    async def worker(worker_seed: int):
+        worker_rng = random.Random(worker_seed)
+        while not queue.empty():
+            label = queue.get_nowait()
+            method, path, kwargs = build_request(label, worker_rng, fixtures)
+            start = time.perf_counter()
+            try:
+                status = str((await client.request(method, path, **kwargs)).status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            samples[label].append(time.perf_counter() - start)
+            statuses[label][status] = statuses[label].get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(seed * 1000 + i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for label in labels:
+        latencies = sorted(samples[label])
+        if not latencies:
+            continue
+        endpoints[label] = {
+            "count": len(latencies),
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "statuses": statuses[label],
+        }
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 1), "endpoints": endpoints}
+
+def print_report(result: dict):
+    print(f"{result['target']} ({result['database']}): {result['requests']} requests, concurrency {result['concurrency']}, "
+          f"{result['elapsed_s']}s -> {result['rps']} req/s")
+    print(f"  {'endpoint':<30} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for label, stats in result["endpoints"].items():
+        print(f"  {label:<30} {stats['count']:>6} {stats['rps']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}  {stats['statuses']}")
+
+def compare(before_path: str, after_path: str):
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+    print(f"{before_path} -> {after_path}: {before['rps']} -> {after['rps']} req/s")
+    print(f"  {'endpoint':<30} {'p50 ms':>24} {'p95 ms':>24} {'p99 ms':>24}")
+    for label, stats in after["endpoints"].items():
+        old = before["endpoints"].get(label)
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (stats[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{old[key]} -> {stats[key]} ({change:+.0f}%)")
+        print(f"  {label:<30} " + " ".join(f"{cell:>24}" for cell in cells))
+
+async def main_async(args):
+    fixtures = load_fixtures()
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        target = args.url
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+        target = "in-process"
+    async with client:
+        if args.warmup:
+            await run(client, fixtures, args.warmup, args.concurrency, args.seed + 1)
+        result = await run(client, fixtures, args.requests, args.concurrency, args.seed)
+    result.update(
+        target=target, database=engine.dialect.name, concurrency=args.concurrency, seed=args.seed,
+        python=platform.python_version(), recorded_at=datetime.utcnow().isoformat(),
+    )
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload API load test")
+    parser.add_argument("--url", help="base URL of a running server; defaults to driving the app in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=100, help="untimed requests first (fills caches and the search index)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write the results as JSON to this path")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two saved runs and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    result = asyncio.run(main_async(args))
+    print_report(result)
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(result, indent=2))
+        print(f"Saved to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# core/cache.py
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, TypeVar
+from uuid import UUID
+import os
+import pickle
+import time
+
+# Read-through cache settings for reference entities (wines, locations, lots, users)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # "memory", "redis" or "none"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))  # Per entity type, per worker
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+class CacheStats:
+    def __init__(self):
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def incr(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+class MemoryBackend:
+    """Bounded LRU with a per-entry TTL, local to one worker process."""
+
+    def __init__(self, stats: CacheStats, max_entries: int, ttl: float):
+        self._stats = stats
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._stats.incr("expirations")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats.incr("evictions")
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+class RedisBackend:
+    """Shared backend so every uvicorn worker sees the same entries and invalidations."""
+
+    def __init__(self, namespace: str, ttl: float):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(REDIS_URL)
+        self._namespace = namespace
+        self._ttl = max(1, int(ttl))
+
+    def _key(self, key: str) -> str:
+        return f"wine-inventory:{self._namespace}:{key}"
+
+    def get(self, key: str):
+        raw = self._client.get(self._key(key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value):
+        self._client.setex(self._key(key), self._ttl, pickle.dumps(value))
+
+    def delete(self, key: str):
+        self._client.delete(self._key(key))
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self._key("*")))
+        if keys:
+            self._client.delete(*keys)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=self._key("*")))
+
+class NullBackend:
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+    def size(self) -> int:
+        return 0
+
+T = TypeVar("T")
+
+_caches: dict[str, "EntityCache"] = {}
+
+class EntityCache(Generic[T]):
+    """Read-through cache of table-model rows keyed by id.
+
+    Entries hold plain field dicts and every hit builds a fresh, detached
+    instance, so callers can never mutate or re-attach a shared object.
+    """
+
+    def __init__(self, namespace: str, model: type[T], max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.namespace = namespace
+        self.model = model
+        self.stats = CacheStats()
+        if CACHE_BACKEND == "redis":
+            self._backend = RedisBackend(namespace, ttl)
+        elif CACHE_BACKEND == "none":
+            self._backend = NullBackend()
+        else:
+            self._backend = MemoryBackend(self.stats, max_entries, ttl)
+        _caches[namespace] = self
+
+    def get(self, key: UUID | str) -> T | None:
+        data = self._backend.get(str(key))
+        if data is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return self.model(**data)
+
+    def get_many(self, keys) -> dict:
+        found = {}
+        for key in keys:
+            entity = self.get(key)
+            if entity is not None:
+                found[key] = entity
+        return found
+
+    def set(self, entity: T, key: UUID | str | None = None):
+        self._backend.set(str(key if key is not None else entity.id), entity.model_dump())
+
+    def fill(self, db, entity: T, key: UUID | str | None = None):
+        """Cache a row just read through `db`, unless it came from a replica that may lag a recent write."""
+        if not db.info.get("replica"):
+            self.set(entity, key)
+
+    def invalidate(self, key: UUID | str):
+        self._backend.delete(str(key))
+        self.stats.incr("invalidations")
+
+    def clear(self):
+        self._backend.clear()
+        self.stats.incr("invalidations")
+
+    def snapshot(self) -> dict:
+        return {**self.stats.snapshot(), "size": self._backend.size(), "backend": CACHE_BACKEND}
+
+def get_cache_stats() -> dict:
+    return {namespace: cache.snapshot() for namespace, cache in _caches.items()}
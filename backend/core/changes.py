@@ -0,0 +1,29 @@
+# core/changes.py
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from uuid import UUID
+from datetime import datetime
+from core.staging import outermost_commit, register_staged
+from models.change_log import ChangeLog, ChangeOp
+
+register_staged("staged_changes")
+
+def record_changes(db: Session, entity: str, changes, op: ChangeOp = ChangeOp.UPSERT):
+    """Queue (entity_id, location_id) pairs for the change log; they are written in the committing transaction."""
+    staged = db.info.setdefault("staged_changes", {})
+    for entity_id, location_id in changes:
+        staged[(entity, entity_id, location_id)] = op
+
+@event.listens_for(Session, "before_commit")
+def _write_staged(session):
+    if not outermost_commit(session):
+        return
+    # Written last, just before COMMIT, so a sequence number is handed out as late as possible
+    staged: dict[tuple[str, UUID, UUID | None], ChangeOp] = session.info.pop("staged_changes", None)
+    if staged:
+        now = datetime.utcnow()
+        session.execute(insert(ChangeLog), [
+            dict(entity=entity, entity_id=entity_id, location_id=location_id, op=op, created_at=now)
+            for (entity, entity_id, location_id), op in staged.items()
+        ])
@@ -1,8 +1,19 @@
 # core/database.py
 
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from contextvars import ContextVar
 from dotenv import load_dotenv
+from fastapi import Request
+from itertools import cycle
+from threading import Lock
 import os
+import time
+from core.metrics import METRICS_ENABLED, instrument_sql, record_pool_wait
 
 # Load environment variables
 load_dotenv()
@@ -10,19 +21,281 @@ load_dotenv()
 # Define DATABASE_URL with a fallback
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool settings (sized per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 disables the timeout
+
+# Optional async mode: route handlers use an async engine instead of the threadpool + sync engine
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Optional read replicas (comma-separated); read-only endpoints are spread across them, writes stay on DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# After a client writes, its reads go to the primary for this long so replica lag cannot hide the write
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_COOKIE = "db_primary_until"
+
+
+class PoolStats:
+    """Checkout wait and in-use counters for one connection pool."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "timeouts": self.timeouts,
+            }
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+def _instrumented_pool_class(base, stats: PoolStats):
+    class InstrumentedPool(base):
+        """Pool that records how long callers wait for a connection."""
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except Exception:
+                stats.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            waited = time.perf_counter() - start
+            stats.record_wait(waited)
+            record_pool_wait(waited)
+            return connection
+
+    return InstrumentedPool
+
+
+def _pool_options(url: str, poolclass) -> dict:
+    # SQLite dev databases keep SQLAlchemy's default pool; the sizing knobs only apply to server databases
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _instrument_engine(engine, stats: PoolStats):
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.record_checkin()
+
+    if METRICS_ENABLED:
+        instrument_sql(engine)
+
+    if DB_STATEMENT_TIMEOUT_MS and engine.dialect.name == "postgresql":
+        @event.listens_for(engine, "connect")
+        def _set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+            cursor.close()
+
+
+def _async_url(url: str) -> str:
+    # Swap the sync driver for its asyncio counterpart
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+class _RequestWrites:
+    __slots__ = ("wrote",)
+
+    def __init__(self):
+        self.wrote = False
+
+# Set by ReadYourWritesMiddleware; a mutable holder so threadpool and greenlet copies of the context share it
+_request_writes: ContextVar[_RequestWrites | None] = ContextVar("request_writes", default=None)
+
+def _track_writes(engine):
+    # Only the primary gets this: any INSERT, UPDATE or DELETE marks the request as a write
+    @event.listens_for(engine, "before_cursor_execute")
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        writes = _request_writes.get()
+        if writes is not None and (context.isinsert or context.isupdate or context.isdelete):
+            writes.wrote = True
+
+
+def _create_engine(url: str, stats: PoolStats):
+    created = create_engine(url, **_pool_options(url, _instrumented_pool_class(QueuePool, stats)))
+    _instrument_engine(created, stats)
+    return created
+
+def _create_async_engine(url: str, stats: PoolStats):
+    created = create_async_engine(url, **_pool_options(url, _instrumented_pool_class(AsyncAdaptedQueuePool, stats)))
+    _instrument_engine(created.sync_engine, stats)
+    return created
+
+
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = _create_engine(DATABASE_URL, pool_stats)
+_track_writes(engine)
 
-# Create a session factory
-SessionLocal = Session(engine)
+# Create a session factory; every request gets its own session and pooled connection
+SessionLocal = sessionmaker(bind=engine, class_=Session)
+
+replica_pool_stats = [PoolStats() for _ in DATABASE_REPLICA_URLS]
+replica_engines = [_create_engine(url, stats) for url, stats in zip(DATABASE_REPLICA_URLS, replica_pool_stats)]
+# Tagged so the entity caches are only filled from the primary
+_replica_sessions = cycle([sessionmaker(bind=replica, class_=Session, info={"replica": True}) for replica in replica_engines]) if replica_engines else None
+
+# The async engine is only built in async mode so the asyncio driver stays optional
+async_engine = None
+AsyncSessionLocal = None
+async_replica_pool_stats = []
+async_replica_engines = []
+_async_replica_sessions = None
+if DB_ASYNC:
+    ASYNC_DATABASE_URL = ASYNC_DATABASE_URL or _async_url(DATABASE_URL)
+    async_engine = _create_async_engine(ASYNC_DATABASE_URL, async_pool_stats)
+    _track_writes(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+    async_replica_pool_stats = [PoolStats() for _ in DATABASE_REPLICA_URLS]
+    async_replica_engines = [
+        _create_async_engine(_async_url(url), stats) for url, stats in zip(DATABASE_REPLICA_URLS, async_replica_pool_stats)
+    ]
+    if async_replica_engines:
+        _async_replica_sessions = cycle([
+            async_sessionmaker(bind=replica, class_=AsyncSession, expire_on_commit=False, info={"replica": True}) for replica in async_replica_engines
+        ])
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
 
 # Dependency for FastAPI or other frameworks
 def get_db():
-    db = SessionLocal
-    try:
+    with SessionLocal() as db:
+        yield db
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# Read-only endpoints: a replica, round robin, unless there are none or the client wrote recently
+def get_read_db(request: Request):
+    factory = SessionLocal if _replica_sessions is None or _pinned_to_primary(request) else next(_replica_sessions)
+    with factory() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if _async_replica_sessions is None or _pinned_to_primary(request) else next(_async_replica_sessions)
+    async with factory() as db:
+        yield db
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware: a request that wrote to the primary pins the client's reads there for a while."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = _RequestWrites()
+        token = _request_writes.set(writes)
+
+        async def send_with_cookie(message):
+            # Sync routes have finished by the time the response starts; streamed bodies only read
+            if message["type"] == "http.response.start" and writes.wrote:
+                until = time.time() + READ_YOUR_WRITES_SECONDS
+                cookie = f"{PRIMARY_COOKIE}={until:.3f}; Max-Age={READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _request_writes.reset(token)
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+    engine.dispose()
+    for replica in replica_engines:
+        replica.dispose()
+
+def _engine_pool_stats(pool, stats: PoolStats) -> dict:
+    result = stats.snapshot()
+    if isinstance(pool, QueuePool):
+        result.update({
+            "pool_size": pool.size(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "idle": pool.checkedin(),
+        })
+    return result
+
+def get_pool_stats() -> dict:
+    stats = _engine_pool_stats(engine.pool, pool_stats)
+    if async_engine is not None:
+        stats["async"] = _engine_pool_stats(async_engine.pool, async_pool_stats)
+    if replica_engines:
+        stats["replicas"] = [_engine_pool_stats(replica.pool, replica_stats) for replica, replica_stats in zip(replica_engines, replica_pool_stats)]
+    if async_replica_engines:
+        stats["async_replicas"] = [
+            _engine_pool_stats(replica.pool, replica_stats) for replica, replica_stats in zip(async_replica_engines, async_replica_pool_stats)
+        ]
+    return stats
 
 # Optional: Create all tables (uncomment to run once or handle via Alembic)
-# SQLModel.metadata.create_all(engine)
\ No newline at end of file
+# SQLModel.metadata.create_all(engine)
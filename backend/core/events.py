@@ -0,0 +1,107 @@
+# core/events.py
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from threading import Lock
+from uuid import UUID
+from datetime import datetime
+import asyncio
+import itertools
+import json
+import os
+from core.staging import outermost_commit, register_staged
+
+# Per-subscriber buffer; a client that falls this far behind is disconnected and left to reconnect
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+class Event:
+    """One published event, encoded once as an SSE frame and shared by every subscriber."""
+
+    __slots__ = ("location_ids", "frame")
+
+    def __init__(self, kind: str, payload: dict, location_ids: set, sequence: int):
+        self.location_ids = location_ids
+        data = json.dumps(payload, default=_json_default, separators=(",", ":"))
+        self.frame = f"id: {sequence}\nevent: {kind}\ndata: {data}\n\n".encode()
+
+class Subscriber:
+    def __init__(self, location_id: UUID | None):
+        self.location_id = location_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.dropped = False
+
+class EventBroker:
+    """In-process fan-out from committing sessions (any thread) to subscribers on the event loop."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._subscribers: set[Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._sequence = itertools.count(1)
+        self.dropped_total = 0
+
+    def subscribe(self, location_id: UUID | None = None) -> Subscriber:
+        subscriber = Subscriber(location_id)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, events: list[tuple[str, dict, set]]):
+        with self._lock:
+            if not self._subscribers:
+                return
+            loop = self._loop
+            encoded = [Event(kind, payload, location_ids, next(self._sequence)) for kind, payload, location_ids in events]
+        loop.call_soon_threadsafe(self._fan_out, encoded)
+
+    def _fan_out(self, events: list[Event]):
+        # Runs on the event loop, so queue operations need no further locking
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            for item in events:
+                if subscriber.location_id is not None and subscriber.location_id not in item.location_ids:
+                    continue
+                try:
+                    subscriber.queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    self._drop(subscriber)
+                    break
+
+    def _drop(self, subscriber: Subscriber):
+        # Discard the backlog and wake the stream with a sentinel so it closes now
+        self.unsubscribe(subscriber)
+        subscriber.dropped = True
+        self.dropped_total += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "dropped": self.dropped_total}
+
+broker = EventBroker()
+
+register_staged("staged_events")
+
+def stage_events(db: Session, events: list[tuple[str, dict, set]]):
+    """Queue (kind, payload, location_ids) events on the session; they are published only if it commits."""
+    db.info.setdefault("staged_events", []).extend(events)
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session):
+    if not outermost_commit(session):
+        return
+    events = session.info.pop("staged_events", None)
+    if events:
+        broker.publish(events)
@@ -0,0 +1,193 @@
+# core/metrics.py
+
+from contextvars import ContextVar
+from threading import Lock
+from sqlalchemy import event
+import logging
+import os
+import time
+
+# Per-request instrumentation settings
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# More statements than this in one request is logged as a likely N+1 pattern
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "25"))
+# How many statements a slow-request log line keeps
+SLOW_LOG_STATEMENTS = 10
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+logger = logging.getLogger(__name__)
+
+class RequestMetrics:
+    """SQL and pool counters for the request running in the current context."""
+
+    __slots__ = ("statements", "sql_seconds", "pool_wait_seconds", "slowest")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.slowest: list[tuple[float, str]] = []
+
+    def record_statement(self, seconds: float, statement: str):
+        self.statements += 1
+        self.sql_seconds += seconds
+        if len(self.slowest) < SLOW_LOG_STATEMENTS or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: -item[0])
+            del self.slowest[SLOW_LOG_STATEMENTS:]
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+def record_pool_wait(seconds: float):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.pool_wait_seconds += seconds
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.n_plus_one = 0
+        self.slow = 0
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = Lock()
+        self._routes: dict[tuple[str, str, str], RouteStats] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, metrics: RequestMetrics, slow: bool, n_plus_one: bool):
+        key = (method, route, str(status))
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.latency.observe(seconds)
+            stats.statements.observe(metrics.statements)
+            stats.sql_seconds += metrics.sql_seconds
+            stats.pool_wait_seconds += metrics.pool_wait_seconds
+            stats.slow += slow
+            stats.n_plus_one += n_plus_one
+
+    def render(self) -> str:
+        series = {
+            "http_request_duration_seconds": ("histogram", "Request latency by route", []),
+            "http_request_sql_statements": ("histogram", "SQL statements issued per request", []),
+            "http_request_sql_seconds_total": ("counter", "Time spent executing SQL", []),
+            "http_request_pool_wait_seconds_total": ("counter", "Time spent waiting for a pooled connection", []),
+            "http_slow_requests_total": ("counter", f"Requests slower than {SLOW_REQUEST_MS:g} ms", []),
+            "http_n_plus_one_requests_total": ("counter", f"Requests issuing more than {N_PLUS_ONE_THRESHOLD} statements", []),
+        }
+        with self._lock:
+            for (method, route, status), stats in sorted(self._routes.items()):
+                labels = f'method="{method}",route="{route}",status="{status}"'
+                series["http_request_duration_seconds"][2].extend(stats.latency.lines("http_request_duration_seconds", labels))
+                series["http_request_sql_statements"][2].extend(stats.statements.lines("http_request_sql_statements", labels))
+                series["http_request_sql_seconds_total"][2].append(f"http_request_sql_seconds_total{{{labels}}} {stats.sql_seconds:.6f}")
+                series["http_request_pool_wait_seconds_total"][2].append(f"http_request_pool_wait_seconds_total{{{labels}}} {stats.pool_wait_seconds:.6f}")
+                series["http_slow_requests_total"][2].append(f"http_slow_requests_total{{{labels}}} {stats.slow}")
+                series["http_n_plus_one_requests_total"][2].append(f"http_n_plus_one_requests_total{{{labels}}} {stats.n_plus_one}")
+        lines = []
+        for name, (kind, help_text, samples) in series.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+def render_gauges(name: str, help_text: str, values: dict[str, float], label: str) -> str:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f'{name}{{{label}="{key}"}} {value}' for key, value in values.items() if isinstance(value, (int, float)))
+    return "\n".join(lines) + "\n"
+
+def instrument_sql(engine):
+    """Attribute every statement run on `engine` to the request in the current context."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.record_statement(time.perf_counter() - started, statement)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: times each request until its last body chunk is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status = 500
+        event_stream = False
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(name == b"content-type" and value.startswith(b"text/event-stream") for name, value in message.get("headers", []))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            # Event streams stay open for the life of the client; their duration is not request latency
+            if not event_stream:
+                seconds = time.perf_counter() - start
+                route = scope.get("route")
+                # Route templates keep label cardinality bounded; unmatched paths share one series
+                route_path = getattr(route, "path", "unmatched")
+                slow = seconds * 1000 >= SLOW_REQUEST_MS
+                n_plus_one = metrics.statements > N_PLUS_ONE_THRESHOLD
+                registry.observe(scope["method"], route_path, status, seconds, metrics, slow, n_plus_one)
+                if n_plus_one:
+                    logger.warning("Possible N+1: %s %s issued %d SQL statements", scope["method"], scope["path"], metrics.statements)
+                if slow:
+                    statements = "\n".join(f"  {duration * 1000:.1f} ms  {' '.join(sql.split())[:500]}" for duration, sql in metrics.slowest)
+                    logger.warning(
+                        "Slow request: %s %s took %.1f ms (sql %.1f ms in %d statements, pool wait %.1f ms)\n%s",
+                        scope["method"], scope["path"], seconds * 1000, metrics.sql_seconds * 1000,
+                        metrics.statements, metrics.pool_wait_seconds * 1000, statements,
+                    )
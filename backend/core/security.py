@@ -0,0 +1,87 @@
+# core/security.py
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from uuid import UUID
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import bcrypt
+
+# Signing key for access tokens; required with AUTH_REQUIRED. Without one, a random per-process key is used
+# and tokens only verify in the process that issued them, until it restarts.
+AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", "3600"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt holds a core for ~250 ms at 12 rounds, so it gets its own bounded pool rather than
+# the event loop or the threadpool that sync routes and DB work run in
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "4"))
+# bcrypt ignores everything past this many bytes (and bcrypt>=5 refuses it)
+MAX_PASSWORD_BYTES = 72
+
+_signing_key = (AUTH_SECRET_KEY or secrets.token_urlsafe(32)).encode()
+_bcrypt_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_TOKEN_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+
+def _check(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+    except ValueError:
+        # Not a bcrypt hash (or an over-long password): never a match
+        return False
+
+@cache
+def _dummy_hash() -> str:
+    return _hash(secrets.token_urlsafe(16))
+
+async def _offload(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool, fn, *args)
+
+async def hash_password(password: str) -> str:
+    return await _offload(_hash, password)
+
+async def verify_password(password: str, hashed: str | None) -> bool:
+    """Check a password against a stored hash; with no hash, spend the same time and fail."""
+    if hashed is None:
+        await _offload(_check, password, await _offload(_dummy_hash))
+        return False
+    return await _offload(_check, password, hashed)
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(_signing_key, signing_input.encode(), hashlib.sha256).digest())
+
+def create_access_token(subject: UUID, ttl: int = ACCESS_TOKEN_TTL_SECONDS) -> str:
+    """HS256 JWT carrying only the user id and expiry; role and is_active are looked up on use."""
+    now = int(time.time())
+    header = _b64encode(json.dumps(_TOKEN_HEADER, separators=(",", ":")).encode())
+    payload = _b64encode(json.dumps({"sub": str(subject), "iat": now, "exp": now + ttl}, separators=(",", ":")).encode())
+    return f"{header}.{payload}.{_sign(f'{header}.{payload}')}"
+
+def decode_access_token(token: str) -> UUID | None:
+    """The token's user id, or None if it is malformed, forged or expired."""
+    try:
+        header, payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(f"{header}.{payload}")):
+            return None
+        if json.loads(_b64decode(header)) != _TOKEN_HEADER:
+            return None
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] <= time.time():
+            return None
+        return UUID(claims["sub"])
+    except (ValueError, KeyError, TypeError):
+        return None
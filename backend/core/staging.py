@@ -0,0 +1,45 @@
+# core/staging.py
+#
+# Work queued on a session for its COMMIT (change-log rows, stock events). SQLAlchemy fires the
+# commit and rollback session events for savepoints too, so commit handlers check
+# outermost_commit() and a rolled-back savepoint drops only what was staged inside it.
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# session.info keys holding staged lists or dicts, in staging order
+_staged_keys: list[str] = []
+
+def register_staged(key: str):
+    _staged_keys.append(key)
+
+def outermost_commit(session: Session) -> bool:
+    """Whether a before_commit/after_commit event is the real COMMIT rather than a savepoint release."""
+    return not session.in_nested_transaction()
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session, transaction):
+    if transaction.nested:
+        marks = session.info.setdefault("staging_marks", {})
+        marks[transaction] = {key: len(session.info.get(key, ())) for key in _staged_keys}
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_savepoint(session, previous_transaction):
+    # The outermost transaction is handled by _discard_all once it ends
+    marks = session.info.get("staging_marks", {}).pop(previous_transaction, None)
+    if marks is None:
+        return
+    for key, length in marks.items():
+        staged = session.info.get(key)
+        if isinstance(staged, dict):
+            session.info[key] = dict(list(staged.items())[:length])
+        elif staged is not None:
+            del staged[length:]
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_all(session, transaction):
+    # Commit handlers have taken their work by now; whatever is left was rolled back or closed
+    if transaction.parent is None:
+        session.info.pop("staging_marks", None)
+        for key in _staged_keys:
+            session.info.pop(key, None)
@@ -0,0 +1,59 @@
+# domain/archival.py
+
+from sqlmodel import Session, select
+from sqlalchemy import func
+from uuid import uuid4
+from datetime import datetime
+import os
+from core.database import SessionLocal
+from models.movement import Movement
+from models.movement_archive import MovementArchive
+from domain.movement_archive import archive_path, write_archive
+from domain.partitions import add_months, drop_movement_period, ensure_movement_partitions, month_start
+from domain.snapshot import checkpoint_at
+
+# Months younger than this stay in the live table; older closed months move to the archive
+MOVEMENT_ARCHIVE_AFTER_MONTHS = int(os.getenv("MOVEMENT_ARCHIVE_AFTER_MONTHS", "12"))
+ARCHIVE_BATCH_SIZE = 10000
+
+def archive_period(db: Session, period_start: datetime, period_end: datetime) -> MovementArchive:
+    """Move every movement in [period_start, period_end) to a Parquet file and out of the live table."""
+    # As-of queries at or after the boundary replay from this checkpoint and never need the archived rows
+    checkpoint_at(db, period_end)
+
+    archive = MovementArchive(id=uuid4(), period_start=period_start, period_end=period_end, path="", row_count=0, size_bytes=0)
+    path = archive_path(period_start, archive.id)
+    query = (
+        select(Movement.__table__)
+        .where(Movement.created_at >= period_start, Movement.created_at < period_end)
+        .order_by(Movement.created_at, Movement.id)
+        .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+    )
+    archive.row_count, archive.size_bytes = write_archive(path, db.execute(query).mappings().partitions())
+    archive.path = str(path)
+    # The archive record and the removal of the live rows commit together
+    db.add(archive)
+    drop_movement_period(db, period_start, period_end)
+    db.commit()
+    db.refresh(archive)
+    return archive
+
+def archive_movements(db: Session, before: datetime | None = None) -> list[MovementArchive]:
+    """Archive each whole month older than `before` (default: MOVEMENT_ARCHIVE_AFTER_MONTHS ago), oldest first."""
+    cutoff = month_start(before or add_months(month_start(datetime.utcnow()), -MOVEMENT_ARCHIVE_AFTER_MONTHS))
+    archives = []
+    while True:
+        oldest = db.exec(select(func.min(Movement.created_at))).one()
+        if oldest is None or add_months(month_start(oldest), 1) > cutoff:
+            break
+        period_start = month_start(oldest)
+        archives.append(archive_period(db, period_start, add_months(period_start, 1)))
+    # Each period's commit expired the ones before it
+    for archive in archives:
+        db.refresh(archive)
+    return archives
+
+def run_archival(before: datetime | None = None) -> tuple[list[str], list[MovementArchive]]:
+    with SessionLocal() as db:
+        partitions = ensure_movement_partitions(db)
+        return partitions, archive_movements(db, before)
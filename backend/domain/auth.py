@@ -0,0 +1,74 @@
+# domain/auth.py
+
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
+import os
+from core.database import DB_ASYNC, get_db, get_async_db
+from core.security import AUTH_SECRET_KEY, ACCESS_TOKEN_TTL_SECONDS, create_access_token, decode_access_token, verify_password
+from models.user import User
+from domain.user import UserPrincipal, get_principal, get_principal_async, get_user_by_email, get_user_by_email_async
+
+# Off by default so existing clients keep working; when on, every route but /auth/token needs a bearer token
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() in ("1", "true", "yes")
+if AUTH_REQUIRED and not AUTH_SECRET_KEY:
+    # A random per-process key would fail tokens across workers and log everyone out on every restart
+    raise RuntimeError("AUTH_REQUIRED is on but AUTH_SECRET_KEY is not set")
+
+_bearer = HTTPBearer(auto_error=False)
+
+class LoginRequest(SQLModel):
+    email: str
+    password: str
+
+class Token(SQLModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+class InvalidCredentialsError(HTTPException):
+    def __init__(self, detail: str = "Could not validate credentials"):
+        super().__init__(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+async def _issue_token(user: User | None, password: str) -> Token:
+    # An unknown email still costs one bcrypt check, so timing does not reveal which emails exist
+    if not await verify_password(password, user.hashed_password if user is not None else None):
+        raise InvalidCredentialsError("Incorrect email or password")
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
+    return Token(access_token=create_access_token(user.id), expires_in=ACCESS_TOKEN_TTL_SECONDS)
+
+async def login(db: Session, credentials: LoginRequest) -> Token:
+    user = await run_in_threadpool(get_user_by_email, db, credentials.email)
+    return await _issue_token(user, credentials.password)
+
+async def login_async(db: AsyncSession, credentials: LoginRequest) -> Token:
+    user = await get_user_by_email_async(db, credentials.email)
+    return await _issue_token(user, credentials.password)
+
+def _user_id(credentials: HTTPAuthorizationCredentials | None):
+    if credentials is None:
+        raise InvalidCredentialsError("Not authenticated")
+    user_id = decode_access_token(credentials.credentials)
+    if user_id is None:
+        raise InvalidCredentialsError("Invalid or expired token")
+    return user_id
+
+def _active(principal: UserPrincipal | None) -> UserPrincipal:
+    if principal is None or not principal.is_active:
+        raise InvalidCredentialsError()
+    return principal
+
+def get_current_user(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer), db: Session = Depends(get_db)) -> UserPrincipal:
+    return _active(get_principal(db, _user_id(credentials)))
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserPrincipal:
+    return _active(await get_principal_async(db, _user_id(credentials)))
+
+# The dependency routes should use: a signature check, then usually a principal cache hit
+current_user = get_current_user_async if DB_ASYNC else get_current_user
@@ -0,0 +1,35 @@
+# domain/batch.py
+
+from sqlmodel import Session, select
+from fastapi import HTTPException, Query
+from uuid import UUID
+from core.cache import EntityCache
+
+MAX_BATCH_IDS = 1000
+
+def _check_batch_size(ids: list):
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_IDS} ids")
+
+def parse_ids(ids: list[str] | None = Query(None, description="Comma-separated or repeated ids")) -> list[UUID] | None:
+    if ids is None:
+        return None
+    try:
+        parsed = [UUID(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be UUIDs")
+    _check_batch_size(parsed)
+    return parsed
+
+def fetch_by_ids(db: Session, model, ids: list[UUID], cache: EntityCache | None = None) -> list:
+    """Rows for `ids` in request order, unknown ids skipped: cache hits first, then one IN query for the rest."""
+    _check_batch_size(ids)
+    ids = list(dict.fromkeys(ids))
+    found = cache.get_many(ids) if cache is not None else {}
+    missing = [entity_id for entity_id in ids if entity_id not in found]
+    if missing:
+        for row in db.exec(select(model).where(model.id.in_(missing))):
+            found[row.id] = row
+            if cache is not None:
+                cache.fill(db, row)
+    return [found[entity_id] for entity_id in ids if entity_id in found]
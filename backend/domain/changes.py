@@ -0,0 +1,104 @@
+# domain/changes.py
+
+from sqlmodel import Session, select, SQLModel
+from sqlalchemy import delete, or_
+from sqlalchemy.orm import aliased
+from uuid import UUID
+from datetime import datetime, timedelta
+import os
+from models.change_log import ChangeLog, ChangeOp
+from models.location import Location
+from models.movement import Movement
+from models.stock import Stock
+from models.storage_lot import StorageLot
+from models.wine_sku import WineSKU
+from domain.batch import fetch_by_ids
+from domain.pagination import decode_cursor, encode_cursor
+
+# Entries younger than this are held back: a transaction that drew an earlier sequence number
+# may still be committing, and a cursor must never move past it. Sequence numbers are drawn by
+# the change-log INSERT just before COMMIT (core/changes.py), so how long the transaction ran
+# does not matter, only how long its COMMIT takes. This is a bound, not a guarantee: entries of
+# a COMMIT that stalls for longer than this (a lock wait, a synchronous replica that is down)
+# land below cursors already handed out and are skipped by clients holding those cursors.
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "5"))
+DEFAULT_CHANGE_BATCH = 500
+
+CHANGE_SORT_KEY = [ChangeLog.seq]
+
+# change-log entity -> (table model, ChangeBatch field)
+_ENTITIES = {
+    "wine": (WineSKU, "wines"),
+    "location": (Location, "locations"),
+    "storage_lot": (StorageLot, "storage_lots"),
+    "stock": (Stock, "stocks"),
+    "movement": (Movement, "movements"),
+}
+
+class DeletedRow(SQLModel):
+    entity: str
+    id: UUID
+
+class ChangeBatch(SQLModel):
+    # Current state of every row changed since the cursor, each row once
+    wines: list[WineSKU] = []
+    locations: list[Location] = []
+    storage_lots: list[StorageLot] = []
+    stocks: list[Stock] = []
+    movements: list[Movement] = []
+    deleted: list[DeletedRow] = []
+    # Movements moved out of the live table into Parquet archives; still readable through movement history
+    archived: list[UUID] = []
+    next_cursor: str  # Pass back as `since`; unchanged when there is nothing new
+    has_more: bool
+
+def get_changes(db: Session, since: str | None, location_id: UUID | None, limit: int = DEFAULT_CHANGE_BATCH) -> ChangeBatch:
+    """Rows created, updated or deleted after the `since` cursor; with `location_id`, catalog rows plus that site's rows.
+
+    No `since`, or `since=0`, starts from the beginning of the log. Movements that archival moved
+    out of the live table are listed by id under `archived`, never under `deleted`.
+    """
+    after = decode_cursor(since, CHANGE_SORT_KEY)[0] if since and since != "0" else 0
+    query = select(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op, ChangeLog.created_at).where(ChangeLog.seq > after)
+    if location_id is not None:
+        query = query.where(or_(ChangeLog.location_id.is_(None), ChangeLog.location_id == location_id))
+    entries = db.execute(query.order_by(ChangeLog.seq).limit(limit + 1)).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Serve only the settled prefix; the rest comes on a later poll
+    horizon = datetime.utcnow() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    settled = next((index for index, entry in enumerate(entries) if entry.created_at > horizon), None)
+    if settled is not None:
+        entries = entries[:settled]
+        has_more = False
+
+    # A row changed several times in the window is sent once, in its latest state
+    latest = {(entry.entity, entry.entity_id): entry.op for entry in entries}
+    batch = ChangeBatch(next_cursor=encode_cursor([entries[-1].seq if entries else after]), has_more=has_more)
+    for entity, (model, field) in _ENTITIES.items():
+        ids = [entity_id for (kind, entity_id), op in latest.items() if kind == entity and op == ChangeOp.UPSERT]
+        # Straight from the table: the entity caches may lag behind other workers' writes
+        rows = fetch_by_ids(db, model, ids) if ids else []
+        setattr(batch, field, rows)
+        present = {row.id for row in rows}
+        gone = [entity_id for (kind, entity_id), op in latest.items() if kind == entity and (op == ChangeOp.DELETE or entity_id not in present)]
+        # The ledger is append-only: archival (domain/archival.py) is the only thing that removes a movement
+        if entity == "movement":
+            batch.archived.extend(gone)
+        else:
+            batch.deleted.extend(DeletedRow(entity=entity, id=entity_id) for entity_id in gone)
+    return batch
+
+def compact_change_log(db: Session) -> int:
+    """Drop entries superseded by a later one for the same row and site; every cursor still reaches each row's latest state."""
+    newer = aliased(ChangeLog)
+    superseded = select(newer.seq).where(
+        newer.entity == ChangeLog.entity,
+        newer.entity_id == ChangeLog.entity_id,
+        newer.location_id.is_not_distinct_from(ChangeLog.location_id),
+        newer.seq > ChangeLog.seq,
+    ).exists()
+    result = db.execute(delete(ChangeLog).where(superseded))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,96 @@
+# domain/conditional.py
+#
+# Conditional GET: ETag / Last-Modified validators built from (id, updated_at), so a revalidation
+# is answered from a version query that reads two columns instead of loading and serializing rows.
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import Request, Response
+from typing import Awaitable, Callable, NamedTuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+from domain.pagination import Page, keyset_query
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime | None
+
+def _validators(versions: list[tuple], has_more: bool = False) -> Validators:
+    digest = hashlib.blake2b(digest_size=12)
+    for entity_id, updated_at in versions:
+        digest.update(f"{entity_id}:{updated_at.isoformat()};".encode())
+    digest.update(b"+" if has_more else b".")
+    last_modified = max((updated_at for _, updated_at in versions), default=None)
+    return Validators(f'"{digest.hexdigest()}"', last_modified)
+
+def entity_validators(entity) -> Validators:
+    return _validators([(entity.id, entity.updated_at)])
+
+def page_validators(page: Page) -> Validators:
+    return _validators([(item.id, item.updated_at) for item in page.items], page.next_cursor is not None)
+
+def entity_version(db: Session, model, entity_id) -> Validators | None:
+    row = db.exec(select(model.id, model.updated_at).where(model.id == entity_id)).first()
+    return _validators([tuple(row)]) if row is not None else None
+
+async def entity_version_async(db: AsyncSession, model, entity_id) -> Validators | None:
+    row = (await db.exec(select(model.id, model.updated_at).where(model.id == entity_id))).first()
+    return _validators([tuple(row)]) if row is not None else None
+
+def page_version(db: Session, query, key_columns: list, cursor: str | None, limit: int, descending: bool = False) -> Validators:
+    """Validators of the page `paginate` would return, from the (id, updated_at) columns alone."""
+    model = query.column_descriptions[0]["entity"]
+    versions = db.execute(keyset_query(query.with_only_columns(model.id, model.updated_at), key_columns, cursor, limit, descending)).all()
+    return _validators([tuple(row) for row in versions[:limit]], len(versions) > limit)
+
+def _headers(validators: Validators) -> dict:
+    headers = {"ETag": validators.etag}
+    if validators.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(validators.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def _matches(request: Request, validators: Validators) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or validators.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # HTTP dates have whole-second resolution
+    return validators.last_modified.replace(microsecond=0) <= since
+
+def _revalidating(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def _not_modified_response(request: Request, validators: Validators | None) -> Response | None:
+    if validators is None or not _matches(request, validators):
+        return None
+    return Response(status_code=304, headers=_headers(validators))
+
+def not_modified(request: Request, version: Callable[[], Validators | None]) -> Response | None:
+    """A 304 response when the client's cached copy is still current, otherwise None; `version` runs only for revalidations."""
+    if not _revalidating(request):
+        return None
+    return _not_modified_response(request, version())
+
+async def not_modified_async(request: Request, version: Callable[[], Awaitable[Validators | None]]) -> Response | None:
+    if not _revalidating(request):
+        return None
+    return _not_modified_response(request, await version())
+
+def with_validators(response: Response, content, validators: Validators):
+    # Validators describe the body actually sent, which may come from the entity cache
+    if isinstance(content, Response):
+        content.headers.update(_headers(validators))
+    else:
+        response.headers.update(_headers(validators))
+    return content
@@ -0,0 +1,53 @@
+# domain/events.py
+
+from sqlmodel import Session
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+import asyncio
+from core.events import EVENT_KEEPALIVE_SECONDS, broker, stage_events
+
+def _movement_event(movement: dict) -> tuple[str, dict, set]:
+    payload = {
+        name: movement[name] for name in (
+            "id", "batch_ref", "sku_id", "quantity", "movement_type",
+            "from_location_id", "from_lot_id", "to_location_id", "to_lot_id", "created_at",
+        )
+    }
+    payload["movement_type"] = movement["movement_type"].value
+    locations = {location_id for location_id in (movement["from_location_id"], movement["to_location_id"]) if location_id is not None}
+    return "movement", payload, locations
+
+def _stock_event(key: tuple, delta: int) -> tuple[str, dict, set]:
+    sku_id, lot_id, location_id = key
+    return "stock", {"sku_id": sku_id, "lot_id": lot_id, "location_id": location_id, "delta": delta}, {location_id}
+
+def stage_stock_events(db: Session, movements: list[dict], deltas: dict):
+    """Publish the posted movements and their net stock deltas once the session commits."""
+    events = [_movement_event(movement) for movement in movements]
+    events.extend(_stock_event(key, delta) for key, delta in deltas.items() if delta != 0)
+    stage_events(db, events)
+
+async def _event_frames(location_id: UUID | None):
+    subscriber = broker.subscribe(location_id)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                item = await asyncio.wait_for(subscriber.queue.get(), EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment frame: keeps proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            if item is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            yield item.frame
+    finally:
+        broker.unsubscribe(subscriber)
+
+def stream_stock_events(location_id: UUID | None) -> StreamingResponse:
+    return StreamingResponse(
+        _event_frames(location_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,73 @@
+# domain/expand.py
+
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from typing import Generic, TypeVar
+from models.location import Location
+from models.storage_lot import StorageLot
+from models.wine_sku import WineSKU
+from domain.location import get_locations_by_ids
+from domain.pagination import Page
+from domain.storage_lot import get_storage_lots_by_ids
+from domain.user import UserRead, get_users_by_ids, user_reads
+from domain.wine_sku import get_wines_by_ids
+
+T = TypeVar("T")
+
+class Included(SQLModel):
+    wines: list[WineSKU] = []
+    locations: list[Location] = []
+    storage_lots: list[StorageLot] = []
+    users: list[UserRead] = []
+
+class ExpandedPage(Page[T], Generic[T]):
+    # Related entities side-loaded once per page instead of nested in every item
+    included: Included | None = None
+
+class ExpandedItem(BaseModel, Generic[T]):
+    # A single entity with the same side-loaded block as a page
+    item: T
+    included: Included
+
+# expand name -> (Included field, reference attributes on the items, batch loader)
+_EXPANSIONS = {
+    "sku": ("wines", ("sku_id",), get_wines_by_ids),
+    "location": ("locations", ("location_id", "from_location_id", "to_location_id"), get_locations_by_ids),
+    "lot": ("storage_lots", ("lot_id", "from_lot_id", "to_lot_id"), get_storage_lots_by_ids),
+    "user": ("users", ("performed_by", "approved_by"), lambda db, ids: user_reads(get_users_by_ids(db, ids))),
+}
+
+def parse_expand(expand: list[str] | None = Query(None, description=f"Comma-separated or repeated: {', '.join(_EXPANSIONS)}")) -> list[str]:
+    names = [name.strip() for value in expand or [] for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in _EXPANSIONS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown expand {', '.join(unknown)}; expected {', '.join(_EXPANSIONS)}")
+    return list(dict.fromkeys(names))
+
+def include_related(db: Session, items: list, expand: list[str]) -> Included:
+    """Load the entities the items reference, one batch lookup per expanded type whatever the page size."""
+    included = Included()
+    for name in expand:
+        field, attributes, load = _EXPANSIONS[name]
+        ids = {getattr(item, attribute) for item in items for attribute in attributes if getattr(item, attribute, None) is not None}
+        if ids:
+            setattr(included, field, load(db, sorted(ids)))
+    return included
+
+def expanded_page(db: Session, page: Page, expand: list[str]) -> ExpandedPage:
+    if not expand:
+        return page
+    return ExpandedPage(items=page.items, next_cursor=page.next_cursor, included=include_related(db, page.items, expand))
+
+def expanded_item(db: Session, item, expand: list[str]):
+    if not expand:
+        return item
+    return ExpandedItem(item=item, included=include_related(db, [item], expand))
+
+async def expanded_item_async(db: AsyncSession, item, expand: list[str]):
+    if not expand:
+        return item
+    # The batch loaders are synchronous; run_sync hands them the session behind the async one
+    return ExpandedItem(item=item, included=await db.run_sync(include_related, [item], expand))
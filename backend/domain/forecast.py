@@ -0,0 +1,238 @@
+# domain/forecast.py
+#
+# Depletion rates, days of cover and reorder points for every (sku, location) at once.
+# Daily depleted quantities are held in one NumPy matrix that is topped up from the
+# movements committed since its watermark, so a refresh never rereads the whole ledger.
+# Needs the optional 'numpy' package.
+
+from sqlmodel import Session, select, SQLModel
+from uuid import UUID
+from datetime import datetime, timedelta
+from threading import Lock
+import math
+import os
+import time
+from models.movement import Movement, MovementType
+from models.stock_rollup import StockRollup
+from domain.movement_archive import archived_columns
+from domain.snapshot import SNAPSHOT_SETTLE_SECONDS
+
+# Days of history behind the current depletion rate
+FORECAST_WINDOW_DAYS = int(os.getenv("FORECAST_WINDOW_DAYS", "28"))
+# How stale the forecast may get before a request folds in newer movements
+FORECAST_REFRESH_SECONDS = float(os.getenv("FORECAST_REFRESH_SECONDS", "60"))
+REORDER_LEAD_TIME_DAYS = float(os.getenv("REORDER_LEAD_TIME_DAYS", "14"))
+# Days of demand a suggested order covers beyond the reorder point
+REORDER_COVER_DAYS = float(os.getenv("REORDER_COVER_DAYS", "30"))
+# Safety stock in standard deviations of daily demand; 1.65 is about a 95% service level
+REORDER_SERVICE_Z = float(os.getenv("REORDER_SERVICE_Z", "1.65"))
+
+# Seasonality compares the window a year ago with the one after it, so that much history is kept
+_HISTORY_DAYS = 365 + FORECAST_WINDOW_DAYS
+_SEASONAL_RANGE = (0.5, 2.0)
+_DEPLETING_TYPES = [MovementType.DEPLETION, MovementType.OUTBOUND]
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise RuntimeError("Reorder suggestions require the 'numpy' package") from exc
+    return numpy
+
+class ReorderSuggestion(SQLModel):
+    sku_id: UUID
+    location_id: UUID
+    on_hand: int
+    daily_rate: float  # Seasonally adjusted units per day
+    seasonal_factor: float
+    days_of_cover: float
+    safety_stock: int
+    reorder_point: int
+    suggested_quantity: int
+
+class DepletionForecast:
+    """In-process matrix of daily depleted quantities, one row per (sku, location), and the rates derived from it."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._clear()
+
+    def _clear(self):
+        self._built = False
+        self._rows: dict[tuple[UUID, UUID], int] = {}
+        self._sku_ids: list[UUID] = []
+        self._location_ids: list[UUID] = []
+        self._daily = None  # int32, _HISTORY_DAYS columns, the last one is _last_day
+        self._last_day = None
+        self._watermark: datetime | None = None
+        self._forecast = None
+        self._refreshed_at = 0.0
+
+    def _row(self, sku_id: UUID, location_id: UUID) -> int:
+        key = (sku_id, location_id)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._sku_ids)
+            self._sku_ids.append(sku_id)
+            self._location_ids.append(location_id)
+        return row
+
+    def _advance(self, np, day):
+        # Slide the matrix so its last column is `day`
+        shift = int((day - self._last_day).astype(int))
+        if shift >= _HISTORY_DAYS:
+            self._daily[:] = 0
+        elif shift > 0:
+            fresh = np.zeros((self._daily.shape[0], shift), dtype=np.int32)
+            self._daily = np.concatenate([self._daily[:, shift:], fresh], axis=1)
+        self._last_day = day
+
+    def _fold(self, np, sku_ids, location_ids, quantities, created_at):
+        # Caller holds the lock; arguments are equal-length columns
+        column = _HISTORY_DAYS - 1 - (self._last_day - created_at.astype("datetime64[D]")).astype(np.int64)
+        keep = (column >= 0) & (location_ids != None)  # noqa: E711 - elementwise on an object array
+        if not keep.any():
+            return
+        skus, sku_codes = np.unique(sku_ids[keep], return_inverse=True)
+        locations, location_codes = np.unique(location_ids[keep], return_inverse=True)
+        pairs, pair_codes = np.unique(sku_codes * len(locations) + location_codes, return_inverse=True)
+        pair_rows = np.array([self._row(skus[pair // len(locations)], locations[pair % len(locations)]) for pair in pairs], dtype=np.int64)
+        if len(self._sku_ids) > self._daily.shape[0]:
+            grown = np.zeros((len(self._sku_ids) - self._daily.shape[0], _HISTORY_DAYS), dtype=np.int32)
+            self._daily = np.concatenate([self._daily, grown])
+        np.add.at(self._daily, (pair_rows[pair_codes], column[keep]), quantities[keep].astype(np.int32))
+
+    def _load(self, db: Session, np):
+        # Caller holds the lock: folding is additive, so two refreshes must never pull the same rows
+        until = datetime.utcnow() - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+        day = np.datetime64(until.date(), "D")
+        if not self._built:
+            self._daily = np.zeros((0, _HISTORY_DAYS), dtype=np.int32)
+            self._last_day = day
+            self._watermark = datetime.combine(until.date() - timedelta(days=_HISTORY_DAYS), datetime.min.time())
+        self._advance(np, day)
+
+        conditions = [("movement_type", "in", [kind.value for kind in _DEPLETING_TYPES])]
+        for table in archived_columns(db, self._watermark, until, ["sku_id", "from_location_id", "quantity", "created_at"], conditions):
+            self._fold(
+                np,
+                np.array([UUID(value) for value in table.column("sku_id").to_pylist()], dtype=object),
+                np.array([UUID(value) if value else None for value in table.column("from_location_id").to_pylist()], dtype=object),
+                table.column("quantity").to_numpy(),
+                table.column("created_at").to_numpy(),
+            )
+
+        # One columnar pull of everything settled since the last one
+        rows = db.execute(
+            select(Movement.sku_id, Movement.from_location_id, Movement.quantity, Movement.created_at)
+            .where(
+                Movement.movement_type.in_(_DEPLETING_TYPES),
+                Movement.created_at > self._watermark,
+                Movement.created_at <= until,
+            )
+        ).all()
+        if rows:
+            sku_ids, location_ids, quantities, created_at = zip(*rows)
+            self._fold(
+                np,
+                np.array(sku_ids, dtype=object),
+                np.array(location_ids, dtype=object),
+                np.array(quantities, dtype=np.int64),
+                np.array(created_at, dtype="datetime64[us]"),
+            )
+        self._watermark = until
+        self._forecast = self._compute(np, until)
+        self._built = True
+        self._refreshed_at = time.monotonic()
+
+    def _compute(self, np, until: datetime) -> dict:
+        daily = self._daily.astype(np.float64)
+        window = FORECAST_WINDOW_DAYS
+        # The last column is a partial day, so the rate divides by the time actually elapsed
+        midnight = until.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = window - 1 + (until - midnight).total_seconds() / 86400
+        recent = daily[:, -window:].sum(axis=1) / elapsed
+
+        # How demand changed from the window ending a year ago to the window after it
+        year_ago = _HISTORY_DAYS - 1 - 365
+        before = daily[:, year_ago - window + 1:year_ago + 1].sum(axis=1)
+        after = daily[:, year_ago + 1:year_ago + window + 1].sum(axis=1)
+        seasonal = np.ones_like(recent)
+        known = (before > 0) & (after > 0)
+        seasonal[known] = np.clip(after[known] / before[known], *_SEASONAL_RANGE)
+
+        # Day-to-day variation over the complete days of the window
+        deviation = daily[:, -window - 1:-1].std(axis=1) * seasonal
+        return {
+            "sku_ids": np.array(self._sku_ids, dtype=object),
+            "location_ids": np.array(self._location_ids, dtype=object),
+            "rates": recent * seasonal,
+            "seasonal": seasonal,
+            "safety": REORDER_SERVICE_Z * deviation * math.sqrt(REORDER_LEAD_TIME_DAYS),
+        }
+
+    def refresh(self, db: Session) -> dict:
+        np = _numpy()
+        with self._lock:
+            if not self._built or time.monotonic() - self._refreshed_at > FORECAST_REFRESH_SECONDS:
+                self._load(db, np)
+            return self._forecast
+
+    def reset(self):
+        """Drop everything; the next request rebuilds from the ledger and the archives."""
+        with self._lock:
+            self._clear()
+
+depletion_forecast = DepletionForecast()
+
+def _on_hand(db: Session, location_id: UUID | None, sku_id: UUID | None) -> dict[tuple[UUID, UUID], int]:
+    query = select(StockRollup.sku_id, StockRollup.location_id, StockRollup.quantity)
+    if location_id is not None:
+        query = query.where(StockRollup.location_id == location_id)
+    if sku_id is not None:
+        query = query.where(StockRollup.sku_id == sku_id)
+    return {(row_sku_id, row_location_id): quantity for row_sku_id, row_location_id, quantity in db.execute(query)}
+
+def get_reorder_suggestions(
+    db: Session,
+    location_id: UUID | None = None,
+    sku_id: UUID | None = None,
+    below_reorder_point: bool = True,
+    limit: int = 100,
+) -> list[ReorderSuggestion]:
+    """Pairs with forecast demand, fewest days of cover first."""
+    np = _numpy()
+    forecast = depletion_forecast.refresh(db)
+    candidates = np.flatnonzero(forecast["rates"] > 0)
+    if location_id is not None:
+        candidates = candidates[forecast["location_ids"][candidates] == location_id]
+    if sku_id is not None:
+        candidates = candidates[forecast["sku_ids"][candidates] == sku_id]
+
+    on_hand = _on_hand(db, location_id, sku_id)
+    sku_ids = forecast["sku_ids"][candidates]
+    location_ids = forecast["location_ids"][candidates]
+    stock = np.array([on_hand.get(key, 0) for key in zip(sku_ids, location_ids)], dtype=np.float64)
+    rates = forecast["rates"][candidates]
+    safety = np.ceil(forecast["safety"][candidates])
+    reorder_point = np.ceil(rates * REORDER_LEAD_TIME_DAYS + safety)
+    cover = np.maximum(stock, 0) / rates
+    order = np.where(stock <= reorder_point, np.ceil(np.maximum(reorder_point + rates * REORDER_COVER_DAYS - stock, 0)), 0)
+
+    ranked = np.argsort(cover, kind="stable")
+    if below_reorder_point:
+        ranked = ranked[stock[ranked] <= reorder_point[ranked]]
+    return [
+        ReorderSuggestion(
+            sku_id=sku_ids[i],
+            location_id=location_ids[i],
+            on_hand=int(stock[i]),
+            daily_rate=round(float(rates[i]), 3),
+            seasonal_factor=round(float(forecast["seasonal"][candidates[i]]), 3),
+            days_of_cover=round(float(cover[i]), 1),
+            safety_stock=int(safety[i]),
+            reorder_point=int(reorder_point[i]),
+            suggested_quantity=int(order[i]),
+        )
+        for i in ranked[:limit]
+    ]
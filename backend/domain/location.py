@@ -1,27 +1,83 @@
 # domain/location.py
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from fastapi import HTTPException
+from core.cache import EntityCache
+from core.changes import record_changes
 from models.location import Location, LocationType
 from sqlalchemy.orm import Session
 from core.database import get_db
 from sqlmodel import SQLModel
+from domain.batch import fetch_by_ids
+from domain.pagination import Page, paginate, stream_ndjson
+from domain.conditional import Validators, page_version
+
+location_cache = EntityCache("location", Location)
 
 class LocationCreate(SQLModel):
     name: str
     address: str | None = None
     type: LocationType
 
+class LocationFilter(SQLModel):
+    type: LocationType | None = None
+
 def create_location(db: Session, location: LocationCreate) -> Location:
     db_location = Location(**location.model_dump())
     db.add(db_location)
+    record_changes(db, "location", [(db_location.id, None)])
     db.commit()
     db.refresh(db_location)
+    location_cache.set(db_location)
     return db_location
 
 def get_location(db: Session, location_id: UUID) -> Location:
+    location = location_cache.get(location_id)
+    if location is not None:
+        return location
     location = db.exec(select(Location).where(Location.id == location_id)).first()
     if location is None:
         raise HTTPException(status_code=404, detail="Location not found")
+    location_cache.fill(db, location)
+    return location
+
+def get_locations_by_ids(db: Session, ids: list[UUID]) -> list[Location]:
+    return fetch_by_ids(db, Location, ids, location_cache)
+
+LOCATION_SORT_KEY = [Location.created_at, Location.id]
+
+def location_list_query(filters: LocationFilter):
+    query = select(Location)
+    if filters.type is not None:
+        query = query.where(Location.type == filters.type)
+    return query
+
+def list_locations(db: Session, filters: LocationFilter, cursor: str | None, limit: int) -> Page[Location]:
+    return paginate(db, location_list_query(filters), LOCATION_SORT_KEY, cursor, limit)
+
+def list_locations_version(db: Session, filters: LocationFilter, cursor: str | None, limit: int) -> Validators:
+    return page_version(db, location_list_query(filters), LOCATION_SORT_KEY, cursor, limit)
+
+def stream_locations(db: Session, filters: LocationFilter):
+    return stream_ndjson(db, location_list_query(filters), LOCATION_SORT_KEY)
+
+async def create_location_async(db: AsyncSession, location: LocationCreate) -> Location:
+    db_location = Location(**location.model_dump())
+    db.add(db_location)
+    record_changes(db, "location", [(db_location.id, None)])
+    await db.commit()
+    await db.refresh(db_location)
+    location_cache.set(db_location)
+    return db_location
+
+async def get_location_async(db: AsyncSession, location_id: UUID) -> Location:
+    location = location_cache.get(location_id)
+    if location is not None:
+        return location
+    location = (await db.exec(select(Location).where(Location.id == location_id))).first()
+    if location is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+    location_cache.fill(db, location)
     return location
\ No newline at end of file
@@ -1,9 +1,28 @@
 # domain/movement.py
 
 from sqlmodel import Session, select, SQLModel
-from uuid import UUID
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Uuid, cast, insert, literal, null, or_, union_all
+from uuid import UUID, uuid4
+from datetime import datetime
 from fastapi import HTTPException
 from models.movement import Movement, MovementType
+from models.wine_sku import WineSKU
+from models.location import Location
+from models.storage_lot import StorageLot
+from models.user import User
+from core.changes import record_changes
+from domain.wine_sku import get_wine
+from domain.location import get_location
+from domain.storage_lot import LotCapacityError, get_storage_lot
+from domain.user import get_user
+from domain.pagination import Page, decode_cursor, encode_cursor, naive_utc, paginate, stream_ndjson
+from domain.movement_archive import archived_movement_batches, archived_movements, covering_archives
+from domain.events import stage_stock_events
+from models.stock import Stock
+from domain.stock import StockKey, StockCreate, StockExistsError, InsufficientStockError, apply_stock_deltas, find_stock, get_stock_balance
+
+MAX_MOVEMENT_BATCH = 1000
 
 class MovementCreate(SQLModel):
     batch_ref: str
@@ -19,15 +38,340 @@ class MovementCreate(SQLModel):
     approved_by: UUID | None = None
     is_high_value: bool = False
 
+class MovementFilter(SQLModel):
+    sku_id: UUID | None = None
+    location_id: UUID | None = None  # Matches either side of the movement
+    movement_type: MovementType | None = None
+    performed_by: UUID | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+class MovementRejection(SQLModel):
+    index: int
+    reason: str
+
+class MovementBatchResult(SQLModel):
+    created_ids: list[UUID]
+    rejected: list[MovementRejection]
+
+class TransferLine(SQLModel):
+    sku_id: UUID
+    quantity: int
+    from_lot_id: UUID | None = None
+    to_lot_id: UUID | None = None
+
+class StockTransfer(SQLModel):
+    from_location_id: UUID
+    to_location_id: UUID  # May equal from_location_id when moving between lots
+    lines: list[TransferLine]
+    batch_ref: str | None = None  # Generated when omitted
+    reason: str | None = None
+    performed_by: UUID
+    approved_by: UUID | None = None
+
+class TransferResult(SQLModel):
+    batch_ref: str
+    movement_ids: list[UUID]
+
+# Which sides of the movement must be present: (from_location_id, to_location_id)
+_MOVEMENT_LEGS = {
+    MovementType.INBOUND: (False, True),
+    MovementType.OUTBOUND: (True, False),
+    MovementType.DEPLETION: (True, False),
+    MovementType.TRANSFER: (True, True),
+}
+
+def movement_error(movement: MovementCreate) -> str | None:
+    has_from = movement.from_location_id is not None
+    has_to = movement.to_location_id is not None
+    if movement.quantity <= 0:
+        return "quantity must be greater than 0"
+    if movement.movement_type == MovementType.ADJUSTMENT:
+        # Adjustments carry a positive quantity; the side they name gives the sign
+        if has_from == has_to:
+            return "Adjustment requires exactly one of from_location_id or to_location_id"
+    elif (has_from, has_to) != _MOVEMENT_LEGS[movement.movement_type]:
+        required = [name for name, needed in zip(("from_location_id", "to_location_id"), _MOVEMENT_LEGS[movement.movement_type]) if needed]
+        return f"{movement.movement_type.value} requires only {' and '.join(required)}"
+    if movement.from_lot_id is not None and not has_from:
+        return "from_lot_id requires from_location_id"
+    if movement.to_lot_id is not None and not has_to:
+        return "to_lot_id requires to_location_id"
+    if has_from and has_to and (movement.from_location_id, movement.from_lot_id) == (movement.to_location_id, movement.to_lot_id):
+        return "Transfer source and destination are the same"
+    return None
+
+def movement_deltas(movement: MovementCreate | Movement) -> dict[StockKey, int]:
+    """Stock deltas a movement posts: -quantity at its source, +quantity at its destination."""
+    deltas = {}
+    if movement.from_location_id is not None:
+        key = (movement.sku_id, movement.from_lot_id, movement.from_location_id)
+        deltas[key] = deltas.get(key, 0) - movement.quantity
+    if movement.to_location_id is not None:
+        key = (movement.sku_id, movement.to_lot_id, movement.to_location_id)
+        deltas[key] = deltas.get(key, 0) + movement.quantity
+    return deltas
+
+def movement_legs(rows: list[dict]) -> list[tuple[UUID, UUID]]:
+    # One change-log entry per location a movement touches
+    return [(row["id"], row[side]) for row in rows for side in ("from_location_id", "to_location_id") if row[side] is not None]
+
+def _check_references(db: Session, movement: MovementCreate):
+    # Served from the reference-entity cache on the hot posting path
+    get_wine(db, movement.sku_id)
+    for location_id, lot_id in ((movement.from_location_id, movement.from_lot_id), (movement.to_location_id, movement.to_lot_id)):
+        if location_id is not None:
+            get_location(db, location_id)
+        if lot_id is not None and get_storage_lot(db, lot_id).location_id != location_id:
+            raise HTTPException(status_code=422, detail=f"storage lot {lot_id} is not in location {location_id}")
+    get_user(db, movement.performed_by)
+    if movement.approved_by is not None:
+        get_user(db, movement.approved_by)
+
 def create_movement(db: Session, movement: MovementCreate) -> Movement:
+    error = movement_error(movement)
+    if error is not None:
+        raise HTTPException(status_code=422, detail=error)
+    _check_references(db, movement)
     db_movement = Movement(**movement.model_dump())
     db.add(db_movement)
+    # Post the stock deltas in the same transaction as the movement row
+    deltas = movement_deltas(movement)
+    apply_stock_deltas(db, deltas)
+    stage_stock_events(db, [db_movement.model_dump()], deltas)
+    record_changes(db, "movement", movement_legs([db_movement.model_dump()]))
     db.commit()
     db.refresh(db_movement)
     return db_movement
 
+def create_stock(db: Session, stock: StockCreate) -> Stock:
+    """Seed a balance that does not exist yet through an Adjustment movement, so the ledger accounts for it."""
+    key = (stock.sku_id, stock.lot_id, stock.location_id)
+    if find_stock(db, key) is not None:
+        raise StockExistsError(key)
+    create_movement(db, MovementCreate(
+        batch_ref=f"OPEN-{uuid4().hex[:12].upper()}", sku_id=stock.sku_id, quantity=stock.quantity,
+        to_location_id=stock.location_id, to_lot_id=stock.lot_id, movement_type=MovementType.ADJUSTMENT,
+        reason=stock.reason, performed_by=stock.performed_by,
+    ))
+    return find_stock(db, key)
+
 def get_movement(db: Session, movement_id: UUID) -> Movement:
     movement = db.exec(select(Movement).where(Movement.id == movement_id)).first()
+    if movement is None:
+        raise HTTPException(status_code=404, detail="Movement not found")
+    return movement
+
+def _existing_references(db: Session, movements: list[MovementCreate]) -> tuple[set, dict]:
+    # Resolve every referenced SKU, location, lot and user in a single UNION ALL round trip
+    sku_ids = {m.sku_id for m in movements}
+    location_ids = {i for m in movements for i in (m.from_location_id, m.to_location_id) if i is not None}
+    lot_ids = {i for m in movements for i in (m.from_lot_id, m.to_lot_id) if i is not None}
+    user_ids = {i for m in movements for i in (m.performed_by, m.approved_by) if i is not None}
+
+    # The union takes its column types from the first select, so the lot location column is typed there
+    lookups = [select(literal("sku").label("kind"), WineSKU.id, cast(null(), Uuid).label("location_id")).where(WineSKU.id.in_(sku_ids))]
+    if location_ids:
+        lookups.append(select(literal("location"), Location.id, null()).where(Location.id.in_(location_ids)))
+    if lot_ids:
+        lookups.append(select(literal("lot"), StorageLot.id, StorageLot.location_id).where(StorageLot.id.in_(lot_ids)))
+    lookups.append(select(literal("user"), User.id, null()).where(User.id.in_(user_ids)))
+
+    found = set()
+    lot_locations = {}
+    for kind, ref_id, location_id in db.execute(union_all(*lookups)):
+        found.add((kind, ref_id))
+        if kind == "lot":
+            lot_locations[ref_id] = location_id
+    return found, lot_locations
+
+def _batch_rejection_reason(movement: MovementCreate, found: set, lot_locations: dict) -> str | None:
+    error = movement_error(movement)
+    if error is not None:
+        return error
+    if ("sku", movement.sku_id) not in found:
+        return f"sku {movement.sku_id} not found"
+    for location_id in (movement.from_location_id, movement.to_location_id):
+        if location_id is not None and ("location", location_id) not in found:
+            return f"location {location_id} not found"
+    for lot_id, location_id in ((movement.from_lot_id, movement.from_location_id), (movement.to_lot_id, movement.to_location_id)):
+        if lot_id is None:
+            continue
+        if ("lot", lot_id) not in found:
+            return f"storage lot {lot_id} not found"
+        if lot_locations[lot_id] != location_id:
+            return f"storage lot {lot_id} is not in location {location_id}"
+    for user_id in (movement.performed_by, movement.approved_by):
+        if user_id is not None and ("user", user_id) not in found:
+            return f"user {user_id} not found"
+    return None
+
+def create_movements_batch(db: Session, movements: list[MovementCreate]) -> MovementBatchResult:
+    if len(movements) > MAX_MOVEMENT_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_MOVEMENT_BATCH} movements")
+    if not movements:
+        return MovementBatchResult(created_ids=[], rejected=[])
+
+    found, lot_locations = _existing_references(db, movements)
+    accepted = []
+    rejected = []
+    for index, movement in enumerate(movements):
+        reason = _batch_rejection_reason(movement, found, lot_locations)
+        if reason is not None:
+            rejected.append(MovementRejection(index=index, reason=reason))
+        else:
+            accepted.append((index, movement))
+
+    # Post the summed deltas of the whole batch; rows draining a balance below zero are rejected and the rest retried
+    while accepted:
+        deltas = {}
+        for _, movement in accepted:
+            for key, delta in movement_deltas(movement).items():
+                deltas[key] = deltas.get(key, 0) + delta
+        try:
+            with db.begin_nested():
+                apply_stock_deltas(db, deltas)
+            break
+        except InsufficientStockError as exc:
+            # Keep rows in submission order while the balance covers them
+            available = get_stock_balance(db, exc.key)
+            short = []
+            for index, movement in accepted:
+                delta = movement_deltas(movement).get(exc.key, 0)
+                if available + delta < 0:
+                    short.append((index, movement))
+                else:
+                    available += delta
+            rejected.extend(MovementRejection(index=index, reason=exc.detail) for index, _ in short)
+            accepted = [row for row in accepted if row not in short]
+        except LotCapacityError as exc:
+            # Same for the lot counter: admit rows in submission order while it stays within 0..capacity
+            lot = db.exec(select(StorageLot).where(StorageLot.id == exc.lot_id)).first()
+            touching = []
+            for index, movement in accepted:
+                delta = sum(d for (_, lot_id, _), d in movement_deltas(movement).items() if lot_id == exc.lot_id)
+                if delta:
+                    touching.append((index, movement, delta))
+            short = []
+            if lot is not None:
+                occupied = lot.occupied
+                for index, movement, delta in touching:
+                    if (delta > 0 and occupied + delta > lot.capacity) or occupied + delta < 0:
+                        short.append((index, movement))
+                    else:
+                        occupied += delta
+            if not short:
+                # The counter disagrees with the rows (or the lot is gone): nothing touching the lot can be posted
+                short = [(index, movement) for index, movement, _ in touching]
+            rejected.extend(MovementRejection(index=index, reason=exc.detail) for index, _ in short)
+            accepted = [row for row in accepted if row not in short]
+
+    # Build through the table model so id and created_at get their defaults
+    rows = [Movement(**movement.model_dump()).model_dump() for _, movement in accepted]
+    # One multi-row INSERT (executemany / insertmanyvalues) in the same transaction as the stock postings
+    if rows:
+        db.execute(insert(Movement), rows)
+        stage_stock_events(db, rows, deltas)
+        record_changes(db, "movement", movement_legs(rows))
+    db.commit()
+    rejected.sort(key=lambda rejection: rejection.index)
+    return MovementBatchResult(created_ids=[row["id"] for row in rows], rejected=rejected)
+
+def create_transfer(db: Session, transfer: StockTransfer) -> TransferResult:
+    """Post every line of a transfer as a Transfer movement in one transaction, or none of them."""
+    if not transfer.lines:
+        raise HTTPException(status_code=422, detail="A transfer needs at least one line")
+    if len(transfer.lines) > MAX_MOVEMENT_BATCH:
+        raise HTTPException(status_code=413, detail=f"Transfer exceeds {MAX_MOVEMENT_BATCH} lines")
+
+    batch_ref = transfer.batch_ref or f"TRF-{uuid4().hex[:12].upper()}"
+    movements = [
+        MovementCreate(
+            batch_ref=batch_ref, sku_id=line.sku_id, quantity=line.quantity,
+            from_location_id=transfer.from_location_id, from_lot_id=line.from_lot_id,
+            to_location_id=transfer.to_location_id, to_lot_id=line.to_lot_id,
+            movement_type=MovementType.TRANSFER, reason=transfer.reason,
+            performed_by=transfer.performed_by, approved_by=transfer.approved_by,
+        )
+        for line in transfer.lines
+    ]
+    found, lot_locations = _existing_references(db, movements)
+    for index, movement in enumerate(movements):
+        reason = _batch_rejection_reason(movement, found, lot_locations)
+        if reason is not None:
+            raise HTTPException(status_code=422, detail=f"line {index}: {reason}")
+
+    # Lines are netted per balance and posted in apply_stock_deltas' fixed key order, so concurrent
+    # transfers lock the balances they share in the same sequence (no deadlock, whichever direction
+    # they run) and transfers with no balance in common never wait on each other
+    deltas = {}
+    for movement in movements:
+        for key, delta in movement_deltas(movement).items():
+            deltas[key] = deltas.get(key, 0) + delta
+    apply_stock_deltas(db, deltas)
+
+    rows = [Movement(**movement.model_dump()).model_dump() for movement in movements]
+    db.execute(insert(Movement), rows)
+    stage_stock_events(db, rows, deltas)
+    record_changes(db, "movement", movement_legs(rows))
+    db.commit()
+    return TransferResult(batch_ref=batch_ref, movement_ids=[row["id"] for row in rows])
+
+# Newest first for pages; keyset on (created_at, id) so the cursor is stable for equal timestamps
+MOVEMENT_SORT_KEY = [Movement.created_at, Movement.id]
+
+def movement_list_query(filters: MovementFilter):
+    query = select(Movement)
+    if filters.sku_id is not None:
+        query = query.where(Movement.sku_id == filters.sku_id)
+    if filters.location_id is not None:
+        query = query.where(or_(Movement.from_location_id == filters.location_id, Movement.to_location_id == filters.location_id))
+    if filters.movement_type is not None:
+        query = query.where(Movement.movement_type == filters.movement_type)
+    if filters.performed_by is not None:
+        query = query.where(Movement.performed_by == filters.performed_by)
+    if filters.created_from is not None:
+        query = query.where(Movement.created_at >= naive_utc(filters.created_from))
+    if filters.created_to is not None:
+        query = query.where(Movement.created_at < naive_utc(filters.created_to))
+    return query
+
+def list_movements(db: Session, filters: MovementFilter, cursor: str | None, limit: int) -> Page[Movement]:
+    page = paginate(db, movement_list_query(filters), MOVEMENT_SORT_KEY, cursor, limit, descending=True)
+    if page.next_cursor is not None:
+        return page
+    # The live table ran out; archived periods are all older, so the page continues from them on the same keyset
+    if page.items:
+        before = (page.items[-1].created_at, page.items[-1].id)
+    else:
+        before = tuple(decode_cursor(cursor, MOVEMENT_SORT_KEY)) if cursor is not None else None
+    older = archived_movements(db, filters, before, limit - len(page.items) + 1)
+    if not older:
+        return page
+    items = page.items + older
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([items[-1].created_at, items[-1].id])
+    return Page(items=items, next_cursor=next_cursor)
+
+def stream_movements(db: Session, filters: MovementFilter):
+    # Exports run oldest first, in ledger order: archived periods, then the live table
+    archived = archived_movement_batches(covering_archives(db, filters), filters)
+    return stream_ndjson(db, movement_list_query(filters), MOVEMENT_SORT_KEY, head=archived)
+
+async def create_movement_async(db: AsyncSession, movement: MovementCreate) -> Movement:
+    # Posting runs the sync engine code on the async connection
+    return await db.run_sync(create_movement, movement)
+
+async def create_transfer_async(db: AsyncSession, transfer: StockTransfer) -> TransferResult:
+    return await db.run_sync(create_transfer, transfer)
+
+async def create_stock_async(db: AsyncSession, stock: StockCreate) -> Stock:
+    return await db.run_sync(create_stock, stock)
+
+async def get_movement_async(db: AsyncSession, movement_id: UUID) -> Movement:
+    movement = (await db.exec(select(Movement).where(Movement.id == movement_id))).first()
     if movement is None:
         raise HTTPException(status_code=404, detail="Movement not found")
     return movement
\ No newline at end of file
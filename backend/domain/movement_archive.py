@@ -0,0 +1,186 @@
+# domain/movement_archive.py
+#
+# Closed months of the movement ledger as compressed Parquet files on local disk, one per
+# archived period, and the read paths that bring them back into history queries.
+# Needs the optional 'pyarrow' package once any period has been archived.
+
+from sqlmodel import Session, select
+from sqlalchemy import Boolean, DateTime, Integer, Uuid
+from uuid import UUID
+from datetime import datetime
+from pathlib import Path
+import enum
+import os
+from models.movement import Movement, MovementType
+from models.movement_archive import MovementArchive
+from domain.pagination import naive_utc
+
+MOVEMENT_ARCHIVE_DIR = os.getenv("MOVEMENT_ARCHIVE_DIR", "archive")
+ARCHIVE_COMPRESSION = "zstd"
+
+_COLUMNS = Movement.__table__.columns
+_UUID_COLUMNS = {column.name for column in _COLUMNS if isinstance(column.type, Uuid)}
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("Movement archives require the 'pyarrow' package") from exc
+    return pyarrow, pyarrow.parquet
+
+def _schema(pa):
+    # UUIDs and enums are stored as strings so any Parquet reader can open the files
+    def arrow_type(column):
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        return pa.string()
+    return pa.schema([(column.name, arrow_type(column)) for column in _COLUMNS])
+
+def _archive_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def _from_archive(record: dict) -> Movement:
+    values = {name: UUID(value) if name in _UUID_COLUMNS and value is not None else value for name, value in record.items()}
+    values["movement_type"] = MovementType(values["movement_type"])
+    return Movement(**values)
+
+def archive_path(period_start: datetime, archive_id: UUID) -> Path:
+    return Path(MOVEMENT_ARCHIVE_DIR) / f"movements-{period_start:%Y-%m}-{archive_id.hex[:8]}.parquet"
+
+def write_archive(path: Path, batches) -> tuple[int, int]:
+    """Write batches of movement row mappings to one Parquet file; returns (rows, bytes)."""
+    pa, pq = _pyarrow()
+    schema = _schema(pa)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    rows = 0
+    with pq.ParquetWriter(partial, schema, compression=ARCHIVE_COMPRESSION) as writer:
+        for batch in batches:
+            records = [{name: _archive_value(value) for name, value in row.items()} for row in batch]
+            writer.write_table(pa.Table.from_pylist(records, schema=schema))
+            rows += len(records)
+    # Only a complete file ever appears under the final name
+    with open(partial, "rb") as handle:
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+    return rows, path.stat().st_size
+
+def _read(archive: MovementArchive, filters: list | None, columns: list[str] | None = None) -> list[dict]:
+    _, pq = _pyarrow()
+    return pq.read_table(archive.path, columns=columns, filters=filters).to_pylist()
+
+def _archives(db: Session, after: datetime | None, until: datetime | None, newest_first: bool = False) -> list[MovementArchive]:
+    # Periods overlapping (after, until)
+    query = select(MovementArchive)
+    if after is not None:
+        query = query.where(MovementArchive.period_end > after)
+    if until is not None:
+        query = query.where(MovementArchive.period_start <= until)
+    order = MovementArchive.period_start.desc() if newest_first else MovementArchive.period_start
+    return db.exec(query.order_by(order)).all()
+
+def _pushdown(filters, before: tuple | None = None) -> list | None:
+    # Row-group filters in pyarrow's disjunctive normal form; location matches either side of the movement,
+    # and the (created_at, id) cursor is strictly older on created_at or tied on it with a smaller id
+    common = []
+    if filters.sku_id is not None:
+        common.append(("sku_id", "=", str(filters.sku_id)))
+    if filters.movement_type is not None:
+        common.append(("movement_type", "=", filters.movement_type.value))
+    if filters.performed_by is not None:
+        common.append(("performed_by", "=", str(filters.performed_by)))
+    if filters.created_from is not None:
+        common.append(("created_at", ">=", naive_utc(filters.created_from)))
+    if filters.created_to is not None:
+        common.append(("created_at", "<", naive_utc(filters.created_to)))
+    conjunctions = [common]
+    if filters.location_id is not None:
+        location = str(filters.location_id)
+        conjunctions = [common + [("from_location_id", "=", location)], common + [("to_location_id", "=", location)]]
+    if before is not None:
+        # Canonical UUID strings sort the same way as the UUIDs themselves
+        older = [("created_at", "<", before[0])], [("created_at", "=", before[0]), ("id", "<", str(before[1]))]
+        conjunctions = [conjunction + cursor for conjunction in conjunctions for cursor in older]
+    return conjunctions if any(conjunctions) else None
+
+def _sort_key(movement: Movement) -> tuple:
+    return movement.created_at, movement.id
+
+def _page(archive: MovementArchive, pushdown: list | None, limit: int) -> list[Movement]:
+    # Rank on the two key columns only, then fetch whole rows for just the page. Files are written in
+    # (created_at, id) order, so the created_at bounds of the page prune the second read to its row groups.
+    _, pq = _pyarrow()
+    keys = pq.read_table(archive.path, columns=["created_at", "id"], filters=pushdown)
+    keys = keys.sort_by([("created_at", "descending"), ("id", "descending")]).slice(0, limit).to_pylist()
+    if not keys:
+        return []
+    selected = [("id", "in", [key["id"] for key in keys]), ("created_at", ">=", keys[-1]["created_at"]), ("created_at", "<=", keys[0]["created_at"])]
+    rows = [_from_archive(record) for record in _read(archive, [selected])]
+    return sorted(rows, key=_sort_key, reverse=True)
+
+def archived_movements(db: Session, filters, before: tuple | None, limit: int) -> list[Movement]:
+    """Up to `limit` archived movements matching `filters`, newest first, strictly older than the (created_at, id) key `before`."""
+    created_from = naive_utc(filters.created_from)
+    created_to = naive_utc(filters.created_to)
+    if before is not None:
+        created_to = before[0] if created_to is None else min(created_to, before[0])
+    pushdown = _pushdown(filters, before)
+    movements = []
+    for archive in _archives(db, created_from, created_to, newest_first=True):
+        movements.extend(_page(archive, pushdown, limit - len(movements)))
+        if len(movements) >= limit:
+            break
+    return movements
+
+def archived_movement_batches(archives: list[MovementArchive], filters):
+    """Archived movements matching `filters`, oldest first, one list per archive file."""
+    for archive in archives:
+        rows = sorted((_from_archive(record) for record in _read(archive, _pushdown(filters))), key=_sort_key)
+        if rows:
+            yield rows
+
+def covering_archives(db: Session, filters) -> list[MovementArchive]:
+    return _archives(db, naive_utc(filters.created_from), naive_utc(filters.created_to))
+
+def archived_stock_deltas(db: Session, after: datetime | None, until: datetime, location_id: UUID | None = None, sku_id: UUID | None = None) -> dict:
+    """Summed (sku, lot, location) deltas of archived movements with after < created_at <= until."""
+    archives = _archives(db, after, until)
+    if not archives:
+        return {}
+    conditions = [("created_at", "<=", until)]
+    if after is not None:
+        conditions.append(("created_at", ">", after))
+    if sku_id is not None:
+        conditions.append(("sku_id", "=", str(sku_id)))
+    columns = ["sku_id", "quantity", "from_location_id", "from_lot_id", "to_location_id", "to_lot_id"]
+    deltas = {}
+    for archive in archives:
+        for row in _read(archive, [conditions], columns):
+            for side, sign in (("to", 1), ("from", -1)):
+                leg_location = row[f"{side}_location_id"]
+                if leg_location is None or (location_id is not None and leg_location != str(location_id)):
+                    continue
+                lot = row[f"{side}_lot_id"]
+                key = (UUID(row["sku_id"]), UUID(lot) if lot is not None else None, UUID(leg_location))
+                deltas[key] = deltas.get(key, 0) + sign * row["quantity"]
+    return deltas
+
+def archived_columns(db: Session, after: datetime | None, until: datetime, columns: list[str], conditions: list | None = None) -> list:
+    """Arrow tables of `columns` for archived movements with after < created_at <= until, one per archive file."""
+    archives = _archives(db, after, until)
+    if not archives:
+        return []
+    conditions = [("created_at", "<=", until), *(conditions or [])]
+    if after is not None:
+        conditions.append(("created_at", ">", after))
+    _, pq = _pyarrow()
+    return [pq.read_table(archive.path, columns=columns, filters=[conditions]) for archive in archives]
@@ -0,0 +1,114 @@
+# domain/pagination.py
+
+from sqlmodel import Session
+from sqlalchemy import tuple_
+from pydantic import BaseModel
+from typing import Generic, TypeVar
+from uuid import UUID
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+import base64
+import json
+import os
+from core.database import SessionLocal
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_CHUNK_SIZE = 1000
+
+# Opt-in: list responses go straight from ORM rows to JSON bytes via orjson, skipping response_model validation
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+if FAST_JSON:
+    try:
+        import orjson
+    except ImportError as exc:
+        raise RuntimeError("FAST_JSON=true requires the 'orjson' package") from exc
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    # Timestamps are stored as naive UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_parse_key(value, column.type.python_type) for value, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _parse_key(value: str, python_type: type):
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+def keyset_query(query, key_columns: list, cursor: str | None, limit: int, descending: bool = False):
+    # One page past the cursor plus one row, which tells whether another page follows
+    key = tuple_(*key_columns)
+    if cursor is not None:
+        after = tuple_(*decode_cursor(cursor, key_columns))
+        query = query.where(key < after if descending else key > after)
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    return query.order_by(*order).limit(limit + 1)
+
+def paginate(db: Session, query, key_columns: list, cursor: str | None, limit: int, descending: bool = False) -> Page:
+    """Keyset pagination: seek past the cursor's sort key instead of using OFFSET."""
+    rows = db.exec(keyset_query(query, key_columns, cursor, limit, descending)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in key_columns])
+    return Page(items=rows, next_cursor=next_cursor)
+
+def _model_fields(value: BaseModel) -> dict:
+    # Rows come from our own tables, so their loaded values are trusted as-is; orjson encodes UUID, datetime and enums natively.
+    # Reading __dict__ skips the ORM attribute descriptors (and drops _sa_instance_state)
+    return {name: field for name, field in value.__dict__.items() if name[0] != "_"}
+
+def dump_json(value) -> bytes:
+    return orjson.dumps(value, default=_model_fields)
+
+def json_response(content):
+    """With FAST_JSON, serialize `content` directly; otherwise hand it back for response_model validation."""
+    if not FAST_JSON:
+        return content
+    return Response(dump_json(content), media_type="application/json")
+
+def _ndjson_chunk(rows):
+    if FAST_JSON:
+        return b"".join(dump_json(row) + b"\n" for row in rows)
+    return "".join(row.model_dump_json() + "\n" for row in rows)
+
+def _ndjson_rows(query, head, bind):
+    for rows in head:
+        yield _ndjson_chunk(rows)
+    # Own session: the response body is produced after the request's dependencies have finished
+    with SessionLocal(bind=bind) as db:
+        result = db.exec(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        for rows in result.partitions():
+            yield _ndjson_chunk(rows)
+
+def stream_ndjson(db: Session, query, key_columns: list, descending: bool = False, head=()) -> StreamingResponse:
+    """Stream every row of the query as NDJSON from a server-side cursor, after any batches of rows in `head`.
+
+    The rows come from a new session on the same database as `db`, so an export from a replica stays on it.
+    """
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    return StreamingResponse(_ndjson_rows(query.order_by(*order), head, db.get_bind()), media_type="application/x-ndjson")
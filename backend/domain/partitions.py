@@ -0,0 +1,85 @@
+# domain/partitions.py
+
+from sqlmodel import Session
+from sqlalchemy import delete, text
+from datetime import datetime
+import os
+from core.database import SessionLocal
+from models.movement import Movement
+
+# Monthly partitions kept ready ahead of the current month; rows outside every partition land in movements_default
+MOVEMENT_PARTITIONS_AHEAD = int(os.getenv("MOVEMENT_PARTITIONS_AHEAD", "3"))
+# How often the API re-runs ensure_movement_partitions; 0 leaves it to `manage.py archive-movements`
+MOVEMENT_PARTITION_INTERVAL_SECONDS = int(os.getenv("MOVEMENT_PARTITION_INTERVAL_SECONDS", "86400"))
+
+_PARTITION_LOCK_KEY = 5_704_002
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def movement_partition_name(period_start: datetime) -> str:
+    return f"movements_y{period_start.year}m{period_start.month:02d}"
+
+def movements_partitioned(db: Session) -> bool:
+    # Only PostgreSQL has native partitioning; other dialects keep movements as one plain table
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'movements'::regclass")).first() is not None
+
+def _partition_exists(db: Session, name: str) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM pg_inherits JOIN pg_class ON pg_class.oid = inhrelid WHERE inhparent = 'movements'::regclass AND relname = :name"),
+        {"name": name},
+    ).first() is not None
+
+def _stranded_periods(db: Session) -> set[datetime]:
+    # Months with rows that arrived before their partition existed
+    return set(db.execute(text("SELECT DISTINCT date_trunc('month', created_at) FROM movements_default")).scalars())
+
+def ensure_movement_partitions(db: Session, months_ahead: int = MOVEMENT_PARTITIONS_AHEAD) -> list[str]:
+    """Create the monthly movement partitions from this month through `months_ahead`, plus one for every month
+    stranded in movements_default (whose rows are moved into it); returns the new ones."""
+    if not movements_partitioned(db):
+        return []
+    # Concurrent runs (one per worker) would otherwise race to create the same partition
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+    start = month_start(datetime.utcnow())
+    stranded = _stranded_periods(db)
+    periods = {add_months(start, offset) for offset in range(months_ahead + 1)} | stranded
+    missing = sorted(period for period in periods if not _partition_exists(db, movement_partition_name(period)))
+    if not missing:
+        db.commit()
+        return []
+    # A new range partition cannot be created while the default partition holds rows in that range
+    if stranded:
+        db.execute(text("ALTER TABLE movements DETACH PARTITION movements_default"))
+    for period_start in missing:
+        db.execute(text(
+            f"CREATE TABLE {movement_partition_name(period_start)} PARTITION OF movements "
+            f"FOR VALUES FROM ('{period_start.isoformat()}') TO ('{add_months(period_start, 1).isoformat()}')"
+        ))
+    if stranded:
+        for period_start in sorted(stranded):
+            bounds = {"start": period_start, "end": add_months(period_start, 1)}
+            db.execute(text("INSERT INTO movements SELECT * FROM movements_default WHERE created_at >= :start AND created_at < :end"), bounds)
+            db.execute(text("DELETE FROM movements_default WHERE created_at >= :start AND created_at < :end"), bounds)
+        db.execute(text("ALTER TABLE movements ATTACH PARTITION movements_default DEFAULT"))
+    db.commit()
+    return [movement_partition_name(period_start) for period_start in missing]
+
+def run_movement_partitions() -> list[str]:
+    with SessionLocal() as db:
+        return ensure_movement_partitions(db)
+
+def drop_movement_period(db: Session, period_start: datetime, period_end: datetime):
+    """Remove one month of movements in the caller's transaction: a partition detach where there is one, a range delete otherwise."""
+    name = movement_partition_name(period_start)
+    if movements_partitioned(db) and period_end == add_months(period_start, 1) and _partition_exists(db, name):
+        db.execute(text(f"ALTER TABLE movements DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        return
+    db.execute(delete(Movement).where(Movement.created_at >= period_start, Movement.created_at < period_end))
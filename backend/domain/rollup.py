@@ -0,0 +1,161 @@
+# domain/rollup.py
+
+from sqlmodel import Session, select, SQLModel
+from sqlalchemy import delete, func, insert, literal, union_all, update
+from sqlalchemy.exc import IntegrityError
+from uuid import UUID
+from datetime import datetime
+from models.stock import Stock
+from models.stock_rollup import StockRollup
+from models.wine_sku import WineSKU
+
+# (sku_id, location_id)
+RollupKey = tuple[UUID, UUID]
+
+# Value differences below this are float noise, not drift
+VALUE_TOLERANCE = 0.01
+
+class StockSummary(SQLModel):
+    # The grouped key is always set; the other one only when it was filtered on
+    location_id: UUID | None = None
+    sku_id: UUID | None = None
+    quantity: int
+    cost_value: float
+    retail_value: float
+
+class RollupMismatch(SQLModel):
+    sku_id: UUID
+    location_id: UUID
+    expected_quantity: int
+    rollup_quantity: int
+    expected_cost_value: float
+    rollup_cost_value: float
+    expected_retail_value: float
+    rollup_retail_value: float
+
+def _price(column, sku_id: UUID):
+    # Read by the statement that writes the rollup, so the value matches the price in this transaction
+    return select(column).where(WineSKU.id == sku_id).scalar_subquery()
+
+def _rollup_row(key: RollupKey):
+    sku_id, location_id = key
+    return (StockRollup.sku_id == sku_id) & (StockRollup.location_id == location_id)
+
+def _apply_rollup_delta(db: Session, key: RollupKey, delta: int, now: datetime):
+    # Values are recomputed from the new quantity rather than accumulated, so they cannot drift
+    sku_id, location_id = key
+    cost_price = _price(WineSKU.cost_price, sku_id)
+    retail_price = _price(WineSKU.price_bottle, sku_id)
+    values = dict(
+        quantity=StockRollup.quantity + delta,
+        cost_value=(StockRollup.quantity + delta) * cost_price,
+        retail_value=(StockRollup.quantity + delta) * retail_price,
+        updated_at=now,
+    )
+    result = db.execute(update(StockRollup).where(_rollup_row(key)).values(**values).execution_options(synchronize_session=False))
+    if result.rowcount:
+        return
+
+    try:
+        with db.begin_nested():
+            db.execute(insert(StockRollup).values(
+                sku_id=sku_id, location_id=location_id, quantity=delta,
+                cost_value=delta * cost_price, retail_value=delta * retail_price, updated_at=now,
+            ))
+    except IntegrityError:
+        db.execute(update(StockRollup).where(_rollup_row(key)).values(**values).execution_options(synchronize_session=False))
+
+def apply_rollup_deltas(db: Session, deltas: dict[RollupKey, int]):
+    """Fold stock quantity deltas into the rollups inside the caller's transaction."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    for key in sorted(deltas, key=lambda key: (str(key[0]), str(key[1]))):
+        _apply_rollup_delta(db, key, deltas[key], now)
+
+def refresh_rollup_values(db: Session, sku_ids: list[UUID]):
+    """Revalue the rollups of wines whose prices changed; the caller commits."""
+    if not sku_ids:
+        return
+    cost_price = select(WineSKU.cost_price).where(WineSKU.id == StockRollup.sku_id).scalar_subquery()
+    retail_price = select(WineSKU.price_bottle).where(WineSKU.id == StockRollup.sku_id).scalar_subquery()
+    db.execute(
+        update(StockRollup)
+        .where(StockRollup.sku_id.in_(sku_ids))
+        .values(cost_value=StockRollup.quantity * cost_price, retail_value=StockRollup.quantity * retail_price)
+        .execution_options(synchronize_session=False)
+    )
+
+def _expected_rollups():
+    # What the rollups should hold, aggregated from the base tables
+    quantity = func.sum(Stock.quantity)
+    return (
+        select(
+            Stock.sku_id.label("sku_id"),
+            Stock.location_id.label("location_id"),
+            quantity.label("quantity"),
+            (quantity * WineSKU.cost_price).label("cost_value"),
+            (quantity * WineSKU.price_bottle).label("retail_value"),
+        )
+        .join(WineSKU, WineSKU.id == Stock.sku_id)
+        .group_by(Stock.sku_id, Stock.location_id, WineSKU.cost_price, WineSKU.price_bottle)
+    )
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute every rollup from stocks and wineskus."""
+    expected = _expected_rollups().subquery()
+    db.execute(delete(StockRollup))
+    db.execute(insert(StockRollup).from_select(
+        ["sku_id", "location_id", "quantity", "cost_value", "retail_value", "updated_at"],
+        select(expected, literal(datetime.utcnow())),
+    ))
+    db.commit()
+    return db.exec(select(func.count()).select_from(StockRollup)).one()
+
+def check_rollups(db: Session) -> list[RollupMismatch]:
+    """Rollups that disagree with the base tables."""
+    expected = _expected_rollups().subquery()
+    base = select(
+        expected.c.sku_id, expected.c.location_id,
+        expected.c.quantity.label("expected_quantity"), literal(0).label("rollup_quantity"),
+        expected.c.cost_value.label("expected_cost_value"), literal(0.0).label("rollup_cost_value"),
+        expected.c.retail_value.label("expected_retail_value"), literal(0.0).label("rollup_retail_value"),
+    )
+    rollups = select(
+        StockRollup.sku_id, StockRollup.location_id,
+        literal(0), StockRollup.quantity,
+        literal(0.0), StockRollup.cost_value,
+        literal(0.0), StockRollup.retail_value,
+    )
+    combined = union_all(base, rollups).subquery()
+    sums = [func.sum(combined.c[name]).label(name) for name in (
+        "expected_quantity", "rollup_quantity", "expected_cost_value", "rollup_cost_value",
+        "expected_retail_value", "rollup_retail_value",
+    )]
+    rows = db.execute(
+        select(combined.c.sku_id, combined.c.location_id, *sums)
+        .group_by(combined.c.sku_id, combined.c.location_id)
+        .having(
+            (sums[0] != sums[1])
+            | (func.abs(sums[2] - sums[3]) > VALUE_TOLERANCE)
+            | (func.abs(sums[4] - sums[5]) > VALUE_TOLERANCE)
+        )
+    ).mappings()
+    return [RollupMismatch(**row) for row in rows]
+
+def get_stock_summary(db: Session, group_by: str, location_id: UUID | None = None, sku_id: UUID | None = None) -> list[StockSummary]:
+    """On-hand quantity and value per location or per sku, read from the rollups alone."""
+    group = StockRollup.location_id if group_by == "location" else StockRollup.sku_id
+    query = select(
+        group,
+        func.sum(StockRollup.quantity).label("quantity"),
+        func.sum(StockRollup.cost_value).label("cost_value"),
+        func.sum(StockRollup.retail_value).label("retail_value"),
+    ).group_by(group).order_by(group)
+    if location_id is not None:
+        query = query.where(StockRollup.location_id == location_id)
+    if sku_id is not None:
+        query = query.where(StockRollup.sku_id == sku_id)
+    filters = {"location_id": location_id, "sku_id": sku_id}
+    return [StockSummary(**{**filters, **row}) for row in db.execute(query).mappings()]
@@ -0,0 +1,186 @@
+# domain/search.py
+
+from sqlmodel import Session, select, SQLModel
+from uuid import UUID
+from datetime import datetime, timedelta
+from threading import Lock
+import bisect
+import heapq
+import os
+import re
+import time
+import unicodedata
+from models.wine_sku import WineSKU
+
+# How stale the index may get before a search pulls rows written by other workers
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "30"))
+# updated_at is stamped when a row is written, not when it commits, so a pull also rereads rows this far behind
+# the watermark; a transaction that stays open longer than this between writing a wine and committing is missed.
+SEARCH_SETTLE_SECONDS = float(os.getenv("SEARCH_SETTLE_SECONDS", "60"))
+# Cap on how many index tokens a single short prefix may expand to
+PREFIX_EXPANSION_LIMIT = 500
+
+_FIELD_WEIGHTS = {"wine_name": 3.0, "producer": 2.0, "grape_varieties": 2.0, "region": 1.0}
+_PREFIX_FACTOR = 0.6
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+class WineSearchFilter(SQLModel):
+    vintage_year: int | None = None
+    country: str | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+
+def tokenize(text: str) -> list[str]:
+    # Case- and accent-insensitive: "Côte-Rôtie" -> ["cote", "rotie"]
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return _TOKEN_PATTERN.findall(folded)
+
+class WineSearchIndex:
+    """In-process inverted index over wine name, producer, region and grape varieties."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._clear()
+
+    def _clear(self):
+        self._built = False
+        self._postings: dict[str, dict[int, float]] = {}
+        self._sorted_tokens: list[str] = []
+        self._doc_by_id: dict[UUID, int] = {}
+        self._doc_tokens: list[set[str]] = []
+        self._ids: list[UUID] = []
+        self._names: list[str] = []
+        self._vintages: list[int] = []
+        self._countries: list[str] = []
+        self._prices: list[float] = []
+        self._watermark: datetime | None = None
+        self._refreshed_at = 0.0
+
+    def _index_row(self, row):
+        # Caller holds the lock
+        weights: dict[str, float] = {}
+        for field, weight in _FIELD_WEIGHTS.items():
+            value = getattr(row, field)
+            text = " ".join(value) if isinstance(value, list) else (value or "")
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0.0), weight)
+
+        doc = self._doc_by_id.get(row.id)
+        if doc is None:
+            doc = len(self._ids)
+            self._doc_by_id[row.id] = doc
+            self._ids.append(row.id)
+            self._names.append(row.wine_name)
+            self._vintages.append(row.vintage_year)
+            self._countries.append(row.country.lower())
+            self._prices.append(row.price_bottle)
+            self._doc_tokens.append(set())
+        else:
+            self._names[doc] = row.wine_name
+            self._vintages[doc] = row.vintage_year
+            self._countries[doc] = row.country.lower()
+            self._prices[doc] = row.price_bottle
+            for token in self._doc_tokens[doc] - weights.keys():
+                del self._postings[token][doc]
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                if self._built:
+                    bisect.insort(self._sorted_tokens, token)
+            postings[doc] = weight
+        self._doc_tokens[doc] = set(weights)
+        if row.updated_at is not None and (self._watermark is None or row.updated_at > self._watermark):
+            self._watermark = row.updated_at
+
+    def _load(self, db: Session):
+        query = select(
+            WineSKU.id, WineSKU.wine_name, WineSKU.producer, WineSKU.region, WineSKU.grape_varieties,
+            WineSKU.vintage_year, WineSKU.country, WineSKU.price_bottle, WineSKU.updated_at,
+        )
+        if self._built and self._watermark is not None:
+            # Rows already indexed are re-indexed in place by id, so the overlap only costs the reread
+            query = query.where(WineSKU.updated_at >= self._watermark - timedelta(seconds=SEARCH_SETTLE_SECONDS))
+        self.load_rows(db.exec(query.execution_options(yield_per=5000)))
+
+    def load_rows(self, rows):
+        """Index rows carrying the searchable columns (ORM objects or result rows)."""
+        with self._lock:
+            for row in rows:
+                self._index_row(row)
+            if not self._built:
+                self._sorted_tokens = sorted(self._postings)
+                self._built = True
+            self._refreshed_at = time.monotonic()
+
+    def refresh(self, db: Session):
+        if not self._built or time.monotonic() - self._refreshed_at > SEARCH_REFRESH_SECONDS:
+            self._load(db)
+
+    def add(self, wine: WineSKU):
+        """Index a wine written by this worker; no-op until the index has been built."""
+        with self._lock:
+            if self._built:
+                self._index_row(wine)
+
+    def mark_stale(self):
+        """Make the next search pull rows written since the watermark, e.g. after a bulk import."""
+        with self._lock:
+            self._refreshed_at = 0.0
+
+    def reset(self):
+        """Drop everything; the next search rebuilds from the database."""
+        with self._lock:
+            self._clear()
+
+    def _token_matches(self, token: str) -> dict[int, float]:
+        scores = dict(self._postings.get(token, {}))
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        for candidate in self._sorted_tokens[start:start + PREFIX_EXPANSION_LIMIT]:
+            if not candidate.startswith(token):
+                break
+            if candidate == token:
+                continue
+            for doc, weight in self._postings[candidate].items():
+                score = weight * _PREFIX_FACTOR
+                if score > scores.get(doc, 0.0):
+                    scores[doc] = score
+        return scores
+
+    def _accepts(self, doc: int, filters: WineSearchFilter) -> bool:
+        if filters.vintage_year is not None and self._vintages[doc] != filters.vintage_year:
+            return False
+        if filters.country is not None and self._countries[doc] != filters.country.lower():
+            return False
+        if filters.min_price is not None and self._prices[doc] < filters.min_price:
+            return False
+        if filters.max_price is not None and self._prices[doc] > filters.max_price:
+            return False
+        return True
+
+    def search(self, query: str, filters: WineSearchFilter, limit: int) -> list[UUID]:
+        """Ids of the best matches; every query term must match a token or token prefix."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            # Intersect from the smallest match set so the running totals stay small
+            matches = sorted((self._token_matches(token) for token in set(tokens)), key=len)
+            totals = {doc: score for doc, score in matches[0].items() if self._accepts(doc, filters)}
+            for other in matches[1:]:
+                totals = {doc: total + other[doc] for doc, total in totals.items() if doc in other}
+            if not totals:
+                return []
+            best = heapq.nsmallest(limit, totals, key=lambda doc: (-totals[doc], self._names[doc]))
+            return [self._ids[doc] for doc in best]
+
+wine_search_index = WineSearchIndex()
+
+def search_wines(db: Session, query: str, filters: WineSearchFilter, limit: int) -> list[WineSKU]:
+    wine_search_index.refresh(db)
+    ids = wine_search_index.search(query, filters, limit)
+    if not ids:
+        return []
+    wines = {wine.id: wine for wine in db.exec(select(WineSKU).where(WineSKU.id.in_(ids)))}
+    return [wines[wine_id] for wine_id in ids if wine_id in wines]
@@ -0,0 +1,180 @@
+# domain/snapshot.py
+
+from sqlmodel import Session, select, SQLModel
+from sqlalchemy import func, insert, text, union_all
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta
+import os
+from core.database import SessionLocal
+from models.movement import Movement
+from models.stock import Stock
+from models.stock_snapshot import StockCheckpoint, StockSnapshot
+from domain.pagination import naive_utc
+from domain.movement_archive import archived_stock_deltas
+
+# Movements younger than this are left for the next checkpoint, so rows still being committed are not skipped
+SNAPSHOT_SETTLE_SECONDS = int(os.getenv("SNAPSHOT_SETTLE_SECONDS", "300"))
+# In-app checkpoint schedule; 0 leaves checkpoints to `python manage.py snapshot` (e.g. from cron)
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "0"))
+
+# Postgres advisory lock serializing checkpoint builds across workers, cron and the API
+_CHECKPOINT_LOCK_KEY = 5_704_001
+_EPOCH = datetime(1970, 1, 1)
+
+class StockBalance(SQLModel):
+    sku_id: UUID
+    lot_id: UUID | None = None
+    location_id: UUID
+    quantity: int
+
+def _movement_legs(after: datetime | None, until: datetime | None, location_id: UUID | None = None, sku_id: UUID | None = None) -> list:
+    # Each movement contributes +quantity at its destination and -quantity at its source
+    inbound = select(
+        Movement.sku_id.label("sku_id"),
+        Movement.to_lot_id.label("lot_id"),
+        Movement.to_location_id.label("location_id"),
+        Movement.quantity.label("quantity"),
+    ).where(Movement.to_location_id.is_not(None))
+    outbound = select(
+        Movement.sku_id.label("sku_id"),
+        Movement.from_lot_id.label("lot_id"),
+        Movement.from_location_id.label("location_id"),
+        (-Movement.quantity).label("quantity"),
+    ).where(Movement.from_location_id.is_not(None))
+    if until is not None:
+        inbound = inbound.where(Movement.created_at <= until)
+        outbound = outbound.where(Movement.created_at <= until)
+    if after is not None:
+        inbound = inbound.where(Movement.created_at > after)
+        outbound = outbound.where(Movement.created_at > after)
+    if location_id is not None:
+        inbound = inbound.where(Movement.to_location_id == location_id)
+        outbound = outbound.where(Movement.from_location_id == location_id)
+    if sku_id is not None:
+        inbound = inbound.where(Movement.sku_id == sku_id)
+        outbound = outbound.where(Movement.sku_id == sku_id)
+    return [inbound, outbound]
+
+def _balances(db: Session, checkpoint: StockCheckpoint | None, until: datetime, location_id: UUID | None = None, sku_id: UUID | None = None):
+    # Checkpoint lines plus the movements after it, summed in one query
+    parts = _movement_legs(checkpoint.taken_at if checkpoint else None, until, location_id, sku_id)
+    if checkpoint is not None:
+        lines = select(
+            StockSnapshot.sku_id.label("sku_id"),
+            StockSnapshot.lot_id.label("lot_id"),
+            StockSnapshot.location_id.label("location_id"),
+            StockSnapshot.quantity.label("quantity"),
+        ).where(StockSnapshot.checkpoint_id == checkpoint.id)
+        if location_id is not None:
+            lines = lines.where(StockSnapshot.location_id == location_id)
+        if sku_id is not None:
+            lines = lines.where(StockSnapshot.sku_id == sku_id)
+        parts.append(lines)
+    combined = union_all(*parts).subquery()
+    total = func.sum(combined.c.quantity)
+    return db.execute(
+        select(combined.c.sku_id, combined.c.lot_id, combined.c.location_id, total.label("quantity"))
+        .group_by(combined.c.sku_id, combined.c.lot_id, combined.c.location_id)
+        .having(total != 0)
+    ).all()
+
+def _opening_balances(db: Session) -> dict:
+    # Stock that predates the ledger: what the stocks table holds beyond the sum of every movement, live or archived.
+    # One statement, so the stocks table and the movements are read at the same point in time.
+    ledger = union_all(*_movement_legs(None, None)).subquery()
+    combined = union_all(
+        select(Stock.sku_id.label("sku_id"), Stock.lot_id.label("lot_id"), Stock.location_id.label("location_id"), Stock.quantity.label("quantity")),
+        select(ledger.c.sku_id, ledger.c.lot_id, ledger.c.location_id, (-ledger.c.quantity).label("quantity")),
+    ).subquery()
+    total = func.sum(combined.c.quantity)
+    opening = {
+        (sku_id, lot_id, location_id): quantity for sku_id, lot_id, location_id, quantity in db.execute(
+            select(combined.c.sku_id, combined.c.lot_id, combined.c.location_id, total)
+            .group_by(combined.c.sku_id, combined.c.lot_id, combined.c.location_id)
+        ).all()
+    }
+    for key, quantity in archived_stock_deltas(db, None, datetime.utcnow()).items():
+        opening[key] = opening.get(key, 0) - quantity
+    return {key: quantity for key, quantity in opening.items() if quantity != 0}
+
+def _latest_checkpoint(db: Session, at: datetime | None = None) -> StockCheckpoint | None:
+    query = select(StockCheckpoint).order_by(StockCheckpoint.taken_at.desc()).limit(1)
+    if at is not None:
+        query = query.where(StockCheckpoint.taken_at <= at)
+    return db.exec(query).first()
+
+def _lock_checkpoints(db: Session):
+    # Held until the transaction ends; a builder that waited here then finds the checkpoint the other one wrote.
+    # SQLite has no equivalent, so concurrent builders there are only safe with a single worker.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CHECKPOINT_LOCK_KEY})
+
+def take_checkpoint(db: Session, until: datetime | None = None) -> StockCheckpoint:
+    """Fold the movements since the previous checkpoint into a new per-(sku, lot, location) snapshot."""
+    until = until or datetime.utcnow() - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+    _lock_checkpoints(db)
+    previous = _latest_checkpoint(db)
+    if previous is not None and previous.taken_at >= until:
+        return previous
+    return _write_checkpoint(db, previous, until)
+
+def checkpoint_at(db: Session, at: datetime) -> StockCheckpoint:
+    """A checkpoint exactly at `at`, built behind the latest one if need be; archival puts one on every period boundary."""
+    _lock_checkpoints(db)
+    previous = _latest_checkpoint(db, at)
+    if previous is not None and previous.taken_at == at:
+        return previous
+    return _write_checkpoint(db, previous, at)
+
+def _add_checkpoint(db: Session, until: datetime, balances) -> StockCheckpoint:
+    checkpoint = StockCheckpoint(taken_at=until)
+    rows = [
+        {"id": uuid4(), "checkpoint_id": checkpoint.id, "sku_id": sku_id, "lot_id": lot_id, "location_id": location_id, "quantity": quantity}
+        for sku_id, lot_id, location_id, quantity in balances
+    ]
+    checkpoint.line_count = len(rows)
+    db.add(checkpoint)
+    db.flush()
+    if rows:
+        db.execute(insert(StockSnapshot), rows)
+    return checkpoint
+
+def _write_checkpoint(db: Session, previous: StockCheckpoint | None, until: datetime) -> StockCheckpoint:
+    if previous is None:
+        # The chain opens at the epoch with the stock no movement accounts for, so every later checkpoint carries it
+        opening = _opening_balances(db)
+        previous = _add_checkpoint(db, _EPOCH, [(*key, quantity) for key, quantity in opening.items()])
+    checkpoint = _add_checkpoint(db, until, _balances(db, previous, until))
+    db.commit()
+    db.refresh(checkpoint)
+    return checkpoint
+
+def get_stock_as_of(db: Session, at: datetime, location_id: UUID | None = None, sku_id: UUID | None = None) -> list[StockBalance]:
+    """On-hand balances at `at`, replaying only the movements after the nearest earlier checkpoint.
+
+    Stock rows that predate the ledger (no opening movement) are carried by the first checkpoint, which
+    opens the chain at the epoch; until a checkpoint has been taken they are missing from the result.
+    """
+    at = naive_utc(at)
+    checkpoint = _latest_checkpoint(db, at)
+    rows = _balances(db, checkpoint, at, location_id, sku_id)
+    # Movements of archived periods are no longer in the table; their legs come from the archive files
+    archived = archived_stock_deltas(db, checkpoint.taken_at if checkpoint else None, at, location_id, sku_id)
+    if archived:
+        for row_sku_id, lot_id, row_location_id, quantity in rows:
+            key = (row_sku_id, lot_id, row_location_id)
+            archived[key] = archived.get(key, 0) + quantity
+        rows = [(*key, quantity) for key, quantity in archived.items() if quantity != 0]
+    return [
+        StockBalance(sku_id=row_sku_id, lot_id=lot_id, location_id=row_location_id, quantity=quantity)
+        for row_sku_id, lot_id, row_location_id, quantity in rows
+    ]
+
+def _scheduled_until() -> datetime:
+    # Rounded down to the schedule, so every worker running it asks for the same checkpoint and all but one find it taken
+    settled = (datetime.utcnow() - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS) - _EPOCH).total_seconds()
+    return _EPOCH + timedelta(seconds=settled // SNAPSHOT_INTERVAL_SECONDS * SNAPSHOT_INTERVAL_SECONDS)
+
+def run_checkpoint(scheduled: bool = False) -> StockCheckpoint:
+    with SessionLocal() as db:
+        return take_checkpoint(db, _scheduled_until() if scheduled and SNAPSHOT_INTERVAL_SECONDS > 0 else None)
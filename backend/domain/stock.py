@@ -1,25 +1,155 @@
 # domain/stock.py
 
-from sqlmodel import Session, select, SQLModel
-from uuid import UUID
+from sqlmodel import Session, Field, select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import and_, insert, update
+from sqlalchemy.exc import IntegrityError
+from uuid import UUID, uuid4
+from datetime import datetime
 from fastapi import HTTPException
 from models.stock import Stock
+from core.changes import record_changes
+from domain.batch import fetch_by_ids
+from domain.pagination import Page, paginate, stream_ndjson
+from domain.conditional import Validators, page_version
+from domain.rollup import apply_rollup_deltas
+from domain.storage_lot import apply_lot_occupancy
+
+# (sku_id, lot_id, location_id) -- the unique key of a stock balance
+StockKey = tuple[UUID, UUID | None, UUID]
+
+class StockFilter(SQLModel):
+    sku_id: UUID | None = None
+    location_id: UUID | None = None
+    lot_id: UUID | None = None
+
+class InsufficientStockError(HTTPException):
+    def __init__(self, key: StockKey):
+        self.key = key
+        sku_id, lot_id, location_id = key
+        lot = f" lot {lot_id}" if lot_id is not None else ""
+        super().__init__(status_code=409, detail=f"Insufficient stock for sku {sku_id} at location {location_id}{lot}")
+
+class StockExistsError(HTTPException):
+    def __init__(self, key: StockKey):
+        sku_id, lot_id, location_id = key
+        lot = f" lot {lot_id}" if lot_id is not None else ""
+        super().__init__(status_code=409, detail=f"Stock for sku {sku_id} at location {location_id}{lot} already exists; post a movement to change it")
 
 class StockCreate(SQLModel):
+    # An opening balance; it is posted as an Adjustment movement like any other change to stock
     sku_id: UUID
     lot_id: UUID | None = None
     location_id: UUID
-    quantity: int
+    quantity: int = Field(gt=0)
+    performed_by: UUID
+    reason: str | None = "Opening balance"
+
+def _stock_row(key: StockKey):
+    sku_id, lot_id, location_id = key
+    lot_clause = Stock.lot_id.is_(None) if lot_id is None else Stock.lot_id == lot_id
+    return and_(Stock.sku_id == sku_id, lot_clause, Stock.location_id == location_id)
+
+def _stock_key_order(key: StockKey):
+    sku_id, lot_id, location_id = key
+    return (str(sku_id), str(lot_id) if lot_id is not None else "", str(location_id))
+
+def _apply_stock_delta(db: Session, key: StockKey, delta: int, now: datetime) -> UUID:
+    # Single conditional UPDATE: row-level lock only, and the guard rejects negative balances.
+    # Returns the balance's id for the change log.
+    stock_id = db.execute(
+        update(Stock)
+        .where(_stock_row(key), Stock.quantity + delta >= 0)
+        .values(quantity=Stock.quantity + delta, updated_at=now)
+        .returning(Stock.id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if stock_id is not None:
+        return stock_id
+    if delta < 0:
+        raise InsufficientStockError(key)
+
+    # First receipt for this sku/lot/location; a concurrent posting may create the row first
+    sku_id, lot_id, location_id = key
+    stock_id = uuid4()
+    try:
+        with db.begin_nested():
+            db.execute(insert(Stock).values(
+                id=stock_id, sku_id=sku_id, lot_id=lot_id, location_id=location_id, quantity=delta, updated_at=now
+            ))
+    except IntegrityError:
+        stock_id = db.execute(
+            update(Stock)
+            .where(_stock_row(key))
+            .values(quantity=Stock.quantity + delta, updated_at=now)
+            .returning(Stock.id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+    return stock_id
+
+def apply_stock_deltas(db: Session, deltas: dict[StockKey, int]):
+    """Apply quantity deltas to stock balances inside the caller's transaction.
+
+    Keys are applied in a fixed order so concurrent postings touching the
+    same balances always lock their rows in the same sequence. The
+    per-location rollups and lot occupancy counters are updated in the
+    same transaction.
+    """
+    now = datetime.utcnow()
+    rollup_deltas: dict[tuple[UUID, UUID], int] = {}
+    lot_deltas: dict[UUID, int] = {}
+    changed = []
+    for key in sorted(deltas, key=_stock_key_order):
+        if deltas[key]:
+            sku_id, lot_id, location_id = key
+            changed.append((_apply_stock_delta(db, key, deltas[key], now), location_id))
+            rollup_deltas[(sku_id, location_id)] = rollup_deltas.get((sku_id, location_id), 0) + deltas[key]
+            if lot_id is not None:
+                lot_deltas[lot_id] = lot_deltas.get(lot_id, 0) + deltas[key]
+    apply_rollup_deltas(db, rollup_deltas)
+    apply_lot_occupancy(db, lot_deltas)
+    record_changes(db, "stock", changed)
 
-def create_stock(db: Session, stock: StockCreate) -> Stock:
-    db_stock = Stock(**stock.model_dump())
-    db.add(db_stock)
-    db.commit()
-    db.refresh(db_stock)
-    return db_stock
+def find_stock(db: Session, key: StockKey) -> Stock | None:
+    return db.exec(select(Stock).where(_stock_row(key))).first()
+
+def get_stock_balance(db: Session, key: StockKey) -> int:
+    quantity = db.exec(select(Stock.quantity).where(_stock_row(key))).first()
+    return quantity or 0
 
 def get_stock(db: Session, stock_id: UUID) -> Stock:
     stock = db.exec(select(Stock).where(Stock.id == stock_id)).first()
+    if stock is None:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    return stock
+
+def get_stocks_by_ids(db: Session, ids: list[UUID]) -> list[Stock]:
+    return fetch_by_ids(db, Stock, ids)
+
+# Balances have no creation time and updated_at moves on every posting, so pages are keyed on id
+STOCK_SORT_KEY = [Stock.id]
+
+def stock_list_query(filters: StockFilter):
+    query = select(Stock)
+    if filters.sku_id is not None:
+        query = query.where(Stock.sku_id == filters.sku_id)
+    if filters.location_id is not None:
+        query = query.where(Stock.location_id == filters.location_id)
+    if filters.lot_id is not None:
+        query = query.where(Stock.lot_id == filters.lot_id)
+    return query
+
+def list_stocks(db: Session, filters: StockFilter, cursor: str | None, limit: int) -> Page[Stock]:
+    return paginate(db, stock_list_query(filters), STOCK_SORT_KEY, cursor, limit)
+
+def list_stocks_version(db: Session, filters: StockFilter, cursor: str | None, limit: int) -> Validators:
+    return page_version(db, stock_list_query(filters), STOCK_SORT_KEY, cursor, limit)
+
+def stream_stocks(db: Session, filters: StockFilter):
+    return stream_ndjson(db, stock_list_query(filters), STOCK_SORT_KEY)
+
+async def get_stock_async(db: AsyncSession, stock_id: UUID) -> Stock:
+    stock = (await db.exec(select(Stock).where(Stock.id == stock_id))).first()
     if stock is None:
         raise HTTPException(status_code=404, detail="Stock not found")
     return stock
\ No newline at end of file
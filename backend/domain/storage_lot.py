@@ -1,24 +1,157 @@
 # domain/storage_lot.py
 
 from sqlmodel import Session, select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, update
 from uuid import UUID
+from datetime import datetime
 from fastapi import HTTPException
+from core.cache import EntityCache
+from core.changes import record_changes
+from models.stock import Stock
 from models.storage_lot import StorageLot
+from domain.batch import fetch_by_ids
+
+storage_lot_cache = EntityCache("storage_lot", StorageLot)
 
 class StorageLotCreate(SQLModel):
     location_id: UUID
     lot_name: str
     capacity: int
 
+class LotOccupancy(SQLModel):
+    lot_id: UUID
+    lot_name: str
+    location_id: UUID
+    capacity: int
+    occupied: int
+    free: int
+
+class LotOccupancyMismatch(SQLModel):
+    lot_id: UUID
+    location_id: UUID
+    expected_occupied: int
+    occupied: int
+
+class LotCapacityError(HTTPException):
+    def __init__(self, lot_id: UUID, draining: bool = False):
+        self.lot_id = lot_id
+        if draining:
+            detail = f"Storage lot {lot_id} holds fewer bottles than are being removed"
+        else:
+            detail = f"Storage lot {lot_id} does not have enough free capacity"
+        super().__init__(status_code=409, detail=detail)
+
 def create_storage_lot(db: Session, storage_lot: StorageLotCreate) -> StorageLot:
     db_storage_lot = StorageLot(**storage_lot.model_dump())
     db.add(db_storage_lot)
+    record_changes(db, "storage_lot", [(db_storage_lot.id, db_storage_lot.location_id)])
     db.commit()
     db.refresh(db_storage_lot)
+    storage_lot_cache.set(db_storage_lot)
     return db_storage_lot
 
 def get_storage_lot(db: Session, storage_lot_id: UUID) -> StorageLot:
+    storage_lot = storage_lot_cache.get(storage_lot_id)
+    if storage_lot is not None:
+        return storage_lot
     storage_lot = db.exec(select(StorageLot).where(StorageLot.id == storage_lot_id)).first()
     if storage_lot is None:
         raise HTTPException(status_code=404, detail="Storage lot not found")
+    storage_lot_cache.fill(db, storage_lot)
+    return storage_lot
+
+def get_storage_lots_by_ids(db: Session, ids: list[UUID]) -> list[StorageLot]:
+    return fetch_by_ids(db, StorageLot, ids, storage_lot_cache)
+
+def apply_lot_occupancy(db: Session, deltas: dict[UUID, int]):
+    """Move lot occupancy counters inside the caller's transaction, refusing to exceed capacity."""
+    now = datetime.utcnow()
+    for lot_id in sorted(deltas, key=str):
+        delta = deltas[lot_id]
+        if not delta:
+            continue
+        guard = [StorageLot.id == lot_id, StorageLot.occupied + delta >= 0]
+        if delta > 0:
+            # Only receipts are checked, so a lot already over capacity can still be emptied
+            guard.append(StorageLot.occupied + delta <= StorageLot.capacity)
+        location_id = db.execute(
+            update(StorageLot)
+            .where(*guard)
+            .values(occupied=StorageLot.occupied + delta, updated_at=now)
+            .returning(StorageLot.location_id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if location_id is None:
+            raise LotCapacityError(lot_id, draining=delta < 0)
+        storage_lot_cache.invalidate(lot_id)
+        record_changes(db, "storage_lot", [(lot_id, location_id)])
+
+def _occupancy(lot) -> LotOccupancy:
+    return LotOccupancy(
+        lot_id=lot.id, lot_name=lot.lot_name, location_id=lot.location_id,
+        capacity=lot.capacity, occupied=lot.occupied, free=max(lot.capacity - lot.occupied, 0),
+    )
+
+def get_lot_occupancy(db: Session, storage_lot_id: UUID) -> LotOccupancy:
+    # Read past the cache: the counter moves with every posting
+    lot = db.exec(select(StorageLot).where(StorageLot.id == storage_lot_id)).first()
+    if lot is None:
+        raise HTTPException(status_code=404, detail="Storage lot not found")
+    return _occupancy(lot)
+
+def list_free_space(db: Session, location_id: UUID, min_free: int = 1, limit: int = 20) -> list[LotOccupancy]:
+    """Lots at a location with at least `min_free` free slots, roomiest first."""
+    free = StorageLot.capacity - StorageLot.occupied
+    lots = db.exec(
+        select(StorageLot)
+        .where(StorageLot.location_id == location_id, free >= min_free)
+        .order_by(free.desc(), StorageLot.lot_name)
+        .limit(limit)
+    )
+    return [_occupancy(lot) for lot in lots]
+
+def check_lot_occupancy(db: Session) -> list[LotOccupancyMismatch]:
+    """Lots whose occupied counter disagrees with the stock held in them."""
+    expected = select(func.coalesce(func.sum(Stock.quantity), 0)).where(Stock.lot_id == StorageLot.id).scalar_subquery()
+    rows = db.execute(
+        select(StorageLot.id.label("lot_id"), StorageLot.location_id, expected.label("expected_occupied"), StorageLot.occupied)
+        .where(StorageLot.occupied != expected)
+    ).mappings()
+    return [LotOccupancyMismatch(**row) for row in rows]
+
+def rebuild_lot_occupancy(db: Session) -> int:
+    """Reset every drifted occupied counter to the stock held in the lot; returns how many were wrong."""
+    mismatches = check_lot_occupancy(db)
+    now = datetime.utcnow()
+    for mismatch in mismatches:
+        db.execute(
+            update(StorageLot)
+            .where(StorageLot.id == mismatch.lot_id)
+            .values(occupied=mismatch.expected_occupied, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    record_changes(db, "storage_lot", [(mismatch.lot_id, mismatch.location_id) for mismatch in mismatches])
+    db.commit()
+    for mismatch in mismatches:
+        storage_lot_cache.invalidate(mismatch.lot_id)
+    return len(mismatches)
+
+async def create_storage_lot_async(db: AsyncSession, storage_lot: StorageLotCreate) -> StorageLot:
+    db_storage_lot = StorageLot(**storage_lot.model_dump())
+    db.add(db_storage_lot)
+    record_changes(db, "storage_lot", [(db_storage_lot.id, db_storage_lot.location_id)])
+    await db.commit()
+    await db.refresh(db_storage_lot)
+    storage_lot_cache.set(db_storage_lot)
+    return db_storage_lot
+
+async def get_storage_lot_async(db: AsyncSession, storage_lot_id: UUID) -> StorageLot:
+    storage_lot = storage_lot_cache.get(storage_lot_id)
+    if storage_lot is not None:
+        return storage_lot
+    storage_lot = (await db.exec(select(StorageLot).where(StorageLot.id == storage_lot_id))).first()
+    if storage_lot is None:
+        raise HTTPException(status_code=404, detail="Storage lot not found")
+    storage_lot_cache.fill(db, storage_lot)
     return storage_lot
\ No newline at end of file
@@ -1,13 +1,32 @@
 # domain/user.py
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from uuid import UUID
+from datetime import datetime
 from fastapi import HTTPException
+from core.cache import EntityCache
+from core.security import MAX_PASSWORD_BYTES, hash_password
 from models.user import User, UserRole
-from sqlalchemy.orm import Session
-from core.database import get_db
-import bcrypt
+from domain.batch import fetch_by_ids
 from sqlmodel import SQLModel
+import os
+
+# Token checks read role and is_active from here; entries are dropped when either changes,
+# and the TTL bounds how long another worker's memory cache can lag behind
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+MIN_PASSWORD_LENGTH = 8
+
+user_cache = EntityCache("user", User)
+
+class UserPrincipal(SQLModel):
+    id: UUID
+    role: UserRole
+    is_active: bool
+
+principal_cache = EntityCache("user_principal", UserPrincipal, max_entries=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
 
 class UserCreate(SQLModel):
     first_name: str
@@ -15,17 +34,158 @@ class UserCreate(SQLModel):
     email: str
     contact: str | None = None
     role: UserRole
-    hashed_password: str
+    password: str
+
+class UserUpdate(SQLModel):
+    first_name: str | None = None
+    last_name: str | None = None
+    email: str | None = None
+    contact: str | None = None
+    role: UserRole | None = None
+    is_active: bool | None = None
+    password: str | None = None
+
+class UserRead(SQLModel):
+    # Everything but the password hash
+    id: UUID
+    first_name: str
+    last_name: str
+    email: str
+    contact: str | None = None
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+class DuplicateEmailError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=409, detail="A user with this email already exists")
 
-def create_user(db: Session, user: UserCreate) -> User:
-    db_user = User(**user.model_dump())
+def user_reads(users: list[User]) -> list[UserRead]:
+    return [UserRead.model_validate(user) for user in users]
+
+async def hash_new_password(password: str) -> str:
+    if len(password) < MIN_PASSWORD_LENGTH:
+        raise HTTPException(status_code=422, detail=f"Password must be at least {MIN_PASSWORD_LENGTH} characters")
+    if len(password.encode()) > MAX_PASSWORD_BYTES:
+        raise HTTPException(status_code=422, detail=f"Password must be at most {MAX_PASSWORD_BYTES} bytes")
+    return await hash_password(password)
+
+def create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    db_user = User(**user.model_dump(exclude={"password"}), hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise DuplicateEmailError()
     db.refresh(db_user)
+    user_cache.set(db_user)
     return db_user
 
 def get_user(db: Session, user_id: UUID) -> User:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
     user = db.exec(select(User).where(User.id == user_id)).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
+    user_cache.fill(db, user)
+    return user
+
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.exec(select(User).where(User.email == email)).first()
+
+def get_users_by_ids(db: Session, ids: list[UUID]) -> list[User]:
+    return fetch_by_ids(db, User, ids, user_cache)
+
+def _apply_update(user: User, changes: UserUpdate, hashed_password: str | None) -> bool:
+    # Returns whether the change affects what a token grants
+    values = changes.model_dump(exclude_unset=True, exclude={"password"})
+    # contact is the only nullable field; an explicit null elsewhere means "leave as is"
+    values = {name: value for name, value in values.items() if value is not None or name == "contact"}
+    access_changed = any(name in values and values[name] != getattr(user, name) for name in ("role", "is_active"))
+    for name, value in values.items():
+        setattr(user, name, value)
+    if hashed_password is not None:
+        user.hashed_password = hashed_password
+    user.updated_at = datetime.utcnow()
+    return access_changed
+
+def _updated(user: User, access_changed: bool):
+    user_cache.set(user)
+    if access_changed:
+        principal_cache.invalidate(user.id)
+
+def update_user(db: Session, user_id: UUID, changes: UserUpdate, hashed_password: str | None = None) -> User:
+    user = db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    access_changed = _apply_update(user, changes, hashed_password)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise DuplicateEmailError()
+    db.refresh(user)
+    _updated(user, access_changed)
+    return user
+
+def get_principal(db: Session, user_id: UUID) -> UserPrincipal | None:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = db.execute(select(User.id, User.role, User.is_active).where(User.id == user_id)).first()
+        if row is None:
+            return None
+        principal = UserPrincipal(id=row.id, role=row.role, is_active=row.is_active)
+        principal_cache.fill(db, principal)
+    return principal
+
+async def create_user_async(db: AsyncSession, user: UserCreate, hashed_password: str) -> User:
+    db_user = User(**user.model_dump(exclude={"password"}), hashed_password=hashed_password)
+    db.add(db_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise DuplicateEmailError()
+    await db.refresh(db_user)
+    user_cache.set(db_user)
+    return db_user
+
+async def get_user_async(db: AsyncSession, user_id: UUID) -> User:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    user = (await db.exec(select(User).where(User.id == user_id))).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_cache.fill(db, user)
+    return user
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User | None:
+    return (await db.exec(select(User).where(User.email == email))).first()
+
+async def update_user_async(db: AsyncSession, user_id: UUID, changes: UserUpdate, hashed_password: str | None = None) -> User:
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    access_changed = _apply_update(user, changes, hashed_password)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise DuplicateEmailError()
+    await db.refresh(user)
+    _updated(user, access_changed)
+    return user
+
+async def get_principal_async(db: AsyncSession, user_id: UUID) -> UserPrincipal | None:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = (await db.execute(select(User.id, User.role, User.is_active).where(User.id == user_id))).first()
+        if row is None:
+            return None
+        principal = UserPrincipal(id=row.id, role=row.role, is_active=row.is_active)
+        principal_cache.fill(db, principal)
+    return principal
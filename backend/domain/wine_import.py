@@ -0,0 +1,161 @@
+# domain/wine_import.py
+
+from sqlmodel import Session, SQLModel
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from pydantic import ValidationError
+from typing import BinaryIO, Callable, Iterable, Iterator
+from uuid import UUID, uuid4
+from datetime import datetime
+import csv
+import io
+import json
+from core.changes import record_changes
+from core.database import SessionLocal
+from models.wine_sku import WineSKU, WineSKUCreate
+from domain.rollup import refresh_rollup_values
+from domain.search import wine_search_index
+from domain.wine_sku import barcode_cache, wine_cache
+
+IMPORT_CHUNK_SIZE = 1000
+# Uploads larger than this are spooled to disk before the import reads them
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+_LIST_FIELDS = ("grape_varieties", "condition_notes")
+_COLUMNS = [column.name for column in WineSKU.__table__.columns]
+# Columns refreshed when an existing product_code is re-imported
+_UPDATE_COLUMNS = [name for name in _COLUMNS if name not in ("id", "product_code", "created_at")]
+
+class ImportRowError(SQLModel):
+    line: int
+    error: str
+
+class ImportReport(SQLModel):
+    processed: int = 0
+    imported: int = 0
+    rejected: int = 0
+    errors: list[ImportRowError] = []
+
+def _csv_rows(lines: Iterable[str]) -> Iterator[tuple[int, dict | str]]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        # Blank cells mean "not set"; list cells are a JSON array or ';'-separated values
+        record = {key: value for key, value in row.items() if key and value not in (None, "")}
+        try:
+            for field in _LIST_FIELDS:
+                value = record.get(field)
+                if value is not None:
+                    record[field] = json.loads(value) if value.lstrip().startswith("[") else [part.strip() for part in value.split(";") if part.strip()]
+        except json.JSONDecodeError as exc:
+            yield reader.line_num, f"{field}: invalid JSON: {exc.msg}"
+            continue
+        yield reader.line_num, record
+
+def _jsonl_rows(lines: Iterable[str]) -> Iterator[tuple[int, dict | str]]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, f"invalid JSON: {exc.msg}"
+
+def _upsert_statement(db: Session, rows: list[dict]):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(WineSKU.__table__).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=["product_code"],
+        set_={name: statement.excluded[name] for name in _UPDATE_COLUMNS},
+    ).returning(WineSKU.__table__.c.id)
+
+def _copy_upsert(db: Session, rows: list[dict]) -> list[UUID]:
+    # COPY the chunk into a temp table, then upsert it set-based
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(row[name]) if name in _LIST_FIELDS and row[name] is not None
+            else row[name].isoformat() if isinstance(row[name], datetime)
+            else r"\N" if row[name] is None
+            else row[name]
+            for name in _COLUMNS
+        ])
+    buffer.seek(0)
+
+    columns = ", ".join(_COLUMNS)
+    db.execute(text("CREATE TEMP TABLE wine_import (LIKE wineskus INCLUDING DEFAULTS) ON COMMIT DROP"))
+    cursor = db.connection().connection.driver_connection.cursor()
+    cursor.copy_expert(f"COPY wine_import ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+    updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in _UPDATE_COLUMNS)
+    result = db.execute(text(
+        f"INSERT INTO wineskus ({columns}) SELECT {columns} FROM wine_import "
+        f"ON CONFLICT (product_code) DO UPDATE SET {updates} RETURNING id"
+    ))
+    return [UUID(str(row_id)) for row_id in result.scalars()]
+
+def _write_chunk(db: Session, rows: list[dict]) -> list[UUID]:
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        ids = _copy_upsert(db, rows)
+    elif bind.dialect.name in ("postgresql", "sqlite"):
+        ids = list(db.execute(_upsert_statement(db, rows)).scalars())
+    else:
+        ids = [db.merge(WineSKU(**row)).id for row in rows]
+    # Re-imported wines may carry new prices
+    refresh_rollup_values(db, ids)
+    record_changes(db, "wine", [(wine_id, None) for wine_id in ids])
+    db.commit()
+    for wine_id in ids:
+        wine_cache.invalidate(wine_id)
+    barcode_cache.clear()
+    return ids
+
+def import_wines(
+    db: Session,
+    lines: Iterable[str],
+    fmt: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """Stream a CSV or JSON Lines catalog into wineskus, upserting on product_code chunk by chunk."""
+    report = ImportReport()
+    rows = _csv_rows(lines) if fmt == "csv" else _jsonl_rows(lines)
+    chunk: dict[str, dict] = {}
+
+    def flush():
+        if chunk:
+            report.imported += len(_write_chunk(db, list(chunk.values())))
+            chunk.clear()
+        if on_progress is not None:
+            on_progress(report)
+
+    for line_number, record in rows:
+        report.processed += 1
+        try:
+            if isinstance(record, str):
+                raise ValueError(record)
+            wine = WineSKUCreate.model_validate(record)
+        except (ValidationError, ValueError) as exc:
+            report.rejected += 1
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                message = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()) if isinstance(exc, ValidationError) else str(exc)
+                report.errors.append(ImportRowError(line=line_number, error=message))
+            continue
+
+        now = datetime.utcnow()
+        # A product_code repeated within one chunk keeps its last row; one upsert cannot touch a row twice
+        chunk[wine.product_code] = {**wine.model_dump(), "id": uuid4(), "created_at": now, "updated_at": now}
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    # Let the next search pull the upserted rows (their updated_at is past the index watermark)
+    wine_search_index.mark_stale()
+    return report
+
+def run_import(source: BinaryIO, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE, on_progress: Callable[[ImportReport], None] | None = None) -> ImportReport:
+    # utf-8-sig drops the BOM spreadsheet exports put in front of the header
+    lines = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    with SessionLocal() as db:
+        return import_wines(db, lines, fmt, chunk_size, on_progress)
@@ -1,19 +1,135 @@
 # domain/wine_sku.py
 
-from sqlmodel import Session, select
+from sqlmodel import Session, select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
+from datetime import datetime
 from fastapi import HTTPException
+from core.cache import EntityCache
+from core.changes import record_changes
 from models.wine_sku import WineSKU, WineSKUCreate
+from domain.batch import fetch_by_ids
+from domain.pagination import Page, naive_utc, paginate, stream_ndjson
+from domain.conditional import Validators, page_version
+from domain.search import wine_search_index
+
+wine_cache = EntityCache("wine", WineSKU)
+# Scanner lookups keyed by barcode; cleared wholesale by the catalog import, which may move barcodes between SKUs
+barcode_cache = EntityCache("wine_barcode", WineSKU)
+
+MAX_BARCODE_BATCH = 1000
+
+class BarcodeResolution(SQLModel):
+    wines: dict[str, WineSKU]
+    missing: list[str]
+
+class WineFilter(SQLModel):
+    country: str | None = None
+    producer: str | None = None
+    vintage_year: int | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
 
 def create_wine(db: Session, wine: WineSKUCreate) -> WineSKU:
     wine_sku = WineSKU(**wine.model_dump())
     db.add(wine_sku)
+    record_changes(db, "wine", [(wine_sku.id, None)])
     db.commit()
     db.refresh(wine_sku)
+    wine_cache.set(wine_sku)
+    if wine_sku.barcode is not None:
+        barcode_cache.set(wine_sku, wine_sku.barcode)
+    wine_search_index.add(wine_sku)
     return wine_sku
 
 def get_wine(db: Session, wine_id: UUID) -> WineSKU:
+    wine = wine_cache.get(wine_id)
+    if wine is not None:
+        return wine
     wine = db.exec(select(WineSKU).where(WineSKU.id == wine_id)).first()
     if wine is None:
         raise HTTPException(status_code=404, detail="Wine not found")
+    wine_cache.fill(db, wine)
+    return wine
+
+def get_wines_by_ids(db: Session, ids: list[UUID]) -> list[WineSKU]:
+    return fetch_by_ids(db, WineSKU, ids, wine_cache)
+
+def _wines_by_barcode(db: Session, codes: list[str]) -> dict[str, WineSKU]:
+    # Barcodes are not unique; the newest SKU carrying a code wins
+    wines = {}
+    for wine in db.exec(select(WineSKU).where(WineSKU.barcode.in_(codes)).order_by(WineSKU.created_at)):
+        wines[wine.barcode] = wine
+    for code, wine in wines.items():
+        barcode_cache.fill(db, wine, code)
+    return wines
+
+def get_wine_by_barcode(db: Session, code: str) -> WineSKU:
+    wine = barcode_cache.get(code)
+    if wine is not None:
+        return wine
+    wine = _wines_by_barcode(db, [code]).get(code)
+    if wine is None:
+        raise HTTPException(status_code=404, detail="No wine with this barcode")
+    return wine
+
+def resolve_barcodes(db: Session, codes: list[str]) -> BarcodeResolution:
+    """Resolve a scanned batch: cache hits first, then one IN query for the rest."""
+    if len(codes) > MAX_BARCODE_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BARCODE_BATCH} barcodes")
+    codes = list(dict.fromkeys(codes))
+    found = barcode_cache.get_many(codes)
+    misses = [code for code in codes if code not in found]
+    if misses:
+        found.update(_wines_by_barcode(db, misses))
+    return BarcodeResolution(
+        wines={code: found[code] for code in codes if code in found},
+        missing=[code for code in codes if code not in found],
+    )
+
+WINE_SORT_KEY = [WineSKU.created_at, WineSKU.id]
+
+def wine_list_query(filters: WineFilter):
+    query = select(WineSKU)
+    if filters.country is not None:
+        query = query.where(WineSKU.country == filters.country)
+    if filters.producer is not None:
+        query = query.where(WineSKU.producer == filters.producer)
+    if filters.vintage_year is not None:
+        query = query.where(WineSKU.vintage_year == filters.vintage_year)
+    if filters.created_from is not None:
+        query = query.where(WineSKU.created_at >= naive_utc(filters.created_from))
+    if filters.created_to is not None:
+        query = query.where(WineSKU.created_at < naive_utc(filters.created_to))
+    return query
+
+def list_wines(db: Session, filters: WineFilter, cursor: str | None, limit: int) -> Page[WineSKU]:
+    return paginate(db, wine_list_query(filters), WINE_SORT_KEY, cursor, limit)
+
+def list_wines_version(db: Session, filters: WineFilter, cursor: str | None, limit: int) -> Validators:
+    return page_version(db, wine_list_query(filters), WINE_SORT_KEY, cursor, limit)
+
+def stream_wines(db: Session, filters: WineFilter):
+    return stream_ndjson(db, wine_list_query(filters), WINE_SORT_KEY)
+
+async def create_wine_async(db: AsyncSession, wine: WineSKUCreate) -> WineSKU:
+    wine_sku = WineSKU(**wine.model_dump())
+    db.add(wine_sku)
+    record_changes(db, "wine", [(wine_sku.id, None)])
+    await db.commit()
+    await db.refresh(wine_sku)
+    wine_cache.set(wine_sku)
+    if wine_sku.barcode is not None:
+        barcode_cache.set(wine_sku, wine_sku.barcode)
+    wine_search_index.add(wine_sku)
+    return wine_sku
+
+async def get_wine_async(db: AsyncSession, wine_id: UUID) -> WineSKU:
+    wine = wine_cache.get(wine_id)
+    if wine is not None:
+        return wine
+    wine = (await db.exec(select(WineSKU).where(WineSKU.id == wine_id))).first()
+    if wine is None:
+        raise HTTPException(status_code=404, detail="Wine not found")
+    wine_cache.fill(db, wine)
     return wine
\ No newline at end of file
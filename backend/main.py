@@ -1,18 +1,66 @@
 # main.py
 
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from routes.wine_sku import router as wine_sku_router
 from routes.user import router as user_router
 from routes.location import router as location_router
 from routes.movement import router as movement_router
 from routes.storage_lot import router as storage_lot_router
 from routes.stock import router as stock_router
+from routes.events import router as events_router
+from routes.auth import router as auth_router
+from routes.changes import router as changes_router
+from core.database import DATABASE_REPLICA_URLS, ReadYourWritesMiddleware, get_pool_stats, dispose_engines
+from core.cache import get_cache_stats
+from core.events import broker
+from core.metrics import METRICS_ENABLED, MetricsMiddleware, registry, render_gauges
+from domain.auth import AUTH_REQUIRED, current_user
+from domain.partitions import MOVEMENT_PARTITION_INTERVAL_SECONDS, run_movement_partitions
+from domain.snapshot import SNAPSHOT_INTERVAL_SECONDS, run_checkpoint
+
+logger = logging.getLogger(__name__)
+
+async def checkpoint_scheduler():
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            await run_in_threadpool(run_checkpoint, True)
+        except Exception:
+            logger.exception("Stock checkpoint failed")
+
+async def partition_scheduler():
+    while True:
+        try:
+            created = await run_in_threadpool(run_movement_partitions)
+            if created:
+                logger.info("Created movement partitions %s", ", ".join(created))
+        except Exception:
+            logger.exception("Movement partition maintenance failed")
+        await asyncio.sleep(MOVEMENT_PARTITION_INTERVAL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if SNAPSHOT_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(checkpoint_scheduler()))
+    if MOVEMENT_PARTITION_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(partition_scheduler()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await dispose_engines()
 
 app = FastAPI(
     title="Wine Inventory API",
     description="API for managing wine stock",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,10 +72,45 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Mount the routers
-app.include_router(wine_sku_router)
-app.include_router(user_router)
-app.include_router(location_router)
-app.include_router(movement_router)
-app.include_router(storage_lot_router)
-app.include_router(stock_router)
\ No newline at end of file
+# Clients that just wrote read from the primary until the replicas have caught up
+if DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Latency, SQL and pool-wait metrics per route; added last so it wraps every other middleware
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Mount the routers; with AUTH_REQUIRED everything but the token endpoint and health checks needs a bearer token
+protected = [Depends(current_user)] if AUTH_REQUIRED else []
+app.include_router(auth_router)
+app.include_router(wine_sku_router, dependencies=protected)
+app.include_router(user_router, dependencies=protected)
+app.include_router(location_router, dependencies=protected)
+app.include_router(movement_router, dependencies=protected)
+app.include_router(storage_lot_router, dependencies=protected)
+app.include_router(stock_router, dependencies=protected)
+app.include_router(events_router, dependencies=protected)
+app.include_router(changes_router, dependencies=protected)
+
+# Connection pool metrics for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW against the worker count
+@app.get("/health/db", tags=["Health"])
+def database_pool_stats():
+    return get_pool_stats()
+
+
+# Hit/miss/eviction counters of the reference-entity caches
+@app.get("/health/cache", tags=["Health"])
+def entity_cache_stats():
+    return get_cache_stats()
+
+# Prometheus text exposition of the per-route metrics plus pool and cache gauges
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def metrics():
+    pool = get_pool_stats()
+    for nested in ("async", "replicas", "async_replicas"):
+        pool.pop(nested, None)
+    body = registry.render() + render_gauges("db_pool", "Connection pool counters", pool, "stat")
+    for namespace, stats in get_cache_stats().items():
+        body += render_gauges(f"entity_cache_{namespace}", f"{namespace} cache counters", stats, "stat")
+    body += render_gauges("stock_events", "Stock event stream subscribers and dropped slow consumers", broker.stats(), "stat")
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,114 @@
+# manage.py
+#
+# Maintenance commands, run from backend/:
+#   python manage.py snapshot
+#   python manage.py import-wines catalog.csv
+#   python manage.py rebuild-rollups
+#   python manage.py check-rollups
+#   python manage.py rebuild-lot-occupancy
+#   python manage.py check-lot-occupancy
+#   python manage.py archive-movements
+#   python manage.py compact-changes
+
+import argparse
+import sys
+import models  # noqa: F401 -- registers every table on SQLModel.metadata
+
+def snapshot(args):
+    from domain.snapshot import run_checkpoint
+    checkpoint = run_checkpoint()
+    print(f"Checkpoint {checkpoint.id} at {checkpoint.taken_at.isoformat()} ({checkpoint.line_count} balances)")
+
+def import_wines(args):
+    from domain.wine_import import run_import
+    fmt = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    def progress(report):
+        print(f"{report.processed} rows read, {report.imported} imported, {report.rejected} rejected", flush=True)
+
+    with open(args.path, "rb") as source:
+        report = run_import(source, fmt, args.chunk_size, progress)
+    for error in report.errors:
+        print(f"line {error.line}: {error.error}")
+
+def rebuild_rollups(args):
+    from core.database import SessionLocal
+    from domain.rollup import rebuild_rollups
+    with SessionLocal() as db:
+        print(f"Rebuilt {rebuild_rollups(db)} stock rollups")
+
+def check_rollups(args):
+    from core.database import SessionLocal
+    from domain.rollup import check_rollups
+    with SessionLocal() as db:
+        mismatches = check_rollups(db)
+    for row in mismatches:
+        print(
+            f"sku {row.sku_id} at {row.location_id}: quantity {row.rollup_quantity} (expected {row.expected_quantity}), "
+            f"cost {row.rollup_cost_value:.2f} ({row.expected_cost_value:.2f}), retail {row.rollup_retail_value:.2f} ({row.expected_retail_value:.2f})"
+        )
+    print(f"{len(mismatches)} mismatched rollups")
+    sys.exit(1 if mismatches else 0)
+
+def rebuild_lot_occupancy(args):
+    from core.database import SessionLocal
+    from domain.storage_lot import rebuild_lot_occupancy
+    with SessionLocal() as db:
+        print(f"Corrected {rebuild_lot_occupancy(db)} storage lot counters")
+
+def check_lot_occupancy(args):
+    from core.database import SessionLocal
+    from domain.storage_lot import check_lot_occupancy
+    with SessionLocal() as db:
+        mismatches = check_lot_occupancy(db)
+    for row in mismatches:
+        print(f"lot {row.lot_id} at {row.location_id}: occupied {row.occupied} (expected {row.expected_occupied})")
+    print(f"{len(mismatches)} mismatched storage lots")
+    sys.exit(1 if mismatches else 0)
+
+def archive_movements(args):
+    from datetime import datetime
+    from domain.archival import run_archival
+    before = datetime.strptime(args.before, "%Y-%m") if args.before else None
+    partitions, archives = run_archival(before)
+    for name in partitions:
+        print(f"Created partition {name}")
+    for archive in archives:
+        print(f"Archived {archive.period_start:%Y-%m}: {archive.row_count} movements, {archive.size_bytes / 1024:.0f} KiB -> {archive.path}")
+    print(f"{len(archives)} periods archived")
+
+def compact_changes(args):
+    from core.database import SessionLocal
+    from domain.changes import compact_change_log
+    with SessionLocal() as db:
+        removed = compact_change_log(db)
+    print(f"Removed {removed} superseded change-log entries")
+
+def main():
+    parser = argparse.ArgumentParser(description="Wine inventory maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("snapshot", help="fold recent movements into a stock checkpoint").set_defaults(func=snapshot)
+
+    importer = commands.add_parser("import-wines", help="upsert a CSV or JSON Lines wine catalog on product_code")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    importer.add_argument("--chunk-size", type=int, default=1000)
+    importer.set_defaults(func=import_wines)
+
+    commands.add_parser("rebuild-rollups", help="recompute stock rollups from the stocks table").set_defaults(func=rebuild_rollups)
+    commands.add_parser("check-rollups", help="compare stock rollups with the base tables").set_defaults(func=check_rollups)
+    commands.add_parser("rebuild-lot-occupancy", help="recompute storage lot occupied counters from the stocks table").set_defaults(func=rebuild_lot_occupancy)
+    commands.add_parser("check-lot-occupancy", help="compare storage lot occupied counters with the stocks table").set_defaults(func=check_lot_occupancy)
+
+    archiver = commands.add_parser("archive-movements", help="create upcoming movement partitions and archive closed months to Parquet")
+    archiver.add_argument("--before", help="archive whole months before this one (YYYY-MM); defaults to MOVEMENT_ARCHIVE_AFTER_MONTHS ago")
+    archiver.set_defaults(func=archive_movements)
+
+    commands.add_parser("compact-changes", help="drop change-log entries superseded by a later change to the same row").set_defaults(func=compact_changes)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
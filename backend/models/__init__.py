@@ -1,8 +1,12 @@
 # models/__init__.py
 
+from .change_log import ChangeLog
 from .location import Location
 from .movement import Movement
+from .movement_archive import MovementArchive
 from .stock import Stock
+from .stock_rollup import StockRollup
+from .stock_snapshot import StockCheckpoint, StockSnapshot
 from .storage_lot import StorageLot
 from .user import User
 from .wine_sku import WineSKU
\ No newline at end of file
@@ -0,0 +1,24 @@
+# models/change_log.py
+
+from sqlmodel import SQLModel, Field, Column, Enum
+from sqlalchemy import BigInteger, Index, Integer
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+import enum
+
+class ChangeOp(str, enum.Enum):
+    UPSERT = "Upsert"
+    DELETE = "Delete"
+
+class ChangeLog(SQLModel, table=True):
+    # Monotonic sequence; SQLite only autoincrements an INTEGER primary key
+    seq: Optional[int] = Field(default=None, sa_column=Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True))
+    entity: str  # "wine", "location", "storage_lot", "stock" or "movement"
+    entity_id: UUID
+    location_id: Optional[UUID] = Field(default=None)  # Set for site-scoped rows (lots, stocks, movement legs)
+    op: ChangeOp = Field(sa_column=Column(Enum(ChangeOp), nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __tablename__ = "changelog"
+    __table_args__ = (Index("ix_changelog_entity_entity_id", "entity", "entity_id"),)
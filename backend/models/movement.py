@@ -1,6 +1,7 @@
 # models/movement.py
 
 from sqlmodel import SQLModel, Field, Column, Enum
+from sqlalchemy import Index
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -29,4 +30,13 @@ class Movement(SQLModel, table=True):
     is_high_value: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    __tablename__ = "movements"
\ No newline at end of file
+    # On PostgreSQL the table is range-partitioned by month on created_at, with primary key (id, created_at)
+    __tablename__ = "movements"
+    # Each ledger access path filters on one column and reads newest first by created_at
+    __table_args__ = (
+        Index("ix_movements_created_at_id", "created_at", "id"),  # Unfiltered pages and point-in-time replay
+        Index("ix_movements_sku_id_created_at", "sku_id", "created_at"),
+        Index("ix_movements_from_location_id_created_at", "from_location_id", "created_at"),
+        Index("ix_movements_to_location_id_created_at", "to_location_id", "created_at"),
+        Index("ix_movements_performed_by_created_at", "performed_by", "created_at"),
+    )
\ No newline at end of file
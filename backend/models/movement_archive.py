@@ -0,0 +1,16 @@
+# models/movement_archive.py
+
+from sqlmodel import SQLModel, Field
+from uuid import UUID, uuid4
+from datetime import datetime
+
+class MovementArchive(SQLModel, table=True):
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    period_start: datetime = Field(index=True)  # Archived movements have period_start <= created_at < period_end
+    period_end: datetime
+    path: str  # Parquet file under MOVEMENT_ARCHIVE_DIR
+    row_count: int
+    size_bytes: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __tablename__ = "movementarchives"
@@ -1,7 +1,7 @@
 # models/stock.py
 
 from sqlmodel import SQLModel, Field
-from sqlalchemy import UniqueConstraint  # Add this import
+from sqlalchemy import UniqueConstraint, CheckConstraint, Index, text
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -11,8 +11,18 @@ class Stock(SQLModel, table=True):
     sku_id: UUID = Field(foreign_key="wineskus.id")
     lot_id: Optional[UUID] = Field(default=None, foreign_key="storagelots.id")
     location_id: UUID = Field(foreign_key="locations.id")
-    quantity: int = Field(gt=0)  # Ensure quantity > 0
+    quantity: int = Field(ge=0)  # Balances never go negative
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     __tablename__ = "stocks"
-    __table_args__ = (UniqueConstraint("sku_id", "lot_id", "location_id", name="unique_stock"),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("sku_id", "lot_id", "location_id", name="unique_stock"),
+        # NULL lot_ids never collide in unique_stock, so unlotted balances need their own unique index
+        Index(
+            "uq_stocks_sku_location_unlotted", "sku_id", "location_id", unique=True,
+            postgresql_where=text("lot_id IS NULL"), sqlite_where=text("lot_id IS NULL"),
+        ),
+        CheckConstraint("quantity >= 0", name="ck_stocks_quantity_non_negative"),
+        # unique_stock leads with sku_id; per-location lookups need their own index
+        Index("ix_stocks_location_id", "location_id"),
+    )
\ No newline at end of file
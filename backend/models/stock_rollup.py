@@ -0,0 +1,18 @@
+# models/stock_rollup.py
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from uuid import UUID
+from datetime import datetime
+
+class StockRollup(SQLModel, table=True):
+    # On-hand totals per sku and location (lots folded together), valued at the wine's current prices
+    sku_id: UUID = Field(foreign_key="wineskus.id", primary_key=True)
+    location_id: UUID = Field(foreign_key="locations.id", primary_key=True)
+    quantity: int = Field(default=0)
+    cost_value: float = Field(default=0.0)  # quantity * cost_price
+    retail_value: float = Field(default=0.0)  # quantity * price_bottle
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __tablename__ = "stockrollups"
+    __table_args__ = (Index("ix_stockrollups_location_id", "location_id"),)
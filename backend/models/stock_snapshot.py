@@ -0,0 +1,26 @@
+# models/stock_snapshot.py
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from uuid import UUID, uuid4
+from datetime import datetime
+
+class StockCheckpoint(SQLModel, table=True):
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    taken_at: datetime = Field(index=True)  # Movements created at or before this instant are folded in
+    line_count: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __tablename__ = "stockcheckpoints"
+
+class StockSnapshot(SQLModel, table=True):
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    checkpoint_id: UUID = Field(foreign_key="stockcheckpoints.id")
+    sku_id: UUID = Field(foreign_key="wineskus.id")
+    lot_id: Optional[UUID] = Field(default=None, foreign_key="storagelots.id")
+    location_id: UUID = Field(foreign_key="locations.id")
+    quantity: int
+
+    __tablename__ = "stocksnapshots"
+    __table_args__ = (Index("ix_stocksnapshots_checkpoint_location", "checkpoint_id", "location_id"),)
@@ -11,6 +11,7 @@ class StorageLot(SQLModel, table=True):
     location_id: UUID = Field(foreign_key="locations.id")
     lot_name: str = Field(index=True)
     capacity: int = Field(gt=0)  # Ensure capacity > 0
+    occupied: int = Field(default=0, ge=0)  # Bottles on hand in the lot, maintained by stock postings
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -7,7 +7,7 @@ from datetime import datetime
 
 class WineSKUCreate(SQLModel):
     product_code: str = Field(unique=True, index=True)
-    barcode: Optional[str] = Field(default=None)
+    barcode: Optional[str] = Field(default=None, index=True)  # Index for scanner lookups
     wine_name: str = Field(index=True)
     description: Optional[str] = Field(default=None)
     vintage_year: int = Field(ge=1900, le=datetime.utcnow().year)
@@ -0,0 +1,24 @@
+# routes/auth.py
+
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.database import DB_ASYNC, get_db, get_async_db
+from domain.auth import LoginRequest, Token, current_user, login, login_async
+from domain.user import UserPrincipal
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+@router.get("/me", response_model=UserPrincipal)
+def get_me_endpoint(principal: UserPrincipal = Depends(current_user)):
+    return principal
+
+# Async in both modes: bcrypt runs on its own pool and is awaited, never blocking a worker thread
+if DB_ASYNC:
+    @router.post("/token", response_model=Token)
+    async def login_endpoint(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+        return await login_async(db, credentials)
+else:
+    @router.post("/token", response_model=Token)
+    async def login_endpoint(credentials: LoginRequest, db: Session = Depends(get_db)):
+        return await login(db, credentials)
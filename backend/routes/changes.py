@@ -0,0 +1,22 @@
+# routes/changes.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from uuid import UUID
+from core.database import get_db
+from domain.batch import MAX_BATCH_IDS
+from domain.changes import ChangeBatch, DEFAULT_CHANGE_BATCH, get_changes
+from domain.pagination import json_response
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+# Client sync: start without `since` (or from a stored cursor) and follow next_cursor while has_more.
+# Served from the primary: the settle window assumes the log is current, which a lagging replica is not
+@router.get("/", response_model=ChangeBatch)
+def get_changes_endpoint(
+    since: str | None = None,
+    location_id: UUID | None = None,
+    limit: int = Query(DEFAULT_CHANGE_BATCH, ge=1, le=MAX_BATCH_IDS),
+    db: Session = Depends(get_db),
+):
+    return json_response(get_changes(db, since, location_id, limit))
@@ -0,0 +1,12 @@
+# routes/events.py
+
+from fastapi import APIRouter
+from uuid import UUID
+from domain.events import stream_stock_events
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# Server-sent events: `movement` and `stock` (net delta per sku/lot/location) as postings commit
+@router.get("/stock")
+async def stock_events_endpoint(location_id: UUID | None = None):
+    return stream_stock_events(location_id)
@@ -1,18 +1,76 @@
 # routes/location.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from core.database import get_db
+from typing import Literal
+from core.database import DB_ASYNC, get_db, get_async_db, get_read_db, get_async_read_db
 from models.location import Location
-from domain.location import LocationCreate, create_location, get_location
+from domain.location import LocationCreate, create_location, get_location, create_location_async, get_location_async, LocationFilter, list_locations, get_locations_by_ids, list_locations_version, stream_locations
+from domain.batch import parse_ids
+from domain.pagination import Page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, json_response
+from domain.storage_lot import LotOccupancy, list_free_space
+from domain.conditional import entity_validators, page_validators, entity_version, entity_version_async, not_modified, not_modified_async, with_validators
 
 router = APIRouter(prefix="/locations", tags=["Location"])
 
-@router.post("/", response_model=Location)
-def create_location_endpoint(location: LocationCreate, db: Session = Depends(get_db)):
-    return create_location(db, location)
+@router.get("/", response_model=Page[Location])
+def list_locations_endpoint(
+    request: Request,
+    response: Response,
+    filters: LocationFilter = Depends(),
+    ids: list[UUID] | None = Depends(parse_ids),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    if ids is not None:
+        return json_response(Page(items=get_locations_by_ids(db, ids)))
+    if format == "ndjson":
+        return stream_locations(db, filters)
+    cached = not_modified(request, lambda: list_locations_version(db, filters, cursor, limit))
+    if cached is not None:
+        return cached
+    page = list_locations(db, filters, cursor, limit)
+    return with_validators(response, json_response(page), page_validators(page))
 
-@router.get("/{location_id}", response_model=Location)
-def get_location_endpoint(location_id: UUID, db: Session = Depends(get_db)):
-    return get_location(db, location_id)
\ No newline at end of file
+@router.post("/batch", response_model=list[Location])
+def get_locations_batch_endpoint(ids: list[UUID], db: Session = Depends(get_read_db)):
+    return json_response(get_locations_by_ids(db, ids))
+
+@router.get("/{location_id}/free-space", response_model=list[LotOccupancy])
+def get_free_space_endpoint(
+    location_id: UUID,
+    min_free: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    get_location(db, location_id)
+    return json_response(list_free_space(db, location_id, min_free, limit))
+
+if DB_ASYNC:
+    @router.post("/", response_model=Location)
+    async def create_location_endpoint(location: LocationCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_location_async(db, location)
+
+    @router.get("/{location_id}", response_model=Location)
+    async def get_location_endpoint(location_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+        cached = await not_modified_async(request, lambda: entity_version_async(db, Location, location_id))
+        if cached is not None:
+            return cached
+        location = await get_location_async(db, location_id)
+        return with_validators(response, location, entity_validators(location))
+else:
+    @router.post("/", response_model=Location)
+    def create_location_endpoint(location: LocationCreate, db: Session = Depends(get_db)):
+        return create_location(db, location)
+
+    @router.get("/{location_id}", response_model=Location)
+    def get_location_endpoint(location_id: UUID, request: Request, response: Response, db: Session = Depends(get_read_db)):
+        cached = not_modified(request, lambda: entity_version(db, Location, location_id))
+        if cached is not None:
+            return cached
+        location = get_location(db, location_id)
+        return with_validators(response, location, entity_validators(location))
\ No newline at end of file
@@ -1,18 +1,52 @@
 # routes/movement.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from core.database import get_db
+from typing import Literal
+from core.database import DB_ASYNC, get_db, get_async_db, get_read_db, get_async_read_db
 from models.movement import Movement
-from domain.movement import MovementCreate, create_movement, get_movement
+from domain.movement import (
+    MovementCreate, MovementBatchResult, MovementFilter,
+    create_movement, create_movements_batch, get_movement, list_movements, stream_movements,
+    create_movement_async, get_movement_async,
+)
+from domain.expand import ExpandedItem, ExpandedPage, expanded_item, expanded_item_async, expanded_page, parse_expand
+from domain.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, json_response
 
 router = APIRouter(prefix="/movements", tags=["Movement"])
 
-@router.post("/", response_model=Movement)
-def create_movement_endpoint(movement: MovementCreate, db: Session = Depends(get_db)):
-    return create_movement(db, movement)
+@router.get("/", response_model=ExpandedPage[Movement])
+def list_movements_endpoint(
+    filters: MovementFilter = Depends(),
+    expand: list[str] = Depends(parse_expand),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    if format == "ndjson":
+        return stream_movements(db, filters)
+    return json_response(expanded_page(db, list_movements(db, filters, cursor, limit), expand))
 
-@router.get("/{movement_id}", response_model=Movement)
-def get_movement_endpoint(movement_id: UUID, db: Session = Depends(get_db)):
-    return get_movement(db, movement_id)
\ No newline at end of file
+@router.post("/batch", response_model=MovementBatchResult)
+def create_movements_batch_endpoint(movements: list[MovementCreate], db: Session = Depends(get_db)):
+    return create_movements_batch(db, movements)
+
+if DB_ASYNC:
+    @router.post("/", response_model=Movement)
+    async def create_movement_endpoint(movement: MovementCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_movement_async(db, movement)
+
+    @router.get("/{movement_id}", response_model=Movement | ExpandedItem[Movement])
+    async def get_movement_endpoint(movement_id: UUID, expand: list[str] = Depends(parse_expand), db: AsyncSession = Depends(get_async_read_db)):
+        return await expanded_item_async(db, await get_movement_async(db, movement_id), expand)
+else:
+    @router.post("/", response_model=Movement)
+    def create_movement_endpoint(movement: MovementCreate, db: Session = Depends(get_db)):
+        return create_movement(db, movement)
+
+    @router.get("/{movement_id}", response_model=Movement | ExpandedItem[Movement])
+    def get_movement_endpoint(movement_id: UUID, expand: list[str] = Depends(parse_expand), db: Session = Depends(get_read_db)):
+        return expanded_item(db, get_movement(db, movement_id), expand)
\ No newline at end of file
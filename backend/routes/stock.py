@@ -1,18 +1,123 @@
 # routes/stock.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from datetime import datetime
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from core.database import get_db
+from typing import Literal
+from core.database import DB_ASYNC, get_db, get_async_db, get_read_db, get_async_read_db
 from models.stock import Stock
-from domain.stock import StockCreate, create_stock, get_stock
+from models.stock_snapshot import StockCheckpoint
+from domain.stock import StockCreate, get_stock, get_stock_async, StockFilter, list_stocks, get_stocks_by_ids, list_stocks_version, stream_stocks
+from domain.batch import parse_ids
+from domain.expand import ExpandedItem, ExpandedPage, expanded_item, expanded_item_async, expanded_page, parse_expand
+from domain.pagination import Page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, json_response
+from domain.snapshot import StockBalance, get_stock_as_of, take_checkpoint
+from domain.rollup import StockSummary, get_stock_summary
+from domain.movement import StockTransfer, TransferResult, create_stock, create_stock_async, create_transfer, create_transfer_async
+from domain.forecast import ReorderSuggestion, get_reorder_suggestions
+from domain.conditional import entity_validators, page_validators, entity_version, entity_version_async, not_modified, not_modified_async, with_validators
 
 router = APIRouter(prefix="/stocks", tags=["Stock"])
 
-@router.post("/", response_model=Stock)
-def create_stock_endpoint(stock: StockCreate, db: Session = Depends(get_db)):
-    return create_stock(db, stock)
+@router.get("/", response_model=ExpandedPage[Stock])
+def list_stocks_endpoint(
+    request: Request,
+    response: Response,
+    filters: StockFilter = Depends(),
+    ids: list[UUID] | None = Depends(parse_ids),
+    expand: list[str] = Depends(parse_expand),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    if ids is not None:
+        return json_response(expanded_page(db, Page(items=get_stocks_by_ids(db, ids)), expand))
+    if format == "ndjson":
+        return stream_stocks(db, filters)
+    if expand:
+        # Side-loaded entities change independently of the stock rows, so expanded pages carry no validators
+        return json_response(expanded_page(db, list_stocks(db, filters, cursor, limit), expand))
+    cached = not_modified(request, lambda: list_stocks_version(db, filters, cursor, limit))
+    if cached is not None:
+        return cached
+    page = list_stocks(db, filters, cursor, limit)
+    return with_validators(response, json_response(page), page_validators(page))
 
-@router.get("/{stock_id}", response_model=Stock)
-def get_stock_endpoint(stock_id: UUID, db: Session = Depends(get_db)):
-    return get_stock(db, stock_id)
\ No newline at end of file
+@router.post("/batch", response_model=list[Stock])
+def get_stocks_batch_endpoint(ids: list[UUID], db: Session = Depends(get_read_db)):
+    return json_response(get_stocks_by_ids(db, ids))
+
+# Stock that predates the ledger is included from the first checkpoint on (python manage.py snapshot, or the scheduler)
+@router.get("/as-of", response_model=list[StockBalance])
+def get_stock_as_of_endpoint(at: datetime, location_id: UUID | None = None, sku_id: UUID | None = None, db: Session = Depends(get_read_db)):
+    return json_response(get_stock_as_of(db, at, location_id, sku_id))
+
+@router.get("/summary", response_model=list[StockSummary])
+def get_stock_summary_endpoint(
+    group_by: Literal["location", "sku"] = "location",
+    location_id: UUID | None = None,
+    sku_id: UUID | None = None,
+    db: Session = Depends(get_read_db),
+):
+    return json_response(get_stock_summary(db, group_by, location_id, sku_id))
+
+# Stays on the primary: the forecast only folds in each movement once, so it must never read behind a lagging replica
+@router.get("/reorder-suggestions", response_model=list[ReorderSuggestion])
+def get_reorder_suggestions_endpoint(
+    location_id: UUID | None = None,
+    sku_id: UUID | None = None,
+    below_reorder_point: bool = True,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    return json_response(get_reorder_suggestions(db, location_id, sku_id, below_reorder_point, limit))
+
+@router.post("/checkpoints", response_model=StockCheckpoint)
+def take_checkpoint_endpoint(db: Session = Depends(get_db)):
+    return take_checkpoint(db)
+
+if DB_ASYNC:
+    @router.post("/", response_model=Stock)
+    async def create_stock_endpoint(stock: StockCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_stock_async(db, stock)
+
+    @router.post("/transfer", response_model=TransferResult)
+    async def transfer_stock_endpoint(transfer: StockTransfer, db: AsyncSession = Depends(get_async_db)):
+        return await create_transfer_async(db, transfer)
+
+    @router.get("/{stock_id}", response_model=Stock | ExpandedItem[Stock])
+    async def get_stock_endpoint(
+        stock_id: UUID, request: Request, response: Response, expand: list[str] = Depends(parse_expand), db: AsyncSession = Depends(get_async_read_db),
+    ):
+        if expand:
+            # Like expanded pages, no validators: the side-loaded entities change independently of the stock row
+            return await expanded_item_async(db, await get_stock_async(db, stock_id), expand)
+        cached = await not_modified_async(request, lambda: entity_version_async(db, Stock, stock_id))
+        if cached is not None:
+            return cached
+        stock = await get_stock_async(db, stock_id)
+        return with_validators(response, stock, entity_validators(stock))
+else:
+    @router.post("/", response_model=Stock)
+    def create_stock_endpoint(stock: StockCreate, db: Session = Depends(get_db)):
+        return create_stock(db, stock)
+
+    @router.post("/transfer", response_model=TransferResult)
+    def transfer_stock_endpoint(transfer: StockTransfer, db: Session = Depends(get_db)):
+        return create_transfer(db, transfer)
+
+    @router.get("/{stock_id}", response_model=Stock | ExpandedItem[Stock])
+    def get_stock_endpoint(
+        stock_id: UUID, request: Request, response: Response, expand: list[str] = Depends(parse_expand), db: Session = Depends(get_read_db),
+    ):
+        if expand:
+            # Like expanded pages, no validators: the side-loaded entities change independently of the stock row
+            return expanded_item(db, get_stock(db, stock_id), expand)
+        cached = not_modified(request, lambda: entity_version(db, Stock, stock_id))
+        if cached is not None:
+            return cached
+        stock = get_stock(db, stock_id)
+        return with_validators(response, stock, entity_validators(stock))
\ No newline at end of file
@@ -1,18 +1,53 @@
 # routes/storage_lot.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from core.database import get_db
+from core.database import DB_ASYNC, get_db, get_async_db, get_read_db, get_async_read_db
 from models.storage_lot import StorageLot
-from domain.storage_lot import StorageLotCreate, create_storage_lot, get_storage_lot
+from domain.storage_lot import StorageLotCreate, create_storage_lot, get_storage_lot, create_storage_lot_async, get_storage_lot_async, get_storage_lots_by_ids, LotOccupancy, get_lot_occupancy
+from domain.batch import parse_ids
+from domain.pagination import json_response
+from domain.conditional import entity_validators, entity_version, entity_version_async, not_modified, not_modified_async, with_validators
 
 router = APIRouter(prefix="/storagelots", tags=["StorageLot"])
 
-@router.post("/", response_model=StorageLot)
-def create_storage_lot_endpoint(storage_lot: StorageLotCreate, db: Session = Depends(get_db)):
-    return create_storage_lot(db, storage_lot)
+@router.get("/", response_model=list[StorageLot])
+def get_storage_lots_endpoint(ids: list[UUID] | None = Depends(parse_ids), db: Session = Depends(get_read_db)):
+    if ids is None:
+        raise HTTPException(status_code=422, detail="ids is required")
+    return json_response(get_storage_lots_by_ids(db, ids))
 
-@router.get("/{storage_lot_id}", response_model=StorageLot)
-def get_storage_lot_endpoint(storage_lot_id: UUID, db: Session = Depends(get_db)):
-    return get_storage_lot(db, storage_lot_id)
\ No newline at end of file
+@router.post("/batch", response_model=list[StorageLot])
+def get_storage_lots_batch_endpoint(ids: list[UUID], db: Session = Depends(get_read_db)):
+    return json_response(get_storage_lots_by_ids(db, ids))
+
+@router.get("/{storage_lot_id}/occupancy", response_model=LotOccupancy)
+def get_lot_occupancy_endpoint(storage_lot_id: UUID, db: Session = Depends(get_read_db)):
+    return get_lot_occupancy(db, storage_lot_id)
+
+if DB_ASYNC:
+    @router.post("/", response_model=StorageLot)
+    async def create_storage_lot_endpoint(storage_lot: StorageLotCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_storage_lot_async(db, storage_lot)
+
+    @router.get("/{storage_lot_id}", response_model=StorageLot)
+    async def get_storage_lot_endpoint(storage_lot_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+        cached = await not_modified_async(request, lambda: entity_version_async(db, StorageLot, storage_lot_id))
+        if cached is not None:
+            return cached
+        storage_lot = await get_storage_lot_async(db, storage_lot_id)
+        return with_validators(response, storage_lot, entity_validators(storage_lot))
+else:
+    @router.post("/", response_model=StorageLot)
+    def create_storage_lot_endpoint(storage_lot: StorageLotCreate, db: Session = Depends(get_db)):
+        return create_storage_lot(db, storage_lot)
+
+    @router.get("/{storage_lot_id}", response_model=StorageLot)
+    def get_storage_lot_endpoint(storage_lot_id: UUID, request: Request, response: Response, db: Session = Depends(get_read_db)):
+        cached = not_modified(request, lambda: entity_version(db, StorageLot, storage_lot_id))
+        if cached is not None:
+            return cached
+        storage_lot = get_storage_lot(db, storage_lot_id)
+        return with_validators(response, storage_lot, entity_validators(storage_lot))
\ No newline at end of file
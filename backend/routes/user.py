@@ -1,18 +1,64 @@
 # routes/user.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
-from core.database import get_db
+from core.database import DB_ASYNC, get_db, get_async_db, get_read_db, get_async_read_db
 from models.user import User
-from domain.user import UserCreate, create_user, get_user
+from domain.user import (
+    UserCreate, UserRead, UserUpdate, create_user, get_user, update_user, create_user_async, get_user_async, update_user_async,
+    get_users_by_ids, hash_new_password, user_reads,
+)
+from domain.batch import parse_ids
+from domain.pagination import json_response
+from domain.conditional import entity_validators, entity_version, entity_version_async, not_modified, not_modified_async, with_validators
 
 router = APIRouter(prefix="/users", tags=["User"])
 
-@router.post("/", response_model=User)
-def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
-    return create_user(db, user)
+@router.get("/", response_model=list[UserRead])
+def get_users_endpoint(ids: list[UUID] | None = Depends(parse_ids), db: Session = Depends(get_read_db)):
+    if ids is None:
+        raise HTTPException(status_code=422, detail="ids is required")
+    return json_response(user_reads(get_users_by_ids(db, ids)))
 
-@router.get("/{user_id}", response_model=User)
-def get_user_endpoint(user_id: UUID, db: Session = Depends(get_db)):
-    return get_user(db, user_id)
\ No newline at end of file
+@router.post("/batch", response_model=list[UserRead])
+def get_users_batch_endpoint(ids: list[UUID], db: Session = Depends(get_read_db)):
+    return json_response(user_reads(get_users_by_ids(db, ids)))
+
+# Writes that take a password are async in both modes so bcrypt is awaited on its own pool
+if DB_ASYNC:
+    @router.post("/", response_model=UserRead)
+    async def create_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_user_async(db, user, await hash_new_password(user.password))
+
+    @router.get("/{user_id}", response_model=UserRead)
+    async def get_user_endpoint(user_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+        cached = await not_modified_async(request, lambda: entity_version_async(db, User, user_id))
+        if cached is not None:
+            return cached
+        user = await get_user_async(db, user_id)
+        return with_validators(response, user, entity_validators(user))
+
+    @router.patch("/{user_id}", response_model=UserRead)
+    async def update_user_endpoint(user_id: UUID, changes: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+        hashed_password = await hash_new_password(changes.password) if changes.password is not None else None
+        return await update_user_async(db, user_id, changes, hashed_password)
+else:
+    @router.post("/", response_model=UserRead)
+    async def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
+        return await run_in_threadpool(create_user, db, user, await hash_new_password(user.password))
+
+    @router.get("/{user_id}", response_model=UserRead)
+    def get_user_endpoint(user_id: UUID, request: Request, response: Response, db: Session = Depends(get_read_db)):
+        cached = not_modified(request, lambda: entity_version(db, User, user_id))
+        if cached is not None:
+            return cached
+        user = get_user(db, user_id)
+        return with_validators(response, user, entity_validators(user))
+
+    @router.patch("/{user_id}", response_model=UserRead)
+    async def update_user_endpoint(user_id: UUID, changes: UserUpdate, db: Session = Depends(get_db)):
+        hashed_password = await hash_new_password(changes.password) if changes.password is not None else None
+        return await run_in_threadpool(update_user, db, user_id, changes, hashed_password)
@@ -1,18 +1,95 @@
 # routes/wine_sku.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from core.database import get_db
+from typing import Literal
+import tempfile
+from core.database import DB_ASYNC, get_db, get_async_db, get_read_db, get_async_read_db
 from models.wine_sku import WineSKU, WineSKUCreate
-from domain.wine_sku import create_wine, get_wine
+from domain.wine_sku import create_wine, get_wine, create_wine_async, get_wine_async, WineFilter, list_wines, get_wines_by_ids, list_wines_version, stream_wines, BarcodeResolution, get_wine_by_barcode, resolve_barcodes
+from domain.batch import parse_ids
+from domain.pagination import Page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, json_response
+from domain.search import WineSearchFilter, search_wines
+from domain.wine_import import IMPORT_SPOOL_BYTES, ImportReport, run_import
+from domain.conditional import entity_validators, page_validators, entity_version, entity_version_async, not_modified, not_modified_async, with_validators
 
 router = APIRouter(prefix="/wines", tags=["WineSKU"])
 
-@router.post("/", response_model=WineSKU)
-def create_wine_endpoint(wine: WineSKUCreate, db: Session = Depends(get_db)):
-    return create_wine(db, wine)
+@router.get("/", response_model=Page[WineSKU])
+def list_wines_endpoint(
+    request: Request,
+    response: Response,
+    filters: WineFilter = Depends(),
+    ids: list[UUID] | None = Depends(parse_ids),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    if ids is not None:
+        return json_response(Page(items=get_wines_by_ids(db, ids)))
+    if format == "ndjson":
+        return stream_wines(db, filters)
+    cached = not_modified(request, lambda: list_wines_version(db, filters, cursor, limit))
+    if cached is not None:
+        return cached
+    page = list_wines(db, filters, cursor, limit)
+    return with_validators(response, json_response(page), page_validators(page))
 
-@router.get("/{wine_id}", response_model=WineSKU)
-def get_wine_endpoint(wine_id: UUID, db: Session = Depends(get_db)):
-    return get_wine(db, wine_id)
\ No newline at end of file
+@router.post("/batch", response_model=list[WineSKU])
+def get_wines_batch_endpoint(ids: list[UUID], db: Session = Depends(get_read_db)):
+    return json_response(get_wines_by_ids(db, ids))
+
+@router.get("/search", response_model=list[WineSKU])
+def search_wines_endpoint(
+    q: str = Query(..., min_length=1),
+    filters: WineSearchFilter = Depends(),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    return json_response(search_wines(db, q, filters, limit))
+
+@router.get("/by-barcode/{code}", response_model=WineSKU)
+def get_wine_by_barcode_endpoint(code: str, db: Session = Depends(get_read_db)):
+    return get_wine_by_barcode(db, code)
+
+@router.post("/resolve-barcodes", response_model=BarcodeResolution)
+def resolve_barcodes_endpoint(codes: list[str], db: Session = Depends(get_read_db)):
+    return resolve_barcodes(db, codes)
+
+@router.post("/import", response_model=ImportReport)
+async def import_wines_endpoint(request: Request, format: Literal["csv", "jsonl"] = "csv"):
+    # The raw request body is the file; it is spooled rather than held in memory
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        return await run_in_threadpool(run_import, upload, format)
+
+if DB_ASYNC:
+    @router.post("/", response_model=WineSKU)
+    async def create_wine_endpoint(wine: WineSKUCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_wine_async(db, wine)
+
+    @router.get("/{wine_id}", response_model=WineSKU)
+    async def get_wine_endpoint(wine_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+        cached = await not_modified_async(request, lambda: entity_version_async(db, WineSKU, wine_id))
+        if cached is not None:
+            return cached
+        wine = await get_wine_async(db, wine_id)
+        return with_validators(response, wine, entity_validators(wine))
+else:
+    @router.post("/", response_model=WineSKU)
+    def create_wine_endpoint(wine: WineSKUCreate, db: Session = Depends(get_db)):
+        return create_wine(db, wine)
+
+    @router.get("/{wine_id}", response_model=WineSKU)
+    def get_wine_endpoint(wine_id: UUID, request: Request, response: Response, db: Session = Depends(get_read_db)):
+        cached = not_modified(request, lambda: entity_version(db, WineSKU, wine_id))
+        if cached is not None:
+            return cached
+        wine = get_wine(db, wine_id)
+        return with_validators(response, wine, entity_validators(wine))
\ No newline at end of file
@@ -0,0 +1,153 @@
+# tests/test_change_log.py
+#
+# Posts a movement batch in which some rows are rejected (each rejection rolls back a
+# savepoint) and checks the change log still holds every row the accepted movements touched.
+# Then archives a month of movements and checks the feed reports them as archived, not deleted.
+
+import shutil
+import sys
+import tempfile
+from uuid import uuid4
+from datetime import datetime
+from sqlalchemy import delete, update
+from sqlmodel import select
+from core.database import SessionLocal
+from core.changes import record_changes
+from models.change_log import ChangeLog
+from models.location import Location, LocationType
+from models.movement import Movement, MovementType
+from models.movement_archive import MovementArchive
+from models.stock import Stock
+from models.stock_rollup import StockRollup
+from models.stock_snapshot import StockCheckpoint, StockSnapshot
+from models.storage_lot import StorageLot
+from models.user import User, UserRole
+from models.wine_sku import WineSKU
+from domain import movement_archive
+from domain.archival import archive_period
+from domain.changes import get_changes
+from domain.movement import MovementCreate, create_movement, create_movements_batch
+from domain.pagination import encode_cursor
+
+def _seed(db):
+    tag = uuid4().hex[:8]
+    wine = WineSKU(
+        product_code=f"CHG-{tag}", wine_name="Change Wine", vintage_year=2020, producer="Change", country="France",
+        region="Bordeaux", grape_varieties=["Merlot"], alcohol_content=13.5, price_bottle=20.0, price_glass=5.0, cost_price=12.0,
+    )
+    cellar = Location(name=f"Change Cellar {tag}", type=LocationType.CELLAR)
+    user = User(first_name="Change", last_name="User", email=f"change-{tag}@example.com", role=UserRole.STAFF, hashed_password="x")
+    db.add_all([wine, cellar, user])
+    db.flush()
+    roomy = StorageLot(location_id=cellar.id, lot_name="Roomy", capacity=100)
+    tight = StorageLot(location_id=cellar.id, lot_name="Tight", capacity=5)
+    db.add_all([roomy, tight])
+    db.commit()
+    return wine.id, cellar.id, roomy.id, tight.id, user.id
+
+def _logged(db, entity: str, entity_id) -> bool:
+    return db.exec(select(ChangeLog.seq).where(ChangeLog.entity == entity, ChangeLog.entity_id == entity_id)).first() is not None
+
+def _cleanup(db, wine_id, cellar_id, lot_ids, user_id):
+    stock_ids = db.exec(select(Stock.id).where(Stock.sku_id == wine_id)).all()
+    movement_ids = db.exec(select(Movement.id).where(Movement.sku_id == wine_id)).all()
+    db.execute(delete(ChangeLog).where(ChangeLog.entity_id.in_([wine_id, cellar_id, user_id, *lot_ids, *stock_ids, *movement_ids])))
+    db.execute(delete(Movement).where(Movement.sku_id == wine_id))
+    db.execute(delete(Stock).where(Stock.sku_id == wine_id))
+    db.execute(delete(StockRollup).where(StockRollup.sku_id == wine_id))
+    db.execute(delete(StorageLot).where(StorageLot.id.in_(lot_ids)))
+    db.execute(delete(WineSKU).where(WineSKU.id == wine_id))
+    db.execute(delete(Location).where(Location.id == cellar_id))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+def test_change_log_survives_rejections():
+    print("Testing change log entries of a partially rejected batch...")
+    failures = []
+    with SessionLocal() as db:
+        wine_id, cellar_id, roomy_id, tight_id, user_id = _seed(db)
+        try:
+            def movement(quantity, movement_type, **legs):
+                return MovementCreate(batch_ref="CHG", sku_id=wine_id, quantity=quantity, movement_type=movement_type, performed_by=user_id, **legs)
+
+            result = create_movements_batch(db, [
+                movement(10, MovementType.INBOUND, to_location_id=cellar_id, to_lot_id=roomy_id),
+                movement(10, MovementType.INBOUND, to_location_id=cellar_id, to_lot_id=tight_id),  # over capacity
+                movement(50, MovementType.OUTBOUND, from_location_id=cellar_id, from_lot_id=roomy_id),  # more than on hand
+            ])
+            if len(result.created_ids) != 1 or [rejection.index for rejection in result.rejected] != [1, 2]:
+                print(f"❌ Unexpected batch result: {result}")
+                sys.exit(1)
+
+            stock_id = db.exec(select(Stock.id).where(Stock.sku_id == wine_id, Stock.lot_id == roomy_id)).one()
+            expected = {"movement": result.created_ids[0], "stock": stock_id, "storage_lot": roomy_id}
+            for entity, entity_id in expected.items():
+                if _logged(db, entity, entity_id):
+                    print(f"✅ {entity} change logged")
+                else:
+                    print(f"❌ {entity} change missing from the change log")
+                    failures.append(entity)
+
+            # A rolled-back savepoint drops only what was staged inside it
+            record_changes(db, "location", [(cellar_id, None)])
+            try:
+                with db.begin_nested():
+                    record_changes(db, "storage_lot", [(tight_id, cellar_id)])
+                    raise RuntimeError("roll back the savepoint")
+            except RuntimeError:
+                pass
+            db.commit()
+            if _logged(db, "location", cellar_id) and not _logged(db, "storage_lot", tight_id):
+                print("✅ savepoint rollback kept earlier entries and dropped its own")
+            else:
+                print("❌ savepoint rollback staged the wrong change log entries")
+                failures.append("savepoint")
+        finally:
+            db.rollback()
+            _cleanup(db, wine_id, cellar_id, [roomy_id, tight_id], user_id)
+
+    if failures:
+        sys.exit(1)
+    print("Change log is complete!")
+
+def test_archived_movements_in_feed():
+    print("Testing the change feed after a month of movements is archived...")
+    period_start, period_end = datetime(2001, 3, 1), datetime(2001, 4, 1)
+    archive_dir = tempfile.mkdtemp()
+    archive_dir_before, movement_archive.MOVEMENT_ARCHIVE_DIR = movement_archive.MOVEMENT_ARCHIVE_DIR, archive_dir
+    with SessionLocal() as db:
+        wine_id, cellar_id, roomy_id, tight_id, user_id = _seed(db)
+        try:
+            movement_id = create_movement(db, MovementCreate(
+                batch_ref="CHG", sku_id=wine_id, quantity=6, movement_type=MovementType.INBOUND,
+                to_location_id=cellar_id, to_lot_id=roomy_id, performed_by=user_id,
+            )).id
+            # Backdate the movement and its change-log entry into a long-closed month
+            backdated = datetime(2001, 3, 15)
+            db.execute(update(Movement).where(Movement.id == movement_id).values(created_at=backdated))
+            db.execute(update(ChangeLog).where(ChangeLog.entity_id == movement_id).values(created_at=backdated))
+            db.commit()
+            seq = db.exec(select(ChangeLog.seq).where(ChangeLog.entity == "movement", ChangeLog.entity_id == movement_id)).one()
+
+            archive_period(db, period_start, period_end)
+            batch = get_changes(db, encode_cursor([seq - 1]), None, limit=1)
+            if batch.archived != [movement_id] or batch.deleted:
+                print(f"❌ Archived movement reported as archived={batch.archived} deleted={batch.deleted}")
+                sys.exit(1)
+            print("✅ archived movement listed under archived, not deleted")
+        finally:
+            db.rollback()
+            movement_archive.MOVEMENT_ARCHIVE_DIR = archive_dir_before
+            checkpoint_ids = db.exec(select(StockCheckpoint.id).where(StockCheckpoint.taken_at == period_end)).all()
+            db.execute(delete(StockSnapshot).where(StockSnapshot.checkpoint_id.in_(checkpoint_ids)))
+            db.execute(delete(StockCheckpoint).where(StockCheckpoint.id.in_(checkpoint_ids)))
+            db.execute(delete(MovementArchive).where(MovementArchive.period_start == period_start))
+            db.commit()
+            _cleanup(db, wine_id, cellar_id, [roomy_id, tight_id], user_id)
+            shutil.rmtree(archive_dir)
+    print("Archived movements are no longer reported as deleted!")
+
+if __name__ == "__main__":
+    import models
+    test_change_log_survives_rejections()
+    test_archived_movements_in_feed()
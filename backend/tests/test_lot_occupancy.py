@@ -0,0 +1,91 @@
+# tests/test_lot_occupancy.py
+#
+# Drifts a lot's occupied counter below the bottles actually in it, then posts a batch that
+# drains the lot: the draining row must be rejected (not retried forever) and the rest posted.
+# Then the occupancy check must find the drift and the rebuild must repair it.
+
+import sys
+from uuid import uuid4
+from sqlalchemy import delete, update
+from sqlmodel import select
+from core.database import SessionLocal
+from models.change_log import ChangeLog
+from models.location import Location, LocationType
+from models.movement import Movement, MovementType
+from models.stock import Stock
+from models.stock_rollup import StockRollup
+from models.storage_lot import StorageLot
+from models.user import User, UserRole
+from models.wine_sku import WineSKU
+from domain.movement import MovementCreate, create_movement, create_movements_batch
+from domain.storage_lot import check_lot_occupancy, rebuild_lot_occupancy
+
+def _seed(db):
+    tag = uuid4().hex[:8]
+    wine = WineSKU(
+        product_code=f"LOT-{tag}", wine_name="Lot Wine", vintage_year=2020, producer="Lot", country="France",
+        region="Bordeaux", grape_varieties=["Merlot"], alcohol_content=13.5, price_bottle=20.0, price_glass=5.0, cost_price=12.0,
+    )
+    cellar = Location(name=f"Lot Cellar {tag}", type=LocationType.CELLAR)
+    user = User(first_name="Lot", last_name="User", email=f"lot-{tag}@example.com", role=UserRole.STAFF, hashed_password="x")
+    db.add_all([wine, cellar, user])
+    db.flush()
+    drifted = StorageLot(location_id=cellar.id, lot_name="Drifted", capacity=100)
+    spare = StorageLot(location_id=cellar.id, lot_name="Spare", capacity=100)
+    db.add_all([drifted, spare])
+    db.commit()
+    return wine.id, cellar.id, drifted.id, spare.id, user.id
+
+def _cleanup(db, wine_id, cellar_id, lot_ids, user_id):
+    stock_ids = db.exec(select(Stock.id).where(Stock.sku_id == wine_id)).all()
+    movement_ids = db.exec(select(Movement.id).where(Movement.sku_id == wine_id)).all()
+    db.execute(delete(ChangeLog).where(ChangeLog.entity_id.in_([wine_id, cellar_id, user_id, *lot_ids, *stock_ids, *movement_ids])))
+    db.execute(delete(Movement).where(Movement.sku_id == wine_id))
+    db.execute(delete(Stock).where(Stock.sku_id == wine_id))
+    db.execute(delete(StockRollup).where(StockRollup.sku_id == wine_id))
+    db.execute(delete(StorageLot).where(StorageLot.id.in_(lot_ids)))
+    db.execute(delete(WineSKU).where(WineSKU.id == wine_id))
+    db.execute(delete(Location).where(Location.id == cellar_id))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+def test_batch_draining_a_drifted_lot():
+    print("Testing a batch that drains more than a lot's occupied counter holds...")
+    with SessionLocal() as db:
+        wine_id, cellar_id, drifted_id, spare_id, user_id = _seed(db)
+        try:
+            def movement(quantity, movement_type, **legs):
+                return MovementCreate(batch_ref="LOT", sku_id=wine_id, quantity=quantity, movement_type=movement_type, performed_by=user_id, **legs)
+
+            create_movement(db, movement(10, MovementType.INBOUND, to_location_id=cellar_id, to_lot_id=drifted_id))
+            # Drift: the stock row still holds 10 bottles, the counter says 2
+            db.execute(update(StorageLot).where(StorageLot.id == drifted_id).values(occupied=2))
+            db.commit()
+
+            result = create_movements_batch(db, [
+                movement(5, MovementType.OUTBOUND, from_location_id=cellar_id, from_lot_id=drifted_id),
+                movement(3, MovementType.INBOUND, to_location_id=cellar_id, to_lot_id=spare_id),
+            ])
+            if [rejection.index for rejection in result.rejected] != [0] or len(result.created_ids) != 1:
+                print(f"❌ Unexpected batch result: {result}")
+                sys.exit(1)
+            print(f"✅ draining row rejected: {result.rejected[0].reason}")
+
+            drifted = [mismatch.lot_id for mismatch in check_lot_occupancy(db)]
+            if drifted_id not in drifted or spare_id in drifted:
+                print(f"❌ check_lot_occupancy reported {drifted}")
+                sys.exit(1)
+            rebuild_lot_occupancy(db)
+            occupied = db.exec(select(StorageLot.occupied).where(StorageLot.id == drifted_id)).one()
+            if occupied != 10 or check_lot_occupancy(db):
+                print(f"❌ rebuild left the drifted lot at {occupied}")
+                sys.exit(1)
+            print("✅ drifted counter found and rebuilt from stock")
+        finally:
+            db.rollback()
+            _cleanup(db, wine_id, cellar_id, [drifted_id, spare_id], user_id)
+    print("Drifted lots no longer stall batches!")
+
+if __name__ == "__main__":
+    import models
+    test_batch_draining_a_drifted_lot()
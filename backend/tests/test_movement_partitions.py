@@ -0,0 +1,94 @@
+# tests/test_movement_partitions.py
+#
+# Dates a movement past the last pre-created monthly partition, so on PostgreSQL it lands in
+# movements_default, then runs partition maintenance: the month must get its own partition
+# and the row must move into it without being lost.
+
+import sys
+from uuid import uuid4
+from datetime import datetime
+from sqlalchemy import delete, text, update
+from sqlmodel import select
+from core.database import SessionLocal
+from models.change_log import ChangeLog
+from models.location import Location, LocationType
+from models.movement import Movement, MovementType
+from models.stock import Stock
+from models.stock_rollup import StockRollup
+from models.user import User, UserRole
+from models.wine_sku import WineSKU
+from domain.movement import MovementCreate, create_movement
+from domain.partitions import (
+    MOVEMENT_PARTITIONS_AHEAD, add_months, ensure_movement_partitions, month_start, movement_partition_name, movements_partitioned,
+)
+
+def _seed(db):
+    tag = uuid4().hex[:8]
+    wine = WineSKU(
+        product_code=f"PART-{tag}", wine_name="Partition Wine", vintage_year=2020, producer="Partition", country="France",
+        region="Bordeaux", grape_varieties=["Merlot"], alcohol_content=13.5, price_bottle=20.0, price_glass=5.0, cost_price=12.0,
+    )
+    cellar = Location(name=f"Partition Cellar {tag}", type=LocationType.CELLAR)
+    user = User(first_name="Partition", last_name="User", email=f"part-{tag}@example.com", role=UserRole.STAFF, hashed_password="x")
+    db.add_all([wine, cellar, user])
+    db.commit()
+    return wine.id, cellar.id, user.id
+
+def _cleanup(db, wine_id, cellar_id, user_id):
+    stock_ids = db.exec(select(Stock.id).where(Stock.sku_id == wine_id)).all()
+    movement_ids = db.exec(select(Movement.id).where(Movement.sku_id == wine_id)).all()
+    db.execute(delete(ChangeLog).where(ChangeLog.entity_id.in_([wine_id, cellar_id, user_id, *stock_ids, *movement_ids])))
+    db.execute(delete(Movement).where(Movement.sku_id == wine_id))
+    db.execute(delete(Stock).where(Stock.sku_id == wine_id))
+    db.execute(delete(StockRollup).where(StockRollup.sku_id == wine_id))
+    db.execute(delete(WineSKU).where(WineSKU.id == wine_id))
+    db.execute(delete(Location).where(Location.id == cellar_id))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+def test_movement_after_last_partition():
+    print("Testing a movement dated after the last pre-created partition...")
+    with SessionLocal() as db:
+        wine_id, cellar_id, user_id = _seed(db)
+        try:
+            movement = create_movement(db, MovementCreate(
+                batch_ref="PART", sku_id=wine_id, quantity=4, movement_type=MovementType.INBOUND,
+                to_location_id=cellar_id, performed_by=user_id,
+            ))
+            movement_id = movement.id
+            future = add_months(month_start(datetime.utcnow()), MOVEMENT_PARTITIONS_AHEAD + 2)
+            db.execute(update(Movement).where(Movement.id == movement_id).values(created_at=future))
+            db.commit()
+
+            created = ensure_movement_partitions(db)
+            name = movement_partition_name(future)
+            if movements_partitioned(db):
+                if name not in created:
+                    print(f"❌ No partition created for {name}: {created}")
+                    sys.exit(1)
+                table = db.execute(text("SELECT tableoid::regclass::text FROM movements WHERE id = :id"), {"id": movement_id}).scalar()
+                if table != name:
+                    print(f"❌ Movement still in {table}")
+                    sys.exit(1)
+                print(f"✅ Stranded movement moved into {name}")
+            else:
+                print("✅ Movements are not partitioned on this database; nothing to create")
+
+            row = db.exec(select(Movement).where(Movement.id == movement_id)).first()
+            if row is None or row.quantity != 4 or row.created_at != future:
+                print(f"❌ Movement lost or changed: {row}")
+                sys.exit(1)
+            print("✅ Movement intact after partition maintenance")
+
+            if ensure_movement_partitions(db):
+                print("❌ A second run created partitions again")
+                sys.exit(1)
+            print("✅ Second run is a no-op")
+        finally:
+            db.rollback()
+            _cleanup(db, wine_id, cellar_id, user_id)
+    print("Future-dated movements no longer stay in the default partition!")
+
+if __name__ == "__main__":
+    import models
+    test_movement_after_last_partition()
@@ -0,0 +1,121 @@
+# tests/test_query_plans.py
+#
+# Seeds a large ledger inside a transaction that is rolled back, then runs
+# EXPLAIN on the hot read paths and fails if any of them scans a whole table.
+
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import insert, text
+from sqlmodel import select
+from core.database import engine, SessionLocal
+from models.location import Location, LocationType
+from models.movement import Movement, MovementType
+from models.stock import Stock
+from models.user import User
+from models.wine_sku import WineSKU
+from domain.movement import MovementFilter, movement_list_query, MOVEMENT_SORT_KEY
+from domain.snapshot import _movement_legs
+
+SEED_MOVEMENTS = 50000
+SEED_SKUS = 500
+SEED_LOCATIONS = 50
+SEED_USERS = 20
+
+def _seed(db):
+    now = datetime.utcnow()
+    skus = [dict(
+        id=uuid4(), product_code=f"PLAN{i}", barcode=f"{i:013d}", wine_name=f"Plan Wine {i}", vintage_year=2015, producer="Plan", country="France",
+        region="Bordeaux", grape_varieties=["Merlot"], alcohol_content=13.0, price_bottle=20.0, price_glass=5.0, cost_price=10.0,
+        created_at=now, updated_at=now,
+    ) for i in range(SEED_SKUS)]
+    locations = [dict(id=uuid4(), name=f"Plan {i}", type=LocationType.CELLAR, created_at=now, updated_at=now) for i in range(SEED_LOCATIONS)]
+    users = [dict(
+        id=uuid4(), first_name="Plan", last_name=str(i), email=f"plan{i}@example.com", role="Staff", hashed_password="x",
+        created_at=now, updated_at=now,
+    ) for i in range(SEED_USERS)]
+    db.execute(insert(WineSKU), skus)
+    db.execute(insert(Location), locations)
+    db.execute(insert(User), users)
+
+    random.seed(7)
+    movements = []
+    for i in range(SEED_MOVEMENTS):
+        source, destination = random.sample(locations, 2)
+        movements.append(dict(
+            id=uuid4(), batch_ref=f"PLAN{i // 100}", sku_id=random.choice(skus)["id"], quantity=1,
+            from_location_id=source["id"], to_location_id=destination["id"], from_lot_id=None, to_lot_id=None,
+            movement_type=MovementType.TRANSFER, reason=None, performed_by=random.choice(users)["id"], approved_by=None,
+            is_high_value=False, created_at=now - timedelta(minutes=i),
+        ))
+    db.execute(insert(Movement), movements)
+    db.execute(insert(Stock), [
+        dict(id=uuid4(), sku_id=sku["id"], lot_id=None, location_id=location["id"], quantity=10, updated_at=now)
+        for sku in skus[:100] for location in locations
+    ])
+    db.execute(text("ANALYZE"))
+    return skus[0]["id"], locations[0]["id"], users[0]["id"], now
+
+def _full_scans(db, query, ordered_scan_ok: bool = False) -> list[str]:
+    sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        scans = []
+        def walk(node):
+            if node.get("Node Type") == "Seq Scan":
+                scans.append(node["Relation Name"])
+            for child in node.get("Plans", []):
+                walk(child)
+        walk(plan[0]["Plan"])
+        return scans
+    # SQLite: SEARCH is an index seek; SCAN walks the whole table, or a whole index when USING one
+    return [
+        row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+        if row[-1].startswith("SCAN") and not (ordered_scan_ok and "USING" in row[-1])
+    ]
+
+def _page(filters: MovementFilter):
+    return movement_list_query(filters).order_by(*[column.desc() for column in MOVEMENT_SORT_KEY]).limit(51)
+
+def test_query_plans():
+    print("Checking query plans for movements and stocks...")
+    failures = []
+    with SessionLocal() as db:
+        sku_id, location_id, user_id, now = _seed(db)
+        inbound, outbound = _movement_legs(now - timedelta(days=1), now, location_id=location_id)
+        # An unfiltered page may walk the (created_at, id) index; LIMIT stops it after one page
+        ordered = {"movements page"}
+        queries = {
+            "movements page": _page(MovementFilter()),
+            "movements by sku": _page(MovementFilter(sku_id=sku_id)),
+            "movements by location": _page(MovementFilter(location_id=location_id)),
+            "movements by user": _page(MovementFilter(performed_by=user_id)),
+            "movements in date range": _page(MovementFilter(created_from=now - timedelta(days=1), created_to=now)),
+            "as-of replay inbound": inbound,
+            "as-of replay outbound": outbound,
+            "stocks by location": select(Stock).where(Stock.location_id == location_id),
+            "stocks by sku": select(Stock).where(Stock.sku_id == sku_id),
+            "wines by barcode": select(WineSKU).where(WineSKU.barcode.in_(["0000000000000", "0000000000001"])),
+        }
+        try:
+            for name, query in queries.items():
+                scans = _full_scans(db, query, name in ordered)
+                if scans:
+                    print(f"❌ {name}: full scan ({', '.join(scans)})")
+                    failures.append(name)
+                else:
+                    print(f"✅ {name}")
+        finally:
+            db.rollback()
+
+    if failures:
+        print(f"❌ {len(failures)} queries regressed to a full table scan")
+        sys.exit(1)
+    print("All query plans use indexes!")
+
+if __name__ == "__main__":
+    import models
+    test_query_plans()